@@ -0,0 +1,261 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Headless benchmarks of the GUI thread hot paths, on the fixtures in
+# bench/ (no network, no display: QT_QPA_PLATFORM=offscreen).
+# The clock is loaded with the given config (Config-Example by default)
+# but its event loop is never started, and without its side effects: no
+# MQTT broker, sensor archive, usage file, metrics or recordings, so a
+# benchmark can run next to the real clock.
+#   python Benchmark.py [-n 50] [-o results.json] [-c baseline.json]
+#                       [-t 1.25] [-k name] [config]
+# With -c, the run is compared to a previous result file and the exit
+# status is 1 when a benchmark got slower than threshold times.
+# A few checks of what the timings rely on (checks()) run first, a
+# failed one also gives exit status 1.
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import importlib
+import importlib.util
+import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, 'bench')
+
+
+def fixture(name, mode='rb'):
+    with open(os.path.join(FIXTURES, name), mode) as f:
+        return f.read()
+
+
+def loadClock(config):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.chdir(HERE)
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    try:
+        import ApiKeys  # NOQA
+    except ImportError:
+        # the keys are not used, the example file is enough
+        spec = importlib.util.spec_from_file_location(
+            'ApiKeys', os.path.join(HERE, 'ApiKeys-example.py'))
+        keys = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(keys)
+        sys.modules['ApiKeys'] = keys
+    # the clock takes the config module already loaded here, these win
+    # over its defaults
+    Config = importlib.import_module(config)
+    Config.mqtt_host = ''
+    Config.mqtt_client_id = 'PiWeatherStation-bench-%d' % os.getpid()
+    Config.mqtt_record = ''
+    Config.mqtt_replay = ''
+    Config.wx_mqtt = ''
+    Config.sensor_db = ''
+    Config.net_usage_file = ''
+    Config.metrics_port = 0
+    Config.trace_file = ''
+    Config.startup_trace = ''
+    Config.memory_report = 0
+    sys.argv = ['PyQtPiClock.py', config]
+    return importlib.import_module('PyQtPiClock')
+
+
+class FixtureReply:
+    # stands for a finished QNetworkReply
+    def __init__(self, clock, data):
+        self.clock = clock
+        self.data = data
+
+    def readAll(self):
+        return self.clock.QtCore.QByteArray(self.data)
+
+    def error(self):
+        return self.clock.QNetworkReply.NoError
+
+
+def benchmarks(clock):
+    # name -> (setup, run), setup is called before each run, untimed
+    Config = clock.Config
+    Config.METAR = 'LFST'
+    clock.daytime = True
+    owm = fixture('owm-onecall.json')
+    metar = fixture('metar.txt')
+    zigbee = json.loads(fixture('zigbee.json', 'r'))
+    zigbee = [(z['topic'], json.dumps(z['payload']).encode('utf-8'))
+              for z in zigbee]
+
+    radar = clock.objradar1
+    layer = radar.layers[0]
+    tile = clock.QImage(256, 256, clock.QImage.Format_ARGB32)
+    tile.fill(clock.QColor(0, 120, 255, 110))
+    base = clock.QPixmap(radar.rect.size())
+    base.fill(clock.QColor(90, 90, 90))
+
+    def nothing():
+        pass
+
+    def tickSetup():
+        clock.lastmin = -1
+        clock.lastday = -1
+
+    def setOwm():
+        clock.wxreply = FixtureReply(clock, owm)
+
+    def setMetar():
+        clock.metarreply = FixtureReply(clock, metar)
+
+    def setTiles():
+        radar.layer = layer
+        radar.tiles = layer['tiles']
+        radar.tileQimages = [tile.copy() for t in layer['tiles']]
+        radar.getTime = time.time()
+        radar.frameImages = []
+
+    def temps():
+        for topic, payload in zigbee:
+            clock.tempfinished(clock.parseReading(topic, payload))
+
+    def suntimes():
+        sun = clock.suntimes(Config.location.lat, Config.location.lng)
+        dt = datetime.datetime.now(tz=clock.tzlocal.get_localzone())
+        sun.sunrise(dt)
+        sun.sunset(dt)
+
+    return {
+        'tick': (nothing, clock.tick),
+        'tick.minute': (tickSetup, clock.tick),
+        'wxfinished_owm': (setOwm, clock.wxfinished_owm),
+        'wxfinished_metar': (setMetar, clock.wxfinished_metar),
+        'radar.combineTiles': (setTiles, radar.combineTiles),
+        'radar.setbase': (nothing, lambda: radar.setbase(base)),
+        'suntimes': (nothing, suntimes),
+        'tempfinished': (nothing, temps),
+    }
+
+
+def checks(clock):
+    # behaviour the timings rely on, returns the failures
+    failures = []
+
+    # in-order readings only scroll the sparkline, no full redraw
+    # before the whole width has scrolled by
+    spark = clock.Sparkline(None, 'benchSpark',
+                            clock.QtCore.QRect(0, 0, 80, 30))
+    t = time.time() - 86400
+    history = [(t + i * 60, 20 + (i % 7) * 0.1) for i in range(600)]
+    spark.redraw(history)
+    redraws = []
+    spark.redraw = lambda h: redraws.append(len(h))
+    t = history[-1][0]
+    for i in range(600):
+        t += 60
+        spark.add(t, 20 + (i % 7) * 0.1, lambda: history)
+    if redraws:
+        failures.append("sparkline: %d full redraws for 600 in-order "
+                        "readings" % len(redraws))
+    return failures
+
+
+def run(setup, fn, n):
+    fn()    # warm up, caches and lazy imports
+    times = []
+    for i in range(n):
+        setup()
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    times.sort()
+    return {
+        'n': n,
+        'min_ms': times[0] * 1000,
+        'median_ms': times[len(times) // 2] * 1000,
+        'p95_ms': times[min(n - 1, int(n * 0.95))] * 1000,
+        'mean_ms': sum(times) / n * 1000,
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, r in results.items():
+        old = baseline.get('results', {}).get(name)
+        if old is None or old['median_ms'] <= 0:
+            continue
+        ratio = r['median_ms'] / old['median_ms']
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print("  %-20s %8.3fms -> %8.3fms  x%.2f%s" % (
+            name, old['median_ms'], r['median_ms'], ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('config', nargs='?', default='Config-Example')
+    parser.add_argument('-n', type=int, default=50)
+    parser.add_argument('-o', '--output', default='')
+    parser.add_argument('-c', '--compare', default='')
+    parser.add_argument('-t', '--threshold', type=float, default=1.25)
+    parser.add_argument('-k', '--only', default='')
+    args = parser.parse_args()
+
+    # file names are relative to where the command was started
+    output = os.path.abspath(args.output) if args.output else ''
+    baseline = os.path.abspath(args.compare) if args.compare else ''
+
+    clock = loadClock(args.config)
+    failures = checks(clock)
+    for failure in failures:
+        print("CHECK FAILED " + failure)
+    results = {}
+    for name, (setup, fn) in benchmarks(clock).items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = run(setup, fn, args.n)
+        print("%-20s median %8.3fms  p95 %8.3fms  min %8.3fms" % (
+            name, results[name]['median_ms'], results[name]['p95_ms'],
+            results[name]['min_ms']))
+
+    doc = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'qt': clock.QtCore.QT_VERSION_STR,
+        'config': args.config,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(doc, f, indent=1)
+    status = 1 if failures else 0
+    if baseline:
+        with open(baseline) as f:
+            old = json.load(f)
+        print("compared to " + baseline + ":")
+        if compare(results, old, args.threshold):
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,209 +1,327 @@
-from GoogleMercatorProjection import LatLng
-from PyQt4.QtGui import QColor
-
-
-# LOCATION(S)
-# Further radar configuration (zoom, marker location) can be
-# completed under the RADAR section
-primary_coordinates = 44.9764016, -93.2486732  # Change to your Lat/Lon
-
-location = LatLng(primary_coordinates[0], primary_coordinates[1])
-primary_location = LatLng(primary_coordinates[0], primary_coordinates[1])
-noaastream = 'http://www.urberg.net:8000/tim273/edina'
-background = 'images/clockbackground-kevin.png'
-squares1 = 'images/squares1-kevin.png'
-squares2 = 'images/squares2-kevin.png'
-icons = 'icons-lightblue'
-textcolor = '#bef'
-clockface = 'images/clockface3.png'
-hourhand = 'images/hourhand.png'
-minhand = 'images/minhand.png'
-sechand = 'images/sechand.png'
-
-# SlideShow
-useslideshow = 0             # 1 to enable, 0 to disable
-slide_time = 305              # in seconds, 3600 per hour
-slides = 'images/slideshow'   # the path to your local images
-slide_bg_color = "#000"       # https://htmlcolorcodes.com/  black #000
-
-digital = 0                 # 1 = Digital Clock, 0 = Analog Clock
-
-# Goes with light blue config (like the default one)
-digitalcolor = "#50CBEB"
-digitalformat = "{0:%I:%M\n%S %p}"  # Format of the digital clock face
-digitalsize = 200
-
-digitalformat2 = "{0:%H:%M:%S}"  # Format of the digital time on second screen
-
-usemapbox = 0   # Use Mapbox.com for maps, needs api key (mbapi in ApiKeys.py)
-metric = 0  # 0 = English, 1 = Metric
-radar_refresh = 10      # minutes
-weather_refresh = 30    # minutes
-# Wind in degrees instead of cardinal 0 = cardinal, 1 = degrees
-wind_degrees = 0
-
-# gives all text additional attributes using QT style notation
-# example: fontattr = 'font-weight: bold; '
-fontattr = ''
-
-# These are to dim the radar images, if needed.
-# see and try Config-Example-Bedside.py
-dimcolor = QColor('#000000')
-dimcolor.setAlpha(0)
-
-# Optional Current conditions replaced with observations from a METAR station
-# METAR is world wide, provided mostly for pilots
-# But data can be sparse outside US and Europe
-#  If you're close to an international airport, you should find soemthing close
-# Find the closest METAR station with the following URL
-# https://www.aviationweather.gov/metar
-# scroll/zoom the map to find your closest station
-# or look up the ICAO code here:
-# https://airportcodes.aero/name
-METAR = ''
-
-# Language Specific wording
-# DarkSky Language code
-#  (https://darksky.net/dev/docs under lang=)
-Language = "EN"
-
-# The Python Locale for date/time (locale.setlocale)
-#  '' for default Pi Setting
-# Locales must be installed in your Pi.. to check what is installed
-# locale -a
-# to install locales
-# sudo dpkg-reconfigure locales
-DateLocale = ''
-
-# Language specific wording
-LPressure = "Pressure "
-LHumidity = "Humidity "
-LWind = "Wind "
-Lgusting = " gust "
-LFeelslike = "Feels like "
-LPrecip1hr = " Precip 1hr: "
-LToday = "Today: "
-LSunRise = "Sun Rise: "
-LSet = " Set: "
-LMoonPhase = " Moon: "
-LInsideTemp = "Inside Temp "
-LRain = " Rain: "
-LSnow = " Snow: "
-Lmoon1 = 'New Moon'
-Lmoon2 = 'Waxing Crescent'
-Lmoon3 = 'First Quarter'
-Lmoon4 = 'Waxing Gibbous'
-Lmoon5 = 'Full Moon'
-Lmoon6 = 'Waning Gibbous'
-Lmoon7 = 'Third Quarter'
-Lmoon8 = 'Waning Crecent'
-# Language Specific terms for weather conditions
-Lcc_code_map = {
-            "freezing_rain_heavy": "Freezing Rain",
-            "freezing_rain": "Freezing Rain",
-            "freezing_rain_light": "Freezing Rain",
-            "freezing_drizzle": "Freezing Drizzle",
-            "ice_pellets_heavy": "Ice Pellets",
-            "ice_pellets": "Ice Pellets",
-            "ice_pellets_light": "Ice Pellets",
-            "snow_heavy": "Heavy Snow",
-            "snow": "Snow",
-            "snow_light": "Light Snow",
-            "flurries": "Flurries",
-            "tstorm": "Thunder Storm",
-            "rain_heavy": "Heavy Rain",
-            "rain": "Rain",
-            "rain_light": "Light Rain",
-            "drizzle": "Drizzle",
-            "fog_light": "Light Fog",
-            "fog": "Fog",
-            "cloudy": "Cloudy",
-            "mostly_cloudy": "Mostly Cloudy",
-            "partly_cloudy": "Partly Cloudy",
-            "mostly_clear": "Mostly Clear",
-            "clear": "Clear"
-}
-
-# RADAR
-# By default, primary_location entered will be the
-#  center and marker of all radar images.
-# To update centers/markers, change radar sections
-# below the desired lat/lon as:
-# -FROM-
-# primary_location,
-# -TO-
-# LatLng(44.9764016,-93.2486732),
-radar1 = {
-    'center': primary_location,  # the center of your radar block
-    'zoom': 7,  # this is a maps zoom factor, bigger = smaller area
-    'style': 'mapbox/satellite-streets-v10',  # optional style (mapbox only)
-    'color': 6,  # rainviewer radar color style:
-                 # https://www.rainviewer.com/api.html#colorSchemes
-    'smooth': 1,  # rainviewer radar smoothing
-    'snow': 1,  # rainviewer radar show snow as different color
-    'markers': (   # google maps markers can be overlayed
-        {
-            'visible': 1,  # 0 = hide marker, 1 = show marker
-            'location': primary_location,
-            'color': 'red',
-            'size': 'small',
-            'image': 'teardrop-dot',  # optional image from the markers folder
-        },          # dangling comma is on purpose.
-    )
-}
-
-
-radar2 = {
-    'center': primary_location,
-    'zoom': 11,
-    'style': 'mapbox/satellite-streets-v10',
-    'color': 6,
-    'smooth': 1,
-    'snow': 1,
-    'markers': (
-        {
-            'visible': 1,
-            'location': primary_location,
-            'color': 'red',
-            'size': 'small',
-            'image': 'teardrop-dot',
-        },
-    )
-}
-
-
-radar3 = {
-    'center': primary_location,
-    'zoom': 7,
-    'style': 'mapbox/satellite-streets-v10',
-    'color': 6,
-    'smooth': 1,
-    'snow': 1,
-    'markers': (
-        {
-            'visible': 1,
-            'location': primary_location,
-            'color': 'red',
-            'size': 'small',
-            'image': 'teardrop-dot',
-        },
-    )
-}
-
-radar4 = {
-    'center': primary_location,
-    'zoom': 11,
-    'style': 'mapbox/satellite-streets-v10',
-    'color': 6,
-    'smooth': 1,
-    'snow': 1,
-    'markers': (
-        {
-            'visible': 1,
-            'location': primary_location,
-            'color': 'red',
-            'size': 'small',
-            'image': 'teardrop-dot',
-        },
-    )
-}
+from GoogleMercatorProjection import LatLng
+from PyQt4.QtGui import QColor
+
+
+# LOCATION(S)
+# Further radar configuration (zoom, marker location) can be
+# completed under the RADAR section
+primary_coordinates = 44.9764016, -93.2486732  # Change to your Lat/Lon
+
+location = LatLng(primary_coordinates[0], primary_coordinates[1])
+primary_location = LatLng(primary_coordinates[0], primary_coordinates[1])
+noaastream = 'http://www.urberg.net:8000/tim273/edina'
+background = 'images/clockbackground-kevin.png'
+squares1 = 'images/squares1-kevin.png'
+squares2 = 'images/squares2-kevin.png'
+icons = 'icons-lightblue'
+textcolor = '#bef'
+clockface = 'images/clockface3.png'
+hourhand = 'images/hourhand.png'
+minhand = 'images/minhand.png'
+sechand = 'images/sechand.png'
+
+# SlideShow
+useslideshow = 0             # 1 to enable, 0 to disable
+slide_time = 305              # in seconds, 3600 per hour
+slides = 'images/slideshow'   # the path to your local images
+slide_bg_color = "#000"       # https://htmlcolorcodes.com/  black #000
+
+digital = 0                 # 1 = Digital Clock, 0 = Analog Clock
+
+# Goes with light blue config (like the default one)
+digitalcolor = "#50CBEB"
+digitalformat = "{0:%I:%M\n%S %p}"  # Format of the digital clock face
+digitalsize = 200
+
+digitalformat2 = "{0:%H:%M:%S}"  # Format of the digital time on second screen
+
+usemapbox = 0   # Use Mapbox.com for maps, needs api key (mbapi in ApiKeys.py)
+# Optional local basemap, no network or api key needed for the maps.
+# Either a MBTiles file or a XYZ tile directory ({z}/{x}/{y}.png).
+# Can also be set per radar with a 'basemap' key.
+basemap_tiles = ''      # example: 'maps/region.mbtiles'
+basemap_offline = 0     # 1 = never fall back to Mapbox/Google maps
+metric = 0  # 0 = English, 1 = Metric
+radar_refresh = 10      # minutes
+radar_frame_ms = 200    # radar animation speed, raise it on a slow board
+weather_refresh = 30    # minutes
+net_max_active = 4      # downloads in flight at once, on screen data goes first
+# On a slow link, radars fall back to fewer frames, then the newest frame
+# only, then the newest frame at a lower zoom. Thresholds in bytes/s.
+radar_adaptive = 1      # 0 = always fetch every frame at full zoom
+radar_link_thresholds = (100000, 30000, 10000)
+# Requests, bytes, HTTP status and latency of each provider, by hour and
+# by day (UTC), are kept in net_usage_file ('' = not saved).
+net_usage_file = 'netusage.json'
+# Daily request budget of each provider key (owm, metar, rainviewer,
+# mapbox, google, climacell, darksky), requests above it are refused until
+# 00:00 UTC, hidden radars already stop at 90%. Each display counts its
+# own requests, divide the budget of a shared key between them.
+net_quota = {}          # e.g. {'owm': 900, 'mapbox': 1500}
+# Wind in degrees instead of cardinal 0 = cardinal, 1 = degrees
+wind_degrees = 0
+
+# gives all text additional attributes using QT style notation
+# example: fontattr = 'font-weight: bold; '
+fontattr = ''
+
+# These are to dim the radar images, if needed.
+# see and try Config-Example-Bedside.py
+dimcolor = QColor('#000000')
+dimcolor.setAlpha(0)
+
+# Optional Current conditions replaced with observations from a METAR station
+# METAR is world wide, provided mostly for pilots
+# But data can be sparse outside US and Europe
+#  If you're close to an international airport, you should find soemthing close
+# Find the closest METAR station with the following URL
+# https://www.aviationweather.gov/metar
+# scroll/zoom the map to find your closest station
+# or look up the ICAO code here:
+# https://airportcodes.aero/name
+METAR = ''
+
+# Language Specific wording
+# DarkSky Language code
+#  (https://darksky.net/dev/docs under lang=)
+Language = "EN"
+
+# The Python Locale for date/time (locale.setlocale)
+#  '' for default Pi Setting
+# Locales must be installed in your Pi.. to check what is installed
+# locale -a
+# to install locales
+# sudo dpkg-reconfigure locales
+DateLocale = ''
+
+# Language specific wording
+LPressure = "Pressure "
+LHumidity = "Humidity "
+LWind = "Wind "
+Lgusting = " gust "
+LFeelslike = "Feels like "
+LPrecip1hr = " Precip 1hr: "
+LToday = "Today: "
+LSunRise = "Sun Rise: "
+LSet = " Set: "
+LMoonPhase = " Moon: "
+LInsideTemp = "Inside Temp "
+LRain = " Rain: "
+LSnow = " Snow: "
+Lmoon1 = 'New Moon'
+Lmoon2 = 'Waxing Crescent'
+Lmoon3 = 'First Quarter'
+Lmoon4 = 'Waxing Gibbous'
+Lmoon5 = 'Full Moon'
+Lmoon6 = 'Waning Gibbous'
+Lmoon7 = 'Third Quarter'
+Lmoon8 = 'Waning Crecent'
+# Language Specific terms for weather conditions
+Lcc_code_map = {
+            "freezing_rain_heavy": "Freezing Rain",
+            "freezing_rain": "Freezing Rain",
+            "freezing_rain_light": "Freezing Rain",
+            "freezing_drizzle": "Freezing Drizzle",
+            "ice_pellets_heavy": "Ice Pellets",
+            "ice_pellets": "Ice Pellets",
+            "ice_pellets_light": "Ice Pellets",
+            "snow_heavy": "Heavy Snow",
+            "snow": "Snow",
+            "snow_light": "Light Snow",
+            "flurries": "Flurries",
+            "tstorm": "Thunder Storm",
+            "rain_heavy": "Heavy Rain",
+            "rain": "Rain",
+            "rain_light": "Light Rain",
+            "drizzle": "Drizzle",
+            "fog_light": "Light Fog",
+            "fog": "Fog",
+            "cloudy": "Cloudy",
+            "mostly_cloudy": "Mostly Cloudy",
+            "partly_cloudy": "Partly Cloudy",
+            "mostly_clear": "Mostly Clear",
+            "clear": "Clear"
+}
+
+# ZIGBEE SENSORS
+# MQTT topics (as published by zigbee2mqtt) shown in the sensor panels.
+# 'slot' is the panel number (0 = left, 1 = right), 'name' its title.
+# Topics may use MQTT wildcards, + for one level and # for the rest,
+# wildcard matches (or entries without 'slot') take the next free panel.
+# Slots past the panels of the grid (sensor_grid below) are on the next
+# pages.
+sensors = (
+    {'topic': 'zigbee/sensor1', 'name': 'Salon', 'slot': 0},
+    {'topic': 'zigbee/sensor2', 'name': 'Chambre', 'slot': 1},
+)
+
+# Sensor history, the last sensor_history readings of each sensor are kept
+# in memory, and all of them archived in the sensor_db SQLite file
+# ('' to disable), written once every sensor_db_commit seconds.
+# Days kept raw, as 5 minute averages, and as hourly averages
+sensor_db = 'sensors.db'
+sensor_db_commit = 60
+sensor_db_retention = (2, 30, 730)
+sensor_history = 1440
+# 24 hour trend lines beside the sensor values, 0 to hide them
+sensor_sparklines = 1
+# Sensor panels, columns x rows in the sensor area. With more sensors
+# than panels, the pages rotate every sensor_page_time seconds
+sensor_grid = (2, 1)
+sensor_page_time = 10
+# MQTT messages are coalesced per topic, the sensor panels are updated at
+# most once every mqtt_frame_ms milliseconds with the latest reading
+mqtt_frame_ms = 50
+# MQTT broker, '' = no broker
+mqtt_host = 'localhost'
+# MQTT client id, it must be stable for the broker to keep the session
+# (subscriptions and queued readings) while the clock is restarting
+# mqtt_client_id = 'PiWeatherStation-kitchen'
+# Reconnection delay, doubling from the first to the second value (seconds)
+mqtt_backoff = (1, 120)
+# 'thread': paho runs its own network thread
+# 'qt': paho is driven by the Qt event loop, no extra thread
+# (compare both with: python MqttBench.py)
+mqtt_mode = 'thread'
+# Weather shared between stations over MQTT, under wx_topic
+# '': off
+# 'publish': the weather (OpenWeatherMap and METAR) is published after
+#            each refresh, as retained messages
+# 'subscribe': the weather is taken from a publishing station, the
+#            weather APIs are never called
+wx_mqtt = ''
+wx_topic = 'piweatherstation/weather'
+# MQTT traffic recording and replay, for tests without the devices
+# (see MqttReplay.py). mqtt_record is a file the received messages are
+# written to, mqtt_replay a recording fed to the sensor panels at
+# mqtt_replay_speed (1 real time, N times faster, 0 as fast as possible),
+# latency and GUI time are printed at the end.
+mqtt_record = ''
+mqtt_replay = ''
+mqtt_replay_speed = 1
+
+# Timing of the GUI thread callbacks (tick, weather, radar, sensors,
+# slideshow), a summary is printed every instrument_interval seconds
+instrument = 0
+instrument_interval = 300
+# When the clock (event loop) is stuck for more than stall_threshold
+# seconds, the code it is stuck in is printed. 0 to disable. The lag
+# percentiles are in the instrument summary.
+stall_threshold = 3
+# Memory report every memory_report seconds (0 = off): RSS, top Python
+# allocators, radar frames, pixmaps and slides held, with a warning for
+# what keeps growing. It slows the clock down a little.
+memory_report = 0
+# The startup timeline (time to first paint, weather and radar animation)
+# is printed once reached, and also saved as JSON in startup_trace if set
+startup_trace = ''
+# Prometheus metrics (lag, callback timings, radar frames, providers,
+# MQTT, sensors, caches, memory) on http://<metrics_bind>:<metrics_port>/metrics
+# 0 = off. Use '0.0.0.0' as metrics_bind to scrape from the LAN.
+metrics_port = 0        # e.g. 9105
+metrics_bind = '127.0.0.1'
+metrics_interval = 15   # seconds between updates of the page
+# Trace of the callbacks, downloads, image decodes and MQTT messages in
+# the Chrome trace format, for https://ui.perfetto.dev. The last
+# trace_events are kept and written to trace_file at exit, or on
+# kill -USR1 <pid>. '' = off.
+trace_file = ''         # e.g. 'clock-trace.json'
+trace_events = 200000
+
+# Base URL overrides of the data providers ('owm', 'metar', 'rainviewer',
+# 'mapbox', 'google', 'climacell', 'darksky'), for example to run
+# without internet against the local stand-in server (python StandIn.py)
+# provider_urls = {
+#     'owm': 'http://localhost:8080',
+#     'metar': 'http://localhost:8080',
+#     'rainviewer': 'http://localhost:8080',
+#     'mapbox': 'http://localhost:8080',
+#     'google': 'http://localhost:8080',
+# }
+provider_urls = {}
+
+# RADAR
+# By default, primary_location entered will be the
+#  center and marker of all radar images.
+# To update centers/markers, change radar sections
+# below the desired lat/lon as:
+# -FROM-
+# primary_location,
+# -TO-
+# LatLng(44.9764016,-93.2486732),
+radar1 = {
+    'center': primary_location,  # the center of your radar block
+    'zoom': 7,  # this is a maps zoom factor, bigger = smaller area
+    'style': 'mapbox/satellite-streets-v10',  # optional style (mapbox only)
+    'color': 6,  # rainviewer radar color style:
+                 # https://www.rainviewer.com/api.html#colorSchemes
+    'smooth': 1,  # rainviewer radar smoothing
+    'snow': 1,  # rainviewer radar show snow as different color
+    'snap': 0,  # 1 = nudge the center so the map needs fewer radar tiles
+                # (the tile count is printed at startup for each radar)
+    'markers': (   # google maps markers can be overlayed
+        {
+            'visible': 1,  # 0 = hide marker, 1 = show marker
+            'location': primary_location,
+            'color': 'red',
+            'size': 'small',
+            'image': 'teardrop-dot',  # optional image from the markers folder
+        },          # dangling comma is on purpose.
+    )
+}
+
+
+radar2 = {
+    'center': primary_location,
+    'zoom': 11,
+    'style': 'mapbox/satellite-streets-v10',
+    'color': 6,
+    'smooth': 1,
+    'snow': 1,
+    'markers': (
+        {
+            'visible': 1,
+            'location': primary_location,
+            'color': 'red',
+            'size': 'small',
+            'image': 'teardrop-dot',
+        },
+    )
+}
+
+
+radar3 = {
+    'center': primary_location,
+    'zoom': 7,
+    'style': 'mapbox/satellite-streets-v10',
+    'color': 6,
+    'smooth': 1,
+    'snow': 1,
+    'markers': (
+        {
+            'visible': 1,
+            'location': primary_location,
+            'color': 'red',
+            'size': 'small',
+            'image': 'teardrop-dot',
+        },
+    )
+}
+
+radar4 = {
+    'center': primary_location,
+    'zoom': 11,
+    'style': 'mapbox/satellite-streets-v10',
+    'color': 6,
+    'smooth': 1,
+    'snow': 1,
+    'markers': (
+        {
+            'visible': 1,
+            'location': primary_location,
+            'color': 'red',
+            'size': 'small',
+            'image': 'teardrop-dot',
+        },
+    )
+}
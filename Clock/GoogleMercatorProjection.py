@@ -1,133 +1,317 @@
-# =====================================================
-#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
-# =====================================================
-#
-# This file is part of PiWeatherStation.
-# PiWeatherStation is free software: you can redistribute it and/or 
-# modify it under the terms of the GNU General Public License
-# as published by the Free Software Foundation, either version 3
-#  of the License, or (at your option) any later version.
-#
-# PiWeatherStation is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the 
-# GNU General Public License for more details.
-# You should have received a copy of the GNU General Public License
-# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
-
-# http://stackoverflow.com/
-#   questions/12507274/how-to-get-bounds-of-a-google-static-map
-import math
-MERCATOR_RANGE = 256
-
-
-def bound(value, opt_min, opt_max):
-    if (opt_min is not None):
-        value = max(value, opt_min)
-    if (opt_max is not None):
-        value = min(value, opt_max)
-    return value
-
-
-def degreesToRadians(deg):
-    return deg * (math.pi / 180)
-
-
-def radiansToDegrees(rad):
-    return rad / (math.pi / 180)
-
-
-class Point:
-    def __init__(self, x=0, y=0):
-        self.x = x
-        self.y = y
-
-    def __repr__(self):
-        return "Point(%d,%d)" % (self.x, self.y)
-
-    def __str__(self):
-        return "(x=%d,y=%d)" % (self.x, self.y)
-
-
-class LatLng:
-    def __init__(self, lt, ln):
-        self.lat = lt
-        self.lng = ln
-
-    def __repr__(self):
-        return "LatLng(%g,%g)" % (self.lat, self.lng)
-
-    def __str__(self):
-        return "(lat=%g,lng=%g)" % (self.lat, self.lng)
-
-
-class MercatorProjection:
-
-    def __init__(self):
-        self.pixelOrigin_ = Point(MERCATOR_RANGE / 2.0, MERCATOR_RANGE / 2.0)
-        self.pixelsPerLonDegree_ = MERCATOR_RANGE / 360.0
-        self.pixelsPerLonRadian_ = MERCATOR_RANGE / (2.0 * math.pi)
-
-    def fromLatLngToPoint(self, latLng, opt_point=None):
-        point = opt_point if opt_point is not None else Point(0, 0)
-        origin = self.pixelOrigin_
-        point.x = origin.x + latLng.lng * self.pixelsPerLonDegree_
-        # NOTE(appleton): Truncating to 0.9999 effectively limits latitude to
-        # 89.189.This is about a third of a tile past the edge of world tile
-        siny = bound(math.sin(degreesToRadians(latLng.lat)), -0.9999, 0.9999)
-        point.y = origin.y + 0.5 * math.log((1 + siny) / (1.0 - siny)) * \
-            -self.pixelsPerLonRadian_
-        return point
-
-    def fromPointToLatLng(self, point):
-        origin = self.pixelOrigin_
-        lng = (point.x - origin.x) / self.pixelsPerLonDegree_
-        latRadians = (point.y - origin.y) / -self.pixelsPerLonRadian_
-        lat = radiansToDegrees(2.0 * math.atan(math.exp(latRadians)) -
-                               math.pi / 2.0)
-        return LatLng(lat, lng)
-
-
-def getPoint(point, center, zoom, mapWidth, mapHeight):
-    scale = 2.0**zoom
-    proj = MercatorProjection()
-    centerP = proj.fromLatLngToPoint(center)
-    centerP.x = centerP.x * scale
-    centerP.y = centerP.y * scale
-    subjectP = proj.fromLatLngToPoint(point)
-    subjectP.x = subjectP.x * scale
-    subjectP.y = subjectP.y * scale
-    return Point((subjectP.x - centerP.x) + mapWidth / 2.0,
-                 (subjectP.y - centerP.y) + mapHeight / 2.0)
-
-
-def getCorners(center, zoom, mapWidth, mapHeight):
-    scale = 2.0**zoom
-    proj = MercatorProjection()
-    centerPx = proj.fromLatLngToPoint(center)
-    SWPoint = Point(centerPx.x - (mapWidth / 2.0) / scale, centerPx.y +
-                    (mapHeight / 2.0) / scale)
-    SWLatLon = proj.fromPointToLatLng(SWPoint)
-    NEPoint = Point(centerPx.x + (mapWidth / 2.0) / scale, centerPx.y -
-                    (mapHeight / 2.0) / scale)
-    NELatLon = proj.fromPointToLatLng(NEPoint)
-    return {
-        'N': NELatLon.lat,
-        'E': NELatLon.lng,
-        'S': SWLatLon.lat,
-        'W': SWLatLon.lng,
-    }
-
-
-# https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames
-
-def getTileXY(latLng, zoom):
-    lat_rad = math.radians(latLng.lat)
-    n = 2.0 ** zoom
-    xtile = (latLng.lng + 180.0) / 360.0 * n
-    ytile = ((1.0 - math.log(math.tan(lat_rad) +
-             (1 / math.cos(lat_rad))) / math.pi) / 2.0 * n)
-    return {
-        'X': xtile,
-        'Y': ytile
-    }
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or 
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the 
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# http://stackoverflow.com/
+#   questions/12507274/how-to-get-bounds-of-a-google-static-map
+import math
+try:
+    import numpy
+except ImportError:
+    numpy = None
+MERCATOR_RANGE = 256
+
+
+def bound(value, opt_min, opt_max):
+    if (opt_min is not None):
+        value = max(value, opt_min)
+    if (opt_max is not None):
+        value = min(value, opt_max)
+    return value
+
+
+def degreesToRadians(deg):
+    return deg * (math.pi / 180)
+
+
+def radiansToDegrees(rad):
+    return rad / (math.pi / 180)
+
+
+class Point:
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return "Point(%d,%d)" % (self.x, self.y)
+
+    def __str__(self):
+        return "(x=%d,y=%d)" % (self.x, self.y)
+
+
+class LatLng:
+    def __init__(self, lt, ln):
+        self.lat = lt
+        self.lng = ln
+
+    def __repr__(self):
+        return "LatLng(%g,%g)" % (self.lat, self.lng)
+
+    def __str__(self):
+        return "(lat=%g,lng=%g)" % (self.lat, self.lng)
+
+
+class MercatorProjection:
+
+    def __init__(self):
+        self.pixelOrigin_ = Point(MERCATOR_RANGE / 2.0, MERCATOR_RANGE / 2.0)
+        self.pixelsPerLonDegree_ = MERCATOR_RANGE / 360.0
+        self.pixelsPerLonRadian_ = MERCATOR_RANGE / (2.0 * math.pi)
+
+    def fromLatLngToPoint(self, latLng, opt_point=None):
+        point = opt_point if opt_point is not None else Point(0, 0)
+        origin = self.pixelOrigin_
+        point.x = origin.x + latLng.lng * self.pixelsPerLonDegree_
+        # NOTE(appleton): Truncating to 0.9999 effectively limits latitude to
+        # 89.189.This is about a third of a tile past the edge of world tile
+        siny = bound(math.sin(degreesToRadians(latLng.lat)), -0.9999, 0.9999)
+        point.y = origin.y + 0.5 * math.log((1 + siny) / (1.0 - siny)) * \
+            -self.pixelsPerLonRadian_
+        return point
+
+    def fromPointToLatLng(self, point):
+        origin = self.pixelOrigin_
+        lng = (point.x - origin.x) / self.pixelsPerLonDegree_
+        latRadians = (point.y - origin.y) / -self.pixelsPerLonRadian_
+        lat = radiansToDegrees(2.0 * math.atan(math.exp(latRadians)) -
+                               math.pi / 2.0)
+        return LatLng(lat, lng)
+
+
+# The projection holds no per call state, one instance is shared
+_projection = None
+
+
+def getProjection():
+    global _projection
+    if _projection is None:
+        _projection = MercatorProjection()
+    return _projection
+
+
+def getPoint(point, center, zoom, mapWidth, mapHeight):
+    scale = 2.0**zoom
+    proj = getProjection()
+    centerP = proj.fromLatLngToPoint(center)
+    centerP.x = centerP.x * scale
+    centerP.y = centerP.y * scale
+    subjectP = proj.fromLatLngToPoint(point)
+    subjectP.x = subjectP.x * scale
+    subjectP.y = subjectP.y * scale
+    return Point((subjectP.x - centerP.x) + mapWidth / 2.0,
+                 (subjectP.y - centerP.y) + mapHeight / 2.0)
+
+
+def getCorners(center, zoom, mapWidth, mapHeight):
+    scale = 2.0**zoom
+    proj = getProjection()
+    centerPx = proj.fromLatLngToPoint(center)
+    SWPoint = Point(centerPx.x - (mapWidth / 2.0) / scale, centerPx.y +
+                    (mapHeight / 2.0) / scale)
+    SWLatLon = proj.fromPointToLatLng(SWPoint)
+    NEPoint = Point(centerPx.x + (mapWidth / 2.0) / scale, centerPx.y -
+                    (mapHeight / 2.0) / scale)
+    NELatLon = proj.fromPointToLatLng(NEPoint)
+    return {
+        'N': NELatLon.lat,
+        'E': NELatLon.lng,
+        'S': SWLatLon.lat,
+        'W': SWLatLon.lng,
+    }
+
+
+# https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames
+
+def getTileXY(latLng, zoom):
+    lat_rad = math.radians(latLng.lat)
+    n = 2.0 ** zoom
+    xtile = (latLng.lng + 180.0) / 360.0 * n
+    ytile = ((1.0 - math.log(math.tan(lat_rad) +
+             (1 / math.cos(lat_rad))) / math.pi) / 2.0 * n)
+    return {
+        'X': xtile,
+        'Y': ytile
+    }
+
+
+# Batch variants, lats and lngs are sequences (or numpy arrays) of the
+# same length. With numpy installed the whole batch is projected in one
+# vectorized pass and numpy arrays are returned, otherwise plain lists.
+
+def _worldPixels(lats, lngs, scale):
+    ppd = MERCATOR_RANGE / 360.0
+    ppr = MERCATOR_RANGE / (2.0 * math.pi)
+    o = MERCATOR_RANGE / 2.0
+    if numpy is not None:
+        lats = numpy.asarray(lats, dtype=float)
+        lngs = numpy.asarray(lngs, dtype=float)
+        siny = numpy.clip(numpy.sin(numpy.radians(lats)), -0.9999, 0.9999)
+        xs = (o + lngs * ppd) * scale
+        ys = (o - 0.5 * numpy.log((1 + siny) / (1.0 - siny)) * ppr) * scale
+        return xs, ys
+    sin = math.sin
+    log = math.log
+    rad = math.pi / 180
+    xs = [(o + lng * ppd) * scale for lng in lngs]
+    ys = []
+    for lat in lats:
+        siny = bound(sin(lat * rad), -0.9999, 0.9999)
+        ys.append((o - 0.5 * log((1 + siny) / (1.0 - siny)) * ppr) * scale)
+    return xs, ys
+
+
+def getPixels(lats, lngs, center, zoom, mapWidth, mapHeight):
+    scale = 2.0**zoom
+    centerP = getProjection().fromLatLngToPoint(center)
+    dx = mapWidth / 2.0 - centerP.x * scale
+    dy = mapHeight / 2.0 - centerP.y * scale
+    xs, ys = _worldPixels(lats, lngs, scale)
+    if numpy is not None:
+        return xs + dx, ys + dy
+    return [x + dx for x in xs], [y + dy for y in ys]
+
+
+def getPoints(latLngs, center, zoom, mapWidth, mapHeight):
+    xs, ys = getPixels([ll.lat for ll in latLngs],
+                       [ll.lng for ll in latLngs],
+                       center, zoom, mapWidth, mapHeight)
+    return [Point(x, y) for x, y in zip(xs, ys)]
+
+
+def getTilesXY(lats, lngs, zoom):
+    n = 2.0 ** zoom
+    if numpy is not None:
+        lat_rad = numpy.radians(numpy.asarray(lats, dtype=float))
+        xs = (numpy.asarray(lngs, dtype=float) + 180.0) / 360.0 * n
+        ys = (1.0 - numpy.arcsinh(numpy.tan(lat_rad)) / math.pi) / 2.0 * n
+        return xs, ys
+    xs = [(lng + 180.0) / 360.0 * n for lng in lngs]
+    ys = [(1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+          for lat in lats]
+    return xs, ys
+
+
+# Tile planning for a map viewport.
+# The viewport is expressed in world pixels at the given zoom, the tile
+# range is the exact set of tiles having at least one visible pixel.
+# Tiles above/below the world edge are not requested, X wraps around
+# the antimeridian.
+
+TILE_SIZE = 256
+
+
+def _tileSpan(start, length):
+    first = int(math.floor(start / TILE_SIZE))
+    last = int(math.ceil((start + length) / TILE_SIZE)) - 1
+    return first, max(first, last)
+
+
+def _snapShift(start, length):
+    # smallest shift (in pixels) of start that lets the viewport
+    # fit in the minimum number of tiles
+    mintiles = int(math.ceil(length / float(TILE_SIZE)))
+    slack = mintiles * TILE_SIZE - length
+    r = start % TILE_SIZE
+    if r <= slack:
+        return 0
+    down = -(r - slack)
+    up = TILE_SIZE - r
+    if abs(down) <= abs(up):
+        return down
+    return up
+
+
+def getTilePlan(center, zoom, mapWidth, mapHeight):
+    scale = 2.0**zoom
+    proj = getProjection()
+    centerP = proj.fromLatLngToPoint(center)
+    cx = centerP.x * scale
+    cy = centerP.y * scale
+    left = cx - mapWidth / 2.0
+    top = cy - mapHeight / 2.0
+    n = int(2**zoom)
+
+    x0, x1 = _tileSpan(left, mapWidth)
+    y0, y1 = _tileSpan(top, mapHeight)
+    tiles = []
+    for y in range(y0, y1 + 1):
+        for x in range(x0, x1 + 1):
+            tile = {"X": x % n, "Y": y,
+                    "col": x - x0, "row": y - y0,
+                    "valid": 0 <= y < n}
+            tiles.append(tile)
+    cols = x1 - x0 + 1
+    rows = y1 - y0 + 1
+    fetched = sum(1 for t in tiles if t["valid"])
+    wasted = 0.0
+    if fetched > 0:
+        wasted = 1.0 - float(mapWidth * mapHeight) / \
+            (fetched * TILE_SIZE * TILE_SIZE)
+
+    dx = _snapShift(left, mapWidth)
+    dy = _snapShift(top, mapHeight)
+    snapped = proj.fromPointToLatLng(Point((cx + dx) / scale,
+                                           (cy + dy) / scale))
+    scols = int(math.ceil(mapWidth / float(TILE_SIZE)))
+    srows = int(math.ceil(mapHeight / float(TILE_SIZE)))
+    if dx == 0:
+        scols = cols
+    if dy == 0:
+        srows = rows
+
+    return {
+        'zoom': zoom,
+        'width': mapWidth,
+        'height': mapHeight,
+        'tiles': tiles,
+        'cols': cols,
+        'rows': rows,
+        'fetched': fetched,
+        # pixel offset of the viewport inside the top left tile
+        'xo': int(left - x0 * TILE_SIZE),
+        'yo': int(top - y0 * TILE_SIZE),
+        'wasted': wasted,
+        'snapped': {
+            'center': snapped,
+            'dx': dx,
+            'dy': dy,
+            'tiles': scols * srows,
+        },
+    }
+
+
+def tilePlanReport(plan):
+    s = plan['snapped']
+    report = "%dx%d @ zoom %d: %d tiles (%dx%d), %.0f%% wasted pixels" % (
+        plan['width'], plan['height'], plan['zoom'], plan['fetched'],
+        plan['cols'], plan['rows'], plan['wasted'] * 100.0)
+    if s['tiles'] < plan['cols'] * plan['rows']:
+        report += ", snapping center to %s (shift %+d,%+d px) " \
+            "would need %d tiles" % (s['center'], s['dx'], s['dy'],
+                                     s['tiles'])
+    return report
+
+
+if __name__ == '__main__':
+    # python GoogleMercatorProjection.py lat lng zoom width height
+    import sys
+    if len(sys.argv) != 6:
+        print("usage: %s lat lng zoom width height" % sys.argv[0])
+        sys.exit(1)
+    plan = getTilePlan(LatLng(float(sys.argv[1]), float(sys.argv[2])),
+                       int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5]))
+    print(tilePlanReport(plan))
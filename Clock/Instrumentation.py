@@ -0,0 +1,377 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Call counts and wall time histograms of the GUI thread callbacks.
+#   @timed('radar.rtick')            on a function or method
+#   with measure('getwx'): ...       around a block
+#   count('icon', hit)                hits and misses of a cache
+# Nothing is recorded until enabled is set, a disabled call only costs
+# one attribute lookup.
+# With Tracing started, each measured call is also a trace event.
+# FrameStats follows the radar animations (frameStats(name) per radar).
+# LagMonitor watches the event loop itself, Timeline the startup, see
+# below.
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+import Tracing
+
+enabled = False
+
+# histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+           0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+
+class Histogram:
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        i = 0
+        while i < len(BUCKETS) and value > BUCKETS[i]:
+            i += 1
+        self.buckets[i] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def percentile(self, p):
+        # upper bound of the bucket holding the p-th percentile
+        if self.count == 0:
+            return 0.0
+        rank = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n > 0:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) \
+                    else self.max
+        return self.max
+
+
+histograms = {}
+totals = {}     # what summary() reset away, for cumulative()
+caches = {}     # name -> [hits, misses]
+lock = threading.Lock()
+
+
+def record(name, seconds):
+    with lock:
+        h = histograms.get(name)
+        if h is None:
+            h = Histogram()
+            histograms[name] = h
+        h.add(seconds)
+
+
+def count(name, hit):
+    if not enabled:
+        return
+    with lock:
+        c = caches.get(name)
+        if c is None:
+            c = [0, 0]
+            caches[name] = c
+        c[0 if hit else 1] += 1
+
+
+def timed(name):
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return f(*args, **kwargs)
+            t = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                record(name, end - t)
+                if Tracing.tracer is not None:
+                    Tracing.tracer.complete(name, t, end)
+        return wrapper
+    return decorator
+
+
+class measure:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            end = time.perf_counter()
+            record(self.name, end - self.start)
+            if Tracing.tracer is not None:
+                Tracing.tracer.complete(self.name, self.start, end)
+        return False
+
+
+def snapshot(reset=False):
+    # {name: Histogram}, a new set is started if reset
+    global histograms
+    with lock:
+        snap = histograms
+        if reset:
+            histograms = {}
+            for name, h in snap.items():
+                if name not in totals:
+                    totals[name] = Histogram()
+                totals[name].merge(h)
+        else:
+            snap = dict(snap)
+    return snap
+
+
+class FrameStats:
+    # Radar animation timing: a frame is planned every period seconds,
+    # pause periods for the first one. Lateness is what a frame came
+    # after its plan, each whole period of it is a timer tick that never
+    # came, a dropped frame. swap is the cost of setPixmap() itself, the
+    # repaint it triggers shows in the event loop lag. Kept since the
+    # start, for the metrics.
+
+    def __init__(self, name, period=0.2, pause=5):
+        self.name = name
+        self.period = period
+        self.pause = pause
+        self.interval = Histogram()
+        self.lateness = Histogram()
+        self.swap = Histogram()
+        self.shown = 0
+        self.late = 0
+        self.dropped = 0
+        self.available = 0
+        self.expected = 0
+        self.last = None
+
+    def restart(self):
+        # the animation was stopped, the gap is not lateness
+        self.last = None
+
+    def frame(self, index, start, end):
+        # index of the frame shown, start and end around the swap
+        if self.last is not None:
+            actual = start - self.last
+            planned = self.period * (self.pause if index == 0 else 1)
+            over = max(0.0, actual - planned)
+            self.interval.add(actual)
+            self.lateness.add(over)
+            if over > self.period / 2:
+                self.late += 1
+            self.dropped += int(over / self.period)
+        self.last = start
+        self.swap.add(end - start)
+        self.shown += 1
+        if Tracing.tracer is not None:
+            Tracing.tracer.complete(self.name + '.swap', start, end)
+
+    def report(self):
+        return "%-8s %6d frames %4d late %4d dropped, lateness p95 " \
+            "%4.0fms max %5.0fms, swap p95 %5.2fms, %d of %d frames" % (
+                self.name, self.shown, self.late, self.dropped,
+                self.lateness.percentile(95) * 1000,
+                self.lateness.max * 1000, self.swap.percentile(95) * 1000,
+                self.available, self.expected)
+
+
+frames = {}
+
+
+def frameStats(name, period=0.2, pause=5):
+    if name not in frames:
+        frames[name] = FrameStats(name, period, pause)
+    return frames[name]
+
+
+def cumulative():
+    # {name: Histogram} since the start, whatever summary() reset
+    with lock:
+        result = {}
+        for source in (totals, histograms):
+            for name, h in source.items():
+                if name not in result:
+                    result[name] = Histogram()
+                result[name].merge(h)
+        return result, dict((name, list(c)) for name, c in caches.items())
+
+
+def summary(reset=True, interval=None):
+    snap = snapshot(reset)
+    lines = []
+    for name in sorted(snap, key=lambda n: -snap[n].total):
+        h = snap[name]
+        line = "%-24s %6d calls %9.1fms total %7.2fms p50 %7.2fms p95 %7.1fms max" % (
+            name, h.count, h.total * 1000, h.percentile(50) * 1000,
+            h.percentile(95) * 1000, h.max * 1000)
+        if interval:
+            line += " %5.1f%%" % (h.total / interval * 100)
+        lines.append(line)
+    return lines
+
+
+class LagMonitor:
+    # beat() is called by a timer of the GUI thread (tick(), every
+    # second): the drift of its firing is the event loop lag.
+    # A watchdog thread checks that the beats keep coming, when the loop
+    # is stuck for more than threshold seconds the stack of the GUI
+    # thread is printed, once per stall, to show what is blocking it.
+
+    def __init__(self, period=1.0, threshold=3.0, check=0.5):
+        self.period = period
+        self.threshold = threshold
+        self.check = check
+        self.hist = Histogram()
+        self.last = None
+        self.stalls = 0
+        self.stalled = False
+        self.thread = threading.main_thread()
+        self.watchdog = None
+        self.stop = threading.Event()
+
+    def beat(self, now=None):
+        now = now if now is not None else time.monotonic()
+        last = self.last
+        self.last = now
+        if last is None:
+            return
+        lag = max(0.0, now - last - self.period)
+        self.hist.add(lag)
+        if self.stalled:
+            self.stalled = False
+            print("GUI thread stall ended after %.1fs" % (now - last))
+
+    def start(self):
+        self.watchdog = threading.Thread(target=self.watch, daemon=True,
+                                         name='lag-watchdog')
+        self.watchdog.start()
+
+    def watch(self):
+        while not self.stop.wait(self.check):
+            last = self.last
+            if last is None or self.stalled:
+                continue
+            late = time.monotonic() - last
+            if late > self.period + self.threshold:
+                self.stalled = True
+                self.stalls += 1
+                print("GUI thread stalled for %.1fs, it is at:\n%s" % (
+                    late, self.stack()))
+
+    def stack(self):
+        frame = sys._current_frames().get(self.thread.ident)
+        if frame is None:
+            return "  (no frame)"
+        return ''.join(traceback.format_stack(frame)).rstrip()
+
+    def report(self):
+        h = self.hist
+        return "event loop lag: %d beats p50 %.0fms p95 %.0fms p99 %.0fms " \
+            "max %.0fms, %d stalls" % (
+                h.count, h.percentile(50) * 1000, h.percentile(95) * 1000,
+                h.percentile(99) * 1000, h.max * 1000, self.stalls)
+
+
+def processStart():
+    # wall clock time the process was started at, from /proc on Linux
+    try:
+        with open('/proc/self/stat') as f:
+            # the command name may hold spaces, fields start after ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        started = float(fields[19]) / os.sysconf('SC_CLK_TCK')
+        return time.time() - (uptime - started)
+    except (IOError, OSError, ValueError, IndexError):
+        return time.time()
+
+
+class Timeline:
+    # Time stamps of the startup phases, from the start of the process.
+    # Each name is only marked once, the report is made when all the
+    # milestones are reached (or by a timeout of the caller).
+
+    def __init__(self, milestones=()):
+        self.start = processStart()
+        self.marks = []
+        self.names = set()
+        self.milestones = list(milestones)
+        self.done = False
+
+    def mark(self, name):
+        if name in self.names or self.done:
+            return False
+        self.names.add(name)
+        self.marks.append((name, time.time() - self.start))
+        return True
+
+    def complete(self):
+        return all(m in self.names for m in self.milestones)
+
+    def report(self):
+        lines = []
+        last = 0.0
+        for name, t in self.marks:
+            lines.append("%8.0fms %+8.0fms  %s" % (t * 1000, (t - last) * 1000,
+                                                  name))
+            last = t
+        for m in self.milestones:
+            if m not in self.names:
+                lines.append("          not reached  " + m)
+        return lines
+
+    def export(self, path, extra=None):
+        doc = {
+            'process_start': self.start,
+            'marks': [{'name': name, 'ms': round(t * 1000, 1)}
+                      for name, t in self.marks],
+            'milestones': dict((name, round(t * 1000, 1))
+                               for name, t in self.marks
+                               if name in self.milestones),
+        }
+        if extra:
+            doc.update(extra)
+        with open(path, 'w') as f:
+            json.dump(doc, f, indent=1)
+
+
+timeline = Timeline(('first paint', 'weather', 'radar animation'))
@@ -0,0 +1,121 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Local basemap tile sources, so the radar maps can be drawn without
+# any network access or map API key.
+#   - MBTiles: a single SQLite file, https://github.com/mapbox/mbtiles-spec
+#   - XYZ: a directory laid out as {z}/{x}/{y}.png (or .jpg / .webp),
+#     or a path template containing {z}, {x} and {y}
+import os
+import sqlite3
+import hashlib
+
+TILE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+class MBTilesSource:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect('file:' + path + '?mode=ro', uri=True)
+
+    def tile(self, zoom, x, y):
+        # MBTiles rows are numbered from the bottom (TMS)
+        row = (2 ** zoom) - 1 - y
+        cur = self.db.execute(
+            'SELECT tile_data FROM tiles '
+            'WHERE zoom_level=? AND tile_column=? AND tile_row=?',
+            (zoom, x, row))
+        r = cur.fetchone()
+        if r is None:
+            return None
+        return bytes(r[0])
+
+    def mtime(self, zoom, x, y):
+        # any change to the tiles rewrites the file
+        return os.path.getmtime(self.path)
+
+    def close(self):
+        self.db.close()
+
+
+class XYZSource:
+    def __init__(self, path):
+        self.path = path
+
+    def names(self, zoom, x, y):
+        if '{z}' in self.path:
+            return [self.path.format(z=zoom, x=x, y=y)]
+        base = os.path.join(self.path, str(zoom), str(x), str(y))
+        return [base + ext for ext in TILE_EXTENSIONS]
+
+    def tile(self, zoom, x, y):
+        for name in self.names(zoom, x, y):
+            try:
+                with open(name, 'rb') as f:
+                    return f.read()
+            except (IOError, OSError):
+                pass
+        return None
+
+    def mtime(self, zoom, x, y):
+        # a directory mtime does not follow the tiles deeper in the tree,
+        # each tile file is looked at
+        newest = 0
+        for name in self.names(zoom, x, y):
+            try:
+                newest = max(newest, os.path.getmtime(name))
+            except OSError:
+                pass
+        return newest
+
+    def close(self):
+        pass
+
+
+def openTileSource(path):
+    if path.lower().endswith('.mbtiles'):
+        if not os.path.isfile(path):
+            raise IOError("MBTiles file '%s' not found" % path)
+        return MBTilesSource(path)
+    if '{z}' not in path and not os.path.isdir(path):
+        raise IOError("tile directory '%s' not found" % path)
+    return XYZSource(path)
+
+
+def tilesMtime(source, zoom, tiles):
+    # newest mtime of the tiles a stitch is made of
+    newest = 0
+    for tile in tiles:
+        if tile["valid"]:
+            newest = max(newest, source.mtime(zoom, tile["X"], tile["Y"]))
+    return newest
+
+
+def stitchedName(path, plan, mtime, cachedir='cache'):
+    # the stitched basemap depends on the tile pack and the viewport,
+    # mtime is the one of the newest tile used (tilesMtime), an updated
+    # tile gives a new cache entry
+    first = {'X': 0, 'Y': 0}
+    if plan['tiles']:
+        first = plan['tiles'][0]
+    key = "%s|%s|%d|%dx%d|%d,%d|%d,%d" % (
+        os.path.abspath(path), mtime, plan['zoom'],
+        plan['width'], plan['height'], first['X'], first['Y'],
+        plan['xo'], plan['yo'])
+    return os.path.join(cachedir, 'basemap-' +
+                        hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] +
+                        '.png')
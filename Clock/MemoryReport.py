@@ -0,0 +1,106 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Periodic memory report (Config.memory_report): process RSS, the top
+# Python allocators from tracemalloc (growth since the last report), and
+# tallies of what the clock holds (radar frames, pixmaps, slides...)
+# given by the caller. A value that grew at every one of the last
+# reports is flagged, that is what a leak looks like over weeks.
+import collections
+import os
+import resource
+import tracemalloc
+
+
+def rss():
+    # resident set size in bytes
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        # ru_maxrss is the peak, in kB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def mb(n):
+    return "%.1fMB" % (n / 1048576.0)
+
+
+class MemoryMonitor:
+
+    def __init__(self, top=10, growth=6, frames=1):
+        self.top = top
+        self.growth = growth
+        self.history = {}
+        self.snapshot = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def growing(self, name, value):
+        h = self.history.get(name)
+        if h is None:
+            h = collections.deque(maxlen=self.growth)
+            self.history[name] = h
+        h.append(value)
+        if len(h) < self.growth:
+            return False
+        return all(b > a for a, b in zip(h, list(h)[1:]))
+
+    def report(self, tallies):
+        # tallies: {name: (count, bytes)}, returns the lines to log
+        lines = []
+        warnings = []
+        r = rss()
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append("RSS %s, Python heap %s (peak %s)" % (
+            mb(r), mb(current), mb(peak)))
+        if self.growing('rss', r):
+            warnings.append('RSS')
+        if self.growing('heap', current):
+            warnings.append('Python heap')
+        for name in sorted(tallies):
+            count, size = tallies[name]
+            lines.append("  %-20s %6d held %10s" % (name, count, mb(size)))
+            # both series get their sample at every report
+            bigger = self.growing(name, size)
+            more = self.growing(name + '#', count)
+            if bigger or more:
+                warnings.append(name)
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>')))
+        if self.snapshot is not None:
+            lines.append("  top allocators growth since last report:")
+            stats = snapshot.compare_to(self.snapshot, 'lineno')
+            for stat in stats[:self.top]:
+                frame = stat.traceback[0]
+                lines.append("    %+9.1fkB %8.1fkB %s:%d" % (
+                    stat.size_diff / 1024.0, stat.size / 1024.0,
+                    os.path.basename(frame.filename), frame.lineno))
+        else:
+            lines.append("  top allocators:")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                frame = stat.traceback[0]
+                lines.append("    %9.1fkB %s:%d" % (
+                    stat.size / 1024.0, os.path.basename(frame.filename),
+                    frame.lineno))
+        self.snapshot = snapshot
+        for name in warnings:
+            lines.append("WARNING: %s grew at each of the last %d reports" % (
+                name, self.growth))
+        return lines
@@ -0,0 +1,138 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Prometheus text format metrics on http://<bind>:<port>/metrics
+# (Config.metrics_port). The page is built by the GUI thread on a timer,
+# where all the state lives, and the HTTP thread only hands out the last
+# page: a scrape never touches the clock nor waits for the event loop.
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Instrumentation import BUCKETS
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+class MetricsPage:
+    # collects the samples, each metric name gets its HELP and TYPE once
+
+    def __init__(self, prefix='pws_'):
+        self.prefix = prefix
+        self.lines = []
+        self.declared = set()
+
+    def declare(self, name, kind, help):
+        if name not in self.declared:
+            self.declared.add(name)
+            self.lines.append('# HELP %s %s' % (name, help))
+            self.lines.append('# TYPE %s %s' % (name, kind))
+
+    def sample(self, name, value, labels=None):
+        if labels:
+            name += '{' + ','.join('%s="%s"' % (k, escape(v))
+                                   for k, v in sorted(labels.items())) + '}'
+        self.lines.append('%s %s' % (name, repr(float(value))))
+
+    def gauge(self, name, value, labels=None, help=''):
+        name = self.prefix + name
+        self.declare(name, 'gauge', help or name)
+        self.sample(name, value, labels)
+
+    def counter(self, name, value, labels=None, help=''):
+        name = self.prefix + name + '_total'
+        self.declare(name, 'counter', help or name)
+        self.sample(name, value, labels)
+
+    def histogram(self, name, hist, labels=None, help=''):
+        # hist is an Instrumentation.Histogram, in seconds
+        name = self.prefix + name
+        self.declare(name, 'histogram', help or name)
+        labels = dict(labels or {})
+        seen = 0
+        for i, bound in enumerate(BUCKETS):
+            seen += hist.buckets[i]
+            labels['le'] = repr(bound)
+            self.sample(name + '_bucket', seen, labels)
+        labels['le'] = '+Inf'
+        self.sample(name + '_bucket', hist.count, labels)
+        del labels['le']
+        self.sample(name + '_sum', hist.total, labels)
+        self.sample(name + '_count', hist.count, labels)
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    server_version = 'PiWeatherStation'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.server.page().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer:
+
+    def __init__(self, bind='127.0.0.1', port=9105):
+        self.bind = bind
+        self.port = port
+        self.lock = threading.Lock()
+        self.current = '# no metrics yet\n'
+        self.httpd = None
+
+    def publish(self, text):
+        with self.lock:
+            self.current = text
+
+    def page(self):
+        with self.lock:
+            return self.current
+
+    def start(self):
+        try:
+            self.httpd = ThreadingHTTPServer((self.bind, self.port),
+                                             MetricsHandler)
+        except OSError as e:
+            print("metrics endpoint not started : " + str(e))
+            return False
+        self.httpd.daemon_threads = True
+        self.httpd.page = self.page
+        threading.Thread(target=self.httpd.serve_forever, daemon=True,
+                         name='metrics').start()
+        print("metrics on http://%s:%d/metrics" % (self.bind, self.port))
+        return True
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -0,0 +1,130 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Compares the two MQTT integration modes (Config.mqtt_mode) against a
+# real broker: latency from publish to the handling in the GUI thread,
+# and CPU time per message.
+# usage: python MqttBench.py [host] [messages] [rate per second]
+# The publisher runs in the same process, its CPU time is in both runs.
+import sys
+import time
+import json
+import threading
+import resource
+import uuid
+
+import paho.mqtt.client as mqtt
+from PyQt5 import QtCore
+
+from MqttLoop import QtMqttLoop
+
+TOPIC = 'piweatherstation/bench/' + uuid.uuid4().hex[:8]
+
+
+class Relay(QtCore.QObject):
+    # the thread mode hop: network thread -> queued signal -> GUI thread
+    message = QtCore.pyqtSignal(object)
+
+
+def cputime():
+    r = resource.getrusage(resource.RUSAGE_SELF)
+    return r.ru_utime + r.ru_stime
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))]
+
+
+def publish(host, count, rate, ready):
+    pub = mqtt.Client()
+    pub.connect(host)
+    pub.loop_start()
+    ready.wait(10)
+    for i in range(count):
+        payload = json.dumps({'t': time.perf_counter(), 'temperature': 20.0})
+        pub.publish(TOPIC, payload, qos=1)
+        time.sleep(1.0 / rate)
+    time.sleep(0.5)
+    pub.loop_stop()
+    pub.disconnect()
+
+
+def run(app, mode, host, count, rate):
+    latencies = []
+    ready = threading.Event()
+
+    def handle(payload):
+        latencies.append(time.perf_counter() - json.loads(payload)['t'])
+        if len(latencies) >= count:
+            app.quit()
+
+    client = mqtt.Client(clean_session=True)
+    client.connect_async(host)
+    client.on_connect = lambda c, u, f, rc: (c.subscribe(TOPIC, 1),
+                                             ready.set())
+    loop = None
+    if mode == 'qt':
+        client.on_message = lambda c, u, msg: handle(msg.payload)
+        loop = QtMqttLoop(client)
+        loop.start()
+    else:
+        relay = Relay()
+        relay.message.connect(handle)
+        client.on_message = lambda c, u, msg: relay.message.emit(msg.payload)
+        client.loop_start()
+
+    publisher = threading.Thread(target=publish,
+                                 args=(host, count, rate, ready))
+    # one timer per run, a leftover timeout would end the next run
+    timeout = QtCore.QTimer()
+    timeout.setSingleShot(True)
+    timeout.timeout.connect(app.quit)
+    timeout.start(int(count / rate * 1000) + 10000)
+    cpu = cputime()
+    start = time.perf_counter()
+    publisher.start()
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    timeout.stop()
+    cpu = cputime() - cpu
+    publisher.join()
+    if loop is not None:
+        loop.stop()
+    else:
+        client.loop_stop()
+        client.disconnect()
+
+    n = max(1, len(latencies))
+    print("%-6s %6d msgs  latency p50 %6.2fms  p95 %6.2fms  max %6.2fms  "
+          "cpu %5.3fms/msg (%4.1f%% over %.1fs)" % (
+              mode, len(latencies),
+              percentile(latencies, 50) * 1000,
+              percentile(latencies, 95) * 1000,
+              max(latencies or [0]) * 1000,
+              cpu / n * 1000, cpu / elapsed * 100, elapsed))
+
+
+if __name__ == '__main__':
+    host = sys.argv[1] if len(sys.argv) > 1 else 'localhost'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 200
+    app = QtCore.QCoreApplication(sys.argv)
+    for mode in ('thread', 'qt'):
+        run(app, mode, host, count, rate)
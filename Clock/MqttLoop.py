@@ -0,0 +1,160 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Runs a paho MQTT client on the Qt event loop instead of its own network
+# thread (loop_start()). The socket is watched by QSocketNotifiers which
+# call loop_read() and loop_write(), and a timer calls loop_misc() for the
+# keepalive. The paho callbacks are then called in the GUI thread.
+# paho tells when it has data to write through on_socket_register_write,
+# and when the socket goes away through on_socket_close, the connection
+# is then retried with a doubling delay.
+# The connection itself (DNS lookup, TCP connect) blocks, it is made in a
+# short lived thread. The paho socket callbacks may then come from that
+# thread, they only emit signals and the notifiers are made and touched
+# in the GUI thread.
+import threading
+
+from PyQt5 import QtCore
+
+
+class QtMqttLoop(QtCore.QObject):
+    opened = QtCore.pyqtSignal(object)
+    closed = QtCore.pyqtSignal()
+    writing = QtCore.pyqtSignal(bool)
+    connectDone = QtCore.pyqtSignal(str)    # '' or the error
+
+    def __init__(self, client, backoff=(1, 120), parent=None):
+        super(QtMqttLoop, self).__init__(parent)
+        self.client = client
+        self.backoff = backoff
+        self.delay = backoff[0]
+        self.stopped = True
+        self.connecting = False
+        self.wantWrite = False
+        self.rnotifier = None
+        self.wnotifier = None
+        self.misc = QtCore.QTimer(self)
+        self.misc.timeout.connect(self.doMisc)
+        self.retry = QtCore.QTimer(self)
+        self.retry.setSingleShot(True)
+        self.retry.timeout.connect(self.reconnect)
+        self.opened.connect(self.watch)
+        self.closed.connect(self.unwatch)
+        self.writing.connect(self.setWriting)
+        self.connectDone.connect(self.connectFinished)
+        client.on_socket_open = self.socketOpen
+        client.on_socket_close = self.socketClose
+        client.on_socket_register_write = self.registerWrite
+        client.on_socket_unregister_write = self.unregisterWrite
+
+    def start(self):
+        # connect_async() must have been called, for the host and port
+        self.stopped = False
+        self.reconnect()
+
+    def stop(self):
+        self.stopped = True
+        self.retry.stop()
+        self.client.disconnect()
+
+    def reconnect(self):
+        if self.stopped or self.connecting:
+            return
+        self.connecting = True
+        threading.Thread(target=self.connectThread, daemon=True,
+                         name='mqtt-connect').start()
+
+    def connectThread(self):
+        try:
+            self.client.reconnect()
+        except (OSError, ValueError) as e:
+            self.connectDone.emit(str(e) or e.__class__.__name__)
+            return
+        self.connectDone.emit('')
+
+    def connectFinished(self, error):
+        self.connecting = False
+        if error:
+            print("MQTT connection failed (" + error + "), retrying in " +
+                  str(self.delay) + "s")
+            self.scheduleRetry()
+            return
+        if self.stopped:
+            self.client.disconnect()
+            return
+        self.misc.start(1000)
+
+    def scheduleRetry(self):
+        self.misc.stop()
+        if self.stopped:
+            return
+        self.retry.start(int(self.delay * 1000))
+        self.delay = min(self.delay * 2, self.backoff[1])
+
+    # paho callbacks, in the connect thread or the GUI thread
+    def socketOpen(self, client, userdata, sock):
+        self.opened.emit(sock)
+
+    def socketClose(self, client, userdata, sock):
+        self.closed.emit()
+
+    def registerWrite(self, client, userdata, sock):
+        self.writing.emit(True)
+
+    def unregisterWrite(self, client, userdata, sock):
+        self.writing.emit(False)
+
+    def watch(self, sock):
+        if sock.fileno() < 0:
+            # already closed again, unwatch() is on its way
+            return
+        self.rnotifier = QtCore.QSocketNotifier(
+            sock.fileno(), QtCore.QSocketNotifier.Read, self)
+        self.rnotifier.activated.connect(self.doRead)
+        self.wnotifier = QtCore.QSocketNotifier(
+            sock.fileno(), QtCore.QSocketNotifier.Write, self)
+        self.wnotifier.setEnabled(self.wantWrite)
+        self.wnotifier.activated.connect(self.doWrite)
+
+    def unwatch(self):
+        for notifier in (self.rnotifier, self.wnotifier):
+            if notifier is not None:
+                notifier.setEnabled(False)
+                notifier.deleteLater()
+        self.rnotifier = None
+        self.wnotifier = None
+        # a connection attempt closes the previous socket itself, and
+        # retries on its own when it fails
+        if not self.connecting:
+            self.scheduleRetry()
+
+    def setWriting(self, on):
+        self.wantWrite = on
+        if self.wnotifier is not None:
+            self.wnotifier.setEnabled(on)
+
+    # a failed loop_*() closes the socket, socketClose() takes it from there
+    def doRead(self):
+        self.client.loop_read()
+
+    def doWrite(self):
+        self.client.loop_write()
+
+    def doMisc(self):
+        self.client.loop_misc()
+        if self.client.is_connected():
+            self.delay = self.backoff[0]
@@ -0,0 +1,280 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Recording and replay of MQTT traffic, to load the sensor handling
+# without the real devices.
+# File: MAGIC, then one record per message
+#   <d time> <H topic id> <I payload length> [<H length> topic] payload
+# the topic text is only written the first time its id is used.
+# The clock records with Config.mqtt_record, and replays a file into its
+# own MqttClient.on_message with Config.mqtt_replay. From the command line:
+#   python MqttReplay.py record <host> <file> [topic ...]
+#   python MqttReplay.py play <file> <host> [speed]
+#   python MqttReplay.py synth <file> <devices> [minutes]
+#   python MqttReplay.py info <file>
+# speed is 1 for real time, N for N times faster, 0 for as fast as possible
+import sys
+import json
+import random
+import struct
+import threading
+import time
+
+MAGIC = b'PWSMQR1\n'
+RECORD = struct.Struct('<dHI')
+LENGTH = struct.Struct('<H')
+
+
+class MqttRecorder:
+    # write() is called from the MQTT network thread
+
+    def __init__(self, path):
+        self.f = open(path, 'wb')
+        self.f.write(MAGIC)
+        self.lock = threading.Lock()
+        self.topics = {}
+        self.count = 0
+
+    def write(self, topic, payload, t=None):
+        t = t if t is not None else time.time()
+        with self.lock:
+            if self.f is None:
+                return
+            tid = self.topics.get(topic)
+            if tid is None:
+                tid = len(self.topics)
+                self.topics[topic] = tid
+                name = topic.encode('utf-8')
+                self.f.write(RECORD.pack(t, tid, len(payload)) +
+                             LENGTH.pack(len(name)) + name)
+            else:
+                self.f.write(RECORD.pack(t, tid, len(payload)))
+            self.f.write(payload)
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.f.close()
+            self.f = None
+
+
+def readRecords(path):
+    # yields (time, topic, payload bytes). A recording cut inside a record
+    # (crash or power loss while recording) ends at the last whole one.
+    topics = []
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("'%s' is not an MQTT recording" % path)
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            t, tid, size = RECORD.unpack(head)
+            if tid == len(topics):
+                length = f.read(LENGTH.size)
+                if len(length) < LENGTH.size:
+                    return
+                n = LENGTH.unpack(length)[0]
+                name = f.read(n)
+                if len(name) < n:
+                    return
+                topics.append(name.decode('utf-8', 'replace'))
+            elif tid > len(topics):
+                raise ValueError("'%s' is corrupted, unknown topic %d" % (
+                    path, tid))
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+            yield t, topics[tid], payload
+
+
+class ReplayMessage:
+    # what on_message uses of a paho MQTTMessage
+    __slots__ = ('topic', 'payload', 'qos', 'retain')
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+        self.qos = 0
+        self.retain = False
+
+
+def replay(records, deliver, speed=1.0, stop=None):
+    # calls deliver(topic, payload) keeping the recorded spacing divided
+    # by speed, returns the number of messages
+    first = None
+    start = time.monotonic()
+    count = 0
+    for t, topic, payload in records:
+        if stop is not None and stop.is_set():
+            break
+        if first is None:
+            first = t
+        if speed > 0:
+            wait = start + (t - first) / speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        deliver(topic, payload)
+        count += 1
+    return count
+
+
+class ReplayStats:
+    # latency from the MQTT message to the end of its handling, and the
+    # time spent handling it in the GUI thread
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = []
+        self.guitime = []
+
+    def add(self, latency, guitime):
+        with self.lock:
+            self.latency.append(latency)
+            self.guitime.append(guitime)
+
+    def report(self, elapsed=None):
+        with self.lock:
+            latency = sorted(self.latency)
+            guitime = sorted(self.guitime)
+        if not latency:
+            return "no reading handled"
+
+        def pct(values, p):
+            return values[min(len(values) - 1, int(len(values) * p / 100.0))] * 1000
+
+        s = "%d readings handled" % len(latency)
+        if elapsed:
+            s += " in %.1fs (%.0f/s)" % (elapsed, len(latency) / elapsed)
+        s += ", latency p50 %.1fms p95 %.1fms max %.1fms" % (
+            pct(latency, 50), pct(latency, 95), latency[-1] * 1000)
+        s += ", GUI time p50 %.2fms p95 %.2fms total %.0fms" % (
+            pct(guitime, 50), pct(guitime, 95), sum(guitime) * 1000)
+        return s
+
+
+class Replayer(threading.Thread):
+
+    def __init__(self, path, deliver, speed=1.0, stats=None):
+        super(Replayer, self).__init__(daemon=True)
+        self.path = path
+        self.deliver = deliver
+        self.speed = speed
+        self.stats = stats
+        self.stop = threading.Event()
+
+    def run(self):
+        start = time.monotonic()
+        try:
+            count = replay(readRecords(self.path), self.deliver, self.speed,
+                           self.stop)
+        except (IOError, ValueError) as e:
+            print("MQTT replay error : " + str(e))
+            return
+        elapsed = time.monotonic() - start
+        print("MQTT replay : %d messages sent in %.1fs" % (count, elapsed))
+        if self.stats is not None:
+            # let the GUI thread drain what is still queued
+            time.sleep(2)
+            print("MQTT replay : " + self.stats.report(elapsed))
+
+
+def synthesize(path, devices, minutes=10, interval=60.0):
+    # Aqara like readings from many devices, for load tests without them
+    rec = MqttRecorder(path)
+    t0 = time.time()
+    events = []
+    for d in range(devices):
+        t = random.uniform(0, interval)
+        while t < minutes * 60:
+            events.append((t0 + t, d))
+            t += random.uniform(interval * 0.5, interval * 1.5)
+    events.sort()
+    for t, d in events:
+        payload = json.dumps({
+            'temperature': round(random.uniform(15, 25), 2),
+            'humidity': round(random.uniform(30, 70), 2),
+            'pressure': round(random.uniform(990, 1030), 1),
+            'linkquality': random.randint(20, 255),
+            'voltage': random.randint(2800, 3100),
+            'battery': random.randint(10, 100)}).encode('utf-8')
+        rec.write('zigbee/sensor%d' % (d + 1), payload, t)
+    rec.close()
+    return len(events)
+
+
+def main(argv):
+    if len(argv) < 3:
+        print("usage: MqttReplay.py record|play|synth|info ...")
+        return 1
+    cmd = argv[1]
+    if cmd == 'info':
+        topics = {}
+        first = last = None
+        size = 0
+        for t, topic, payload in readRecords(argv[2]):
+            topics[topic] = topics.get(topic, 0) + 1
+            first = t if first is None else first
+            last = t
+            size += len(payload)
+        n = sum(topics.values())
+        print("%d messages, %d topics, %d payload bytes, %.0fs" % (
+            n, len(topics), size, (last - first) if n else 0))
+        for topic in sorted(topics):
+            print("  %6d %s" % (topics[topic], topic))
+        return 0
+    if cmd == 'synth':
+        n = synthesize(argv[2], int(argv[3]),
+                       float(argv[4]) if len(argv) > 4 else 10)
+        print("%d messages written to %s" % (n, argv[2]))
+        return 0
+
+    import paho.mqtt.client as mqtt
+    if cmd == 'record':
+        rec = MqttRecorder(argv[3])
+        topics = argv[4:] or ['#']
+        c = mqtt.Client()
+        c.on_connect = lambda c, u, f, rc: [c.subscribe(t) for t in topics]
+        c.on_message = lambda c, u, msg: rec.write(msg.topic, msg.payload)
+        c.connect(argv[2])
+        try:
+            c.loop_forever()
+        except KeyboardInterrupt:
+            pass
+        rec.close()
+        print("%d messages recorded" % rec.count)
+        return 0
+    if cmd == 'play':
+        c = mqtt.Client()
+        c.connect(argv[3])
+        c.loop_start()
+        speed = float(argv[4]) if len(argv) > 4 else 1.0
+        start = time.monotonic()
+        n = replay(readRecords(argv[2]),
+                   lambda topic, payload: c.publish(topic, payload), speed)
+        print("%d messages published in %.1fs" % (
+            n, time.monotonic() - start))
+        time.sleep(1)
+        c.loop_stop()
+        c.disconnect()
+        return 0
+    print("unknown command " + cmd)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,337 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Prioritized download queue on top of a QNetworkAccessManager.
+# Only a few requests are in flight at once, what is on screen goes first.
+# Low priority (hidden) work is deferred while anything more important is
+# waiting, and is aborted and re-queued if a slot is needed right away.
+# With a NetworkUsage set as usage, every request is accounted to its
+# provider and refused when the daily quota of the provider is used.
+# While Tracing runs, each download is an async span of the trace.
+import heapq
+import itertools
+import time
+
+from PyQt5 import QtCore
+from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
+
+import Tracing
+
+# priority classes, lower is more important
+PRIO_WEATHER = 0         # current conditions and forecast
+PRIO_RADAR_NEWEST = 1    # basemap and newest frame of a visible radar
+PRIO_RADAR_HISTORY = 2   # older frames of a visible radar
+PRIO_HIDDEN = 3          # anything for a radar that is not on screen
+PRIO_BACKGROUND = 4
+
+# link quality levels given by the BandwidthEstimator
+LINK_GOOD = 0
+LINK_POOR = 1
+LINK_BAD = 2
+LINK_VERY_BAD = 3
+
+# errors that say something about the link, an HTTP error status (a
+# missing tile, a provider 503) does not
+TRANSPORT_ERRORS = (
+    QNetworkReply.ConnectionRefusedError,
+    QNetworkReply.RemoteHostClosedError,
+    QNetworkReply.HostNotFoundError,
+    QNetworkReply.TimeoutError,
+    QNetworkReply.TemporaryNetworkFailureError,
+    QNetworkReply.NetworkSessionFailedError,
+    QNetworkReply.UnknownNetworkError,
+    QNetworkReply.ProxyConnectionClosedError,
+    QNetworkReply.ProxyTimeoutError,
+)
+
+
+class BandwidthEstimator:
+    # Link throughput is measured over the time at least one download is
+    # in flight (so parallel downloads are not counted as a slow link),
+    # latency is the time until the response headers come back.
+    # Going down a level is immediate, going back up needs the link to be
+    # comfortably better for a few samples in a row.
+
+    def __init__(self, thresholds=(100000, 30000, 10000), maxLatency=2.0,
+                 alpha=0.3, recover=3):
+        self.thresholds = thresholds   # bytes/s for good, poor, bad
+        self.maxLatency = maxLatency   # seconds
+        self.alpha = alpha
+        self.recover = recover
+        self.throughput = None
+        self.latency = None
+        self.level = LINK_GOOD
+        self.better = 0
+        self.busyStart = None
+        self.busyTime = 0.0
+        self.bytes = 0
+        self.samples = 0
+
+    def ewma(self, old, value):
+        if old is None:
+            return float(value)
+        return old + self.alpha * (value - old)
+
+    def busy(self, now=None):
+        if self.busyStart is None:
+            self.busyStart = now if now is not None else time.monotonic()
+
+    def idle(self, now=None):
+        if self.busyStart is not None:
+            now = now if now is not None else time.monotonic()
+            self.busyTime += now - self.busyStart
+            self.busyStart = None
+
+    def addLatency(self, seconds):
+        self.latency = self.ewma(self.latency, seconds)
+
+    def addBytes(self, nbytes, now=None):
+        now = now if now is not None else time.monotonic()
+        self.bytes += nbytes
+        busy = self.busyTime
+        if self.busyStart is not None:
+            busy += now - self.busyStart
+        # too short to say anything about the link
+        if busy < 0.5 or self.bytes < 16384:
+            return
+        self.throughput = self.ewma(self.throughput, self.bytes / busy)
+        self.samples += 1
+        self.bytes = 0
+        self.busyTime = 0.0
+        if self.busyStart is not None:
+            self.busyStart = now
+        self.update()
+
+    def addFailure(self):
+        # a failed download counts as a very slow one
+        self.throughput = self.ewma(self.throughput, 0)
+        self.samples += 1
+        self.update()
+
+    def measuredLevel(self, margin=1.0):
+        level = len(self.thresholds)
+        for i, t in enumerate(self.thresholds):
+            if self.throughput >= t * margin:
+                level = i
+                break
+        if self.latency is not None and \
+                self.latency * margin > self.maxLatency:
+            level = min(level + 1, LINK_VERY_BAD)
+        return level
+
+    def update(self):
+        if self.throughput is None:
+            return
+        level = self.measuredLevel()
+        if level > self.level:
+            self.level = level
+            self.better = 0
+        elif level < self.level:
+            # recover one level at a time, with some margin
+            if self.measuredLevel(1.5) < self.level:
+                self.better += 1
+                if self.better >= self.recover:
+                    self.level -= 1
+                    self.better = 0
+            else:
+                self.better = 0
+        else:
+            self.better = 0
+
+
+class QueuedReply(QtCore.QObject):
+    # Stands for the QNetworkReply until the request is actually sent,
+    # it has the same finished signal, error() and readAll()
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, request, priority, owner, seq, provider='other',
+                 tag=None):
+        super(QueuedReply, self).__init__()
+        self.request = request
+        self.priority = priority
+        self.owner = owner
+        self.seq = seq
+        self.provider = provider
+        self.tag = tag      # what the owner needs to re-rank it
+        self.reply = None
+        self.canceled = False
+        self.refused = False
+        self.counted = False    # against the quota, once even if preempted
+        self.span = None        # open trace span of the download
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def error(self):
+        if self.reply is None:
+            return QNetworkReply.OperationCanceledError
+        return self.reply.error()
+
+    def readAll(self):
+        if self.reply is None:
+            return QtCore.QByteArray()
+        return self.reply.readAll()
+
+    def url(self):
+        return self.request.url()
+
+
+class DownloadQueue(QtCore.QObject):
+
+    def __init__(self, manager, maxActive=4, parent=None):
+        super(DownloadQueue, self).__init__(parent)
+        self.manager = manager
+        self.maxActive = max(1, maxActive)
+        self.pending = []
+        self.active = []
+        self.counter = itertools.count()
+        self.preempted = 0
+        self.estimator = BandwidthEstimator()
+        self.usage = None
+
+    def get(self, request, priority=PRIO_BACKGROUND, owner=None,
+            provider='other', tag=None):
+        handle = QueuedReply(request, priority, owner, next(self.counter),
+                             provider, tag)
+        heapq.heappush(self.pending, handle)
+        self.schedule()
+        return handle
+
+    def setPriority(self, owner, priority):
+        # re-rank the requests of owner still waiting in the queue,
+        # priority may be a function giving the priority of each handle
+        changed = False
+        for handle in self.pending:
+            if handle.owner is not owner:
+                continue
+            p = priority(handle) if callable(priority) else priority
+            if handle.priority != p:
+                handle.priority = p
+                changed = True
+        if changed:
+            heapq.heapify(self.pending)
+            self.schedule()
+
+    def cancel(self, handle):
+        if handle in self.pending:
+            self.pending.remove(handle)
+            heapq.heapify(self.pending)
+        elif handle in self.active:
+            handle.canceled = True
+            handle.reply.abort()
+
+    def schedule(self):
+        while self.pending:
+            top = self.pending[0]
+            if len(self.active) >= self.maxActive:
+                if not self.preempt(top.priority):
+                    return
+            # keep one slot free for important work, hidden downloads
+            # only use it when nothing else is in flight
+            if top.priority >= PRIO_HIDDEN and self.active and \
+                    len(self.active) >= self.maxActive - 1:
+                return
+            handle = heapq.heappop(self.pending)
+            if self.usage is not None and not self.usage.allow(
+                    handle.provider, handle.priority >= PRIO_HIDDEN):
+                self.refuse(handle)
+                continue
+            self.start(handle)
+
+    def refuse(self, handle):
+        # finishes with an error, once the caller had a chance to connect
+        self.usage.refused(handle.provider)
+        handle.refused = True
+        QtCore.QTimer.singleShot(0, handle.finished.emit)
+
+    def preempt(self, priority):
+        victim = None
+        for handle in self.active:
+            if handle.priority >= PRIO_HIDDEN and handle.priority > priority:
+                if victim is None or victim < handle:
+                    victim = handle
+        if victim is None:
+            return False
+        self.active.remove(victim)
+        if not self.active:
+            self.estimator.idle()
+        reply = victim.reply
+        victim.reply = None
+        if Tracing.tracer is not None and victim.span is not None:
+            Tracing.tracer.end(victim.span, victim.provider,
+                               args={'aborted': 'preempted'})
+            victim.span = None
+        reply.abort()
+        reply.deleteLater()
+        heapq.heappush(self.pending, victim)
+        self.preempted += 1
+        return True
+
+    def start(self, handle):
+        handle.reply = self.manager.get(handle.request)
+        handle.started = time.monotonic()
+        handle.headers = None
+        reply = handle.reply
+        self.active.append(handle)
+        self.estimator.busy(handle.started)
+        if self.usage is not None and not handle.counted:
+            handle.counted = True
+            self.usage.started(handle.provider)
+        if Tracing.tracer is not None:
+            # no query string, it holds the API keys
+            url = handle.request.url()
+            handle.span = Tracing.tracer.begin(
+                handle.provider, args={'url': url.toString(
+                    url.RemoveQuery | url.RemoveUserInfo),
+                    'priority': handle.priority})
+        reply.metaDataChanged.connect(lambda: self.replyHeaders(handle))
+        reply.finished.connect(lambda: self.replyFinished(handle, reply))
+
+    def replyHeaders(self, handle):
+        if handle.headers is None:
+            handle.headers = time.monotonic()
+            self.estimator.addLatency(handle.headers - handle.started)
+            if Tracing.tracer is not None:
+                Tracing.tracer.instant(handle.provider + ' headers', 'net')
+
+    def replyFinished(self, handle, reply):
+        if handle.reply is not reply:
+            # aborted by preemption, the request went back to the queue
+            return
+        self.active.remove(handle)
+        if self.usage is not None:
+            status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            end = handle.headers or time.monotonic()
+            self.usage.finished(handle.provider, status or 0,
+                                reply.bytesAvailable(), end - handle.started,
+                                reply.error() != QNetworkReply.NoError)
+        if Tracing.tracer is not None and handle.span is not None:
+            Tracing.tracer.end(handle.span, handle.provider, args={
+                'error': int(reply.error()),
+                'bytes': reply.bytesAvailable()})
+            handle.span = None
+        if not handle.canceled:
+            if reply.error() == QNetworkReply.NoError:
+                self.estimator.addBytes(reply.bytesAvailable())
+            elif reply.error() in TRANSPORT_ERRORS:
+                self.estimator.addFailure()
+        if not self.active:
+            self.estimator.idle()
+        if not handle.canceled:
+            handle.finished.emit()
+        reply.deleteLater()
+        self.schedule()
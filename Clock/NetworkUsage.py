@@ -0,0 +1,165 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Per provider accounting of the downloads (requests, bytes, HTTP status,
+# latency) in hourly and daily buckets, kept in a JSON file so the daily
+# counts survive a restart, and the daily quota guard on top of it.
+# Days and hours are UTC, that is when the provider counters reset.
+# A request counts against the quota when it is sent, so requests in
+# flight cannot overshoot the budget. Low priority work is refused once
+# reserve of the budget is used, to keep the rest for what is on screen.
+import json
+import os
+import time
+
+
+def dayKey(now):
+    return time.strftime('%Y-%m-%d', time.gmtime(now))
+
+
+def hourKey(now):
+    return time.strftime('%Y-%m-%dT%H', time.gmtime(now))
+
+
+def counters():
+    return {'requests': 0, 'refused': 0, 'errors': 0, 'bytes': 0,
+            'latency_ms': 0.0, 'latency_max_ms': 0.0, 'status': {}}
+
+
+class NetworkUsage:
+
+    def __init__(self, path='', quotas=None, reserve=0.9, days=31, hours=48):
+        self.path = path
+        self.quotas = dict(quotas or {})
+        self.reserve = reserve
+        self.keepDays = days
+        self.keepHours = hours
+        self.days = {}      # day -> provider -> counters
+        self.hours = {}     # hour -> provider -> counters
+        self.totals = {}    # provider -> counters since the start
+        self.lastok = {}    # provider -> time of the last good answer
+        self.warned = set()
+        self.dirty = False
+
+    def load(self):
+        if self.path == '' or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                doc = json.load(f)
+            self.days = doc.get('days', {})
+            self.hours = doc.get('hours', {})
+        except (IOError, OSError, ValueError) as e:
+            print("network usage not loaded : " + str(e))
+
+    def save(self):
+        if self.path == '' or not self.dirty:
+            return
+        self.prune()
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({'days': self.days, 'hours': self.hours}, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except (IOError, OSError) as e:
+            print("network usage not saved : " + str(e))
+
+    def prune(self):
+        for table, keep in ((self.days, self.keepDays),
+                            (self.hours, self.keepHours)):
+            for key in sorted(table)[:-keep]:
+                del table[key]
+
+    def buckets(self, provider, now):
+        self.dirty = True
+        if provider not in self.totals:
+            self.totals[provider] = counters()
+        result = [self.totals[provider]]
+        for table, key in ((self.days, dayKey(now)),
+                           (self.hours, hourKey(now))):
+            b = table.setdefault(key, {})
+            c = b.get(provider)
+            if c is None:
+                c = counters()
+                b[provider] = c
+            result.append(c)
+        return result
+
+    def used(self, provider, now=None):
+        now = now if now is not None else time.time()
+        c = self.days.get(dayKey(now), {}).get(provider)
+        return c['requests'] if c else 0
+
+    def allow(self, provider, background=False, now=None):
+        budget = self.quotas.get(provider)
+        if not budget:
+            return True
+        limit = budget * self.reserve if background else budget
+        return self.used(provider, now) < limit
+
+    def started(self, provider, now=None):
+        now = now if now is not None else time.time()
+        for c in self.buckets(provider, now):
+            c['requests'] += 1
+
+    def refused(self, provider, now=None):
+        now = now if now is not None else time.time()
+        for c in self.buckets(provider, now):
+            c['refused'] += 1
+        day = dayKey(now)
+        if (day, provider) not in self.warned:
+            self.warned.add((day, provider))
+            print("network quota: %d of %d %s requests used today, "
+                  "refusing more until 00:00 UTC" % (
+                      self.used(provider, now), self.quotas[provider],
+                      provider))
+
+    def finished(self, provider, status, nbytes, latency, error, now=None):
+        # status is the HTTP status, 0 when there was no answer
+        now = now if now is not None else time.time()
+        status = str(status)
+        ms = latency * 1000
+        for c in self.buckets(provider, now):
+            c['bytes'] += nbytes
+            c['latency_ms'] += ms
+            c['latency_max_ms'] = max(c['latency_max_ms'], ms)
+            c['status'][status] = c['status'].get(status, 0) + 1
+            if error:
+                c['errors'] += 1
+        if not error:
+            self.lastok[provider] = now
+
+    def report(self, key):
+        # key is a day or an hour, returns the lines to log
+        lines = []
+        table = self.hours if 'T' in key else self.days
+        for provider, c in sorted(table.get(key, {}).items()):
+            done = sum(c['status'].values())
+            line = "%-10s %5d requests %5d refused %4d errors %9.1fkB" \
+                " latency avg %4.0fms max %5.0fms" % (
+                    provider, c['requests'], c['refused'], c['errors'],
+                    c['bytes'] / 1024.0,
+                    c['latency_ms'] / done if done else 0,
+                    c['latency_max_ms'])
+            budget = self.quotas.get(provider)
+            if budget and 'T' not in key:
+                line += " quota %d%%" % (c['requests'] * 100 / budget)
+            line += " status " + ' '.join(
+                '%s:%d' % s for s in sorted(c['status'].items()))
+            lines.append(line)
+        return lines
@@ -1,2854 +1,3918 @@
-# =====================================================
-#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
-# =====================================================
-#
-# This file is part of PiWeatherStation.
-# PiWeatherStation is free software: you can redistribute it and/or 
-# modify it under the terms of the GNU General Public License
-# as published by the Free Software Foundation, either version 3
-#  of the License, or (at your option) any later version.
-#
-# PiWeatherStation is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the 
-# GNU General Public License for more details.
-# You should have received a copy of the GNU General Public License
-# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
-
-# -*- coding: utf-8 -*-                 # NOQA
-
-import sys
-import os
-import platform
-import signal
-import datetime
-from threading import Event
-import dateutil.parser
-import tzlocal
-import time
-import json
-import locale
-import random
-import math 
-import paho.mqtt.client as mqtt
-from metar import Metar
-
-from PyQt5 import QtGui, QtCore, QtNetwork, QtWidgets
-from PyQt5.QtGui import QPixmap, QBrush, QColor
-from PyQt5.QtGui import QPainter, QImage, QFont
-from PyQt5.QtCore import QEventLoop, QUrl, pyqtSignal
-from PyQt5.QtCore import Qt
-from PyQt5.QtNetwork import QNetworkReply
-from PyQt5.QtNetwork import QNetworkRequest
-from subprocess import Popen
-
-sys.dont_write_bytecode = True
-from GoogleMercatorProjection import getCorners, getPoint, getTileXY, LatLng  # NOQA
-import ApiKeys                                              # NOQA
-
-
-class tzutc(datetime.tzinfo):
-    def utcoffset(self, dt):
-        return datetime.timedelta(hours=0, minutes=0)
-
-
-class suntimes:
-    def __init__(self, lat, long):
-        self.lat = lat
-        self.long = long
-
-    def sunrise(self, when=None):
-        if when is None:
-            when = datetime.datetime.now(tz=tzlocal.get_localzone())
-        self.__preptime(when)
-        self.__calc()
-        return suntimes.__timefromdecimalday(self.sunrise_t)
-
-    def sunset(self, when=None):
-        if when is None:
-            when = datetime.datetime.now(tz=tzlocal.get_localzone())
-        self.__preptime(when)
-        self.__calc()
-        return suntimes.__timefromdecimalday(self.sunset_t)
-
-    @staticmethod
-    def __timefromdecimalday(day):
-        hours = 24.0*day
-        h = int(hours)
-        minutes = (hours-h)*60
-        m = int(minutes)
-        seconds = (minutes-m)*60
-        s = int(seconds)
-        return datetime.time(hour=h, minute=m, second=s)
-
-    def __preptime(self, when):
-        # datetime days are numbered in the Gregorian calendar
-        # while the calculations from NOAA are distibuted as
-        # OpenOffice spreadsheets with days numbered from
-        # 1/1/1900. The difference are those numbers taken for
-        # 18/12/2010
-        self.day = when.toordinal()-(734124-40529)
-        t = when.time()
-        self.time = (t.hour + t.minute/60.0 + t.second/3600.0) / 24.0
-
-        self.timezone = 0
-        offset = when.utcoffset()
-        if offset is not None:
-            self.timezone = offset.seconds / 3600.0 + (offset.days * 24)
-
-    def __calc(self):
-        timezone = self.timezone  # in hours, east is positive
-        longitude = self.long     # in decimal degrees, east is positive
-        latitude = self.lat       # in decimal degrees, north is positive
-
-        time = self.time  # percentage past midnight, i.e. noon  is 0.5
-        day = self.day     # daynumber 1=1/1/1900
-
-        Jday = day+2415018.5 + time - timezone / 24  # Julian day
-        Jcent = (Jday - 2451545) / 36525    # Julian century
-
-        Manom = 357.52911 + Jcent * (35999.05029 - 0.0001537 * Jcent)
-        Mlong = 280.46646 + Jcent * (36000.76983 + Jcent * 0.0003032) % 360
-        Eccent = 0.016708634 - Jcent * (0.000042037 + 0.0001537 * Jcent)
-        Mobliq = (23 + (26 + ((21.448 - Jcent * (46.815 + Jcent *
-                  (0.00059 - Jcent * 0.001813)))) / 60) / 60)
-        obliq = (Mobliq + 0.00256 *
-                 math.cos(math.radians(125.04-1934.136 * Jcent)))
-        vary = (math.tan(math.radians(obliq / 2)) *
-                math.tan(math.radians(obliq / 2)))
-        Seqcent = (math.sin(math.radians(Manom)) *
-                   (1.914602 - Jcent*(0.004817 + 0.000014 * Jcent)) +
-                   math.sin(math.radians(2 * Manom))
-                   * (0.019993 - 0.000101 * Jcent) +
-                   math.sin(math.radians(3 * Manom)) * 0.000289)
-        Struelong = Mlong + Seqcent
-        Sapplong = (Struelong - 0.00569 - 0.00478 *
-                    math.sin(math.radians(125.04-1934.136*Jcent)))
-        declination = (math.degrees(math.asin(math.sin(math.radians(obliq)) *
-                       math.sin(math.radians(Sapplong)))))
-
-        eqtime = (4 * math.degrees(vary * math.sin(2 * math.radians(Mlong)) -
-                  2 * Eccent*math.sin(math.radians(Manom)) + 4 * Eccent *
-                  vary * math.sin(math.radians(Manom)) *
-                  math.cos(2 * math.radians(Mlong)) - 0.5 * vary * vary *
-                  math.sin(4 * math.radians(Mlong)) - 1.25 * Eccent * Eccent *
-                  math.sin(2*math.radians(Manom))))
-
-        hourangle0 = (math.cos(math.radians(90.833)) /
-                      (math.cos(math.radians(latitude)) *
-                      math.cos(math.radians(declination))) -
-                      math.tan(math.radians(latitude)) *
-                      math.tan(math.radians(declination)))
-
-        self.solarnoon_t = (720-4 * longitude - eqtime + timezone * 60) / 1440
-        # sun never sets
-        if hourangle0 > 1.0:
-            self.sunrise_t = 0.0
-            self.sunset_t = 1.0 - 1.0/86400.0
-            return
-        if hourangle0 < -1.0:
-            self.sunrise_t = 0.0
-            self.sunset_t = 0.0
-            return
-
-        hourangle = math.degrees(math.acos(hourangle0))
-
-        self.sunrise_t = self.solarnoon_t - hourangle * 4 / 1440
-        self.sunset_t = self.solarnoon_t + hourangle * 4 / 1440
-
-
-
-# https://gist.github.com/miklb/ed145757971096565723
-def moon_phase(dt=None):
-    if dt is None:
-        dt = datetime.datetime.now()
-    diff = dt - datetime.datetime(2001, 1, 1)
-    days = float(diff.days) + (float(diff.seconds) / 86400.0)
-    lunations = 0.20439731 + float(days) * 0.03386319269
-    return lunations % 1.0
-
-def tick():
-    global hourpixmap, minpixmap, secpixmap
-    global hourpixmap2, minpixmap2, secpixmap2
-    global lastmin, lastday, lasttimestr
-    global clockrect
-    global datex, datex2, datey2, pdy
-    global sun, daytime, sunrise, sunset
-    global bottom
-
-    if Config.DateLocale != "":
-        try:
-            locale.setlocale(locale.LC_TIME, Config.DateLocale)
-        except:
-            pass
-
-    now = datetime.datetime.now()
-    if Config.digital:
-        timestr = Config.digitalformat.format(now)
-        if Config.digitalformat.find("%I") > -1:
-            if timestr[0] == '0':
-                timestr = timestr[1:99]
-        if lasttimestr != timestr:
-            clockface.setText(timestr.lower())
-        lasttimestr = timestr
-    else:
-        angle = now.second * 6
-        ts = secpixmap.size()
-        secpixmap2 = secpixmap.transformed(
-            QtGui.QTransform().scale(
-                float(clockrect.width()) / ts.height(),
-                float(clockrect.height()) / ts.height()
-            ).rotate(angle),
-            Qt.SmoothTransformation
-        )
-        sechand.setPixmap(secpixmap2)
-        ts = secpixmap2.size()
-        sechand.setGeometry(
-            clockrect.center().x() - ts.width() / 2,
-            clockrect.center().y() - ts.height() / 2,
-            ts.width(),
-            ts.height()
-        )
-        if now.minute != lastmin:
-            angle = now.minute * 6
-            ts = minpixmap.size()
-            minpixmap2 = minpixmap.transformed(
-                QtGui.QTransform().scale(
-                    float(clockrect.width()) / ts.height(),
-                    float(clockrect.height()) / ts.height()
-                ).rotate(angle),
-                Qt.SmoothTransformation
-            )
-            minhand.setPixmap(minpixmap2)
-            ts = minpixmap2.size()
-            minhand.setGeometry(
-                clockrect.center().x() - ts.width() / 2,
-                clockrect.center().y() - ts.height() / 2,
-                ts.width(),
-                ts.height()
-            )
-
-            angle = ((now.hour % 12) + now.minute / 60.0) * 30.0
-            ts = hourpixmap.size()
-            hourpixmap2 = hourpixmap.transformed(
-                QtGui.QTransform().scale(
-                    float(clockrect.width()) / ts.height(),
-                    float(clockrect.height()) / ts.height()
-                ).rotate(angle),
-                Qt.SmoothTransformation
-            )
-            hourhand.setPixmap(hourpixmap2)
-            ts = hourpixmap2.size()
-            hourhand.setGeometry(
-                clockrect.center().x() - ts.width() / 2,
-                clockrect.center().y() - ts.height() / 2,
-                ts.width(),
-                ts.height()
-            )
-
-    dy = Config.digitalformat2.format(now)
-    if Config.digitalformat2.find("%I") > -1:
-        if dy[0] == '0':
-            dy = dy[1:99]
-    if dy != pdy:
-        pdy = dy
-        datey2.setText(dy)
-
-    if now.minute != lastmin:
-        lastmin = now.minute
-        if now.time() >= sunrise and now.time() <= sunset:
-            daytime = True
-        else:
-            daytime = False
-
-    if now.day != lastday:
-        lastday = now.day
-        # date
-        sup = 'th'
-        if (now.day == 1 or now.day == 21 or now.day == 31):
-            sup = 'st'
-        if (now.day == 2 or now.day == 22):
-            sup = 'nd'
-        if (now.day == 3 or now.day == 23):
-            sup = 'rd'
-        if Config.DateLocale != "":
-            sup = ""
-        ds = now.strftime("%A %d %B %Y").capitalize()
-        ds2 = now.strftime("%a %d %b %Y").capitalize()
-        # ds = "{0:%A %B} {0.day}<sup>{1}</sup> {0.year}".format(now, sup)
-        # ds2 = "{0:%a %b} {0.day}<sup>{1}</sup> {0.year}".format(now, sup)
-        print(ds)
-        datex.setText(ds)
-        datex2.setText(ds2)
-        dt = tzlocal.get_localzone().localize(now)
-        sunrise = sun.sunrise(dt)
-        sunset = sun.sunset(dt)
-        bottomText = ""
-        bottomText += (Config.LSunRise +
-                       "{0:%H:%M}".format(sunrise) +
-                       Config.LSet +
-                       "{0:%H:%M}".format(sunset)) + "\n"
-        bottomText += (Config.LMoonPhase + phase(moon_phase()))
-        bottom.setText(bottomText)
-
-
-def tempfinished(msg):
-    tempdata = json.loads(msg)
-    if tempdata['temperature'] == '':
-        return
-    sensorStruct = {}
-    sensorStruct["sensor"] = tempdata['topic']
-    sensorStruct["temperature"] = round(tempdata['temperature'],1)
-    sensorStruct["pressure"] = round(tempdata['pressure'])
-    sensorStruct["humidity"] = round(tempdata['humidity'])
-    sensorStruct["iconsignal"] = ''
-    sensorStruct["iconbat"] = ''
-    try:
-        sensorStruct["quality"] = tempdata['linkquality']
-        sensorStruct["iconsignal"] = getSignalIcon(float(tempdata['linkquality']))
-    except:
-        print("Info : no quality information available in the MQTT message")
-        pass
-    try:
-        sensorStruct["voltage"] = tempdata['voltage']
-    except:
-        print("Info : no voltage information available in the MQTT message")
-        pass    
-    try:
-        sensorStruct["battery"] = tempdata['battery']
-        sensorStruct["iconbat"] = getBatteryIcon(float(tempdata['battery']))
-    except:
-        print("Info : no battery information available in the MQTT message")
-        pass
-
-    if sensorStruct["sensor"] == "zigbee/sensor1" :
-        sensor1.setText(f'Salon :\n{sensorStruct["temperature"]:.1f}°C \nHumidité : {sensorStruct["humidity"]:.0f}% \nPression : {sensorStruct["pressure"]:.0f}hPa \n')
-        sensor1Date.setText("{0:%H:%M}".format(datetime.datetime.now()))
-        if sensorStruct["iconbat"] != '':
-            resIcon = QPixmap('icons/' + sensorStruct["iconbat"] + '.png')
-            sensor1Battery.setPixmap(resIcon.scaled(
-                sensor1Battery.width(),sensor1Battery.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        if sensorStruct["iconsignal"] != '':
-            resIcon = QPixmap('icons/' + sensorStruct["iconsignal"] + '.png')
-            sensor1Strength.setPixmap(resIcon.scaled(
-                sensor1Strength.width(),sensor1Strength.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-    elif sensorStruct["sensor"] == "zigbee/sensor2" :
-        sensor2.setText(f'Chambre :\n{sensorStruct["temperature"]:.1f}°C \nHumidité : {sensorStruct["humidity"]:.0f}% \nPression : {sensorStruct["pressure"]:.0f}hPa \n')
-        sensor2Date.setText("{0:%H:%M}".format(datetime.datetime.now()))
-        if sensorStruct["iconbat"] != '':
-            resIcon = QPixmap('icons/' + sensorStruct["iconbat"] + '.png')
-            sensor2Battery.setPixmap(resIcon.scaled(
-                sensor1Battery.width(),sensor1Battery.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        if sensorStruct["iconsignal"] != '':
-            resIcon = QPixmap('icons/' + sensorStruct["iconsignal"] + '.png')
-            sensor2Strength.setPixmap(resIcon.scaled(
-                sensor2Strength.width(),sensor2Strength.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-    else :
-        print("tempfinished() error : Could not find the corresponding MQTT topic " + sensorStruct["sensor"] + " in the configuration !")
-        return
-
-def getBatteryIcon(f):
-    if f > 80:
-        return 'fullbattery'
-    elif f > 30:
-        return 'halfbattery'
-    else:
-        return 'lowbattery'
-
-def getSignalIcon(f):
-    if f > 191 :
-        return 'highsignal'
-    elif f > 127 :
-        return 'mediumhighsignal'
-    elif f > 63 : 
-        return 'mediumlowsignal'
-    else : 
-        return 'lowsignal'
-
-def speedMph(f):
-    return f / 0.621371192
-
-def speedKmh(f):
-    return f * 3.6
-
-def pressi(f):
-    return f * 0.029530
-
-
-def heightImp(f):
-    return f / 25.4
-
-
-def barom(f):
-    return f * 25.4
-
-
-def phase(f):
-    pp = Config.Lmoon1          # 'New Moon'
-    if (f > 0.9375):
-            pp = Config.Lmoon1  # 'New Moon'
-    elif (f > 0.8125):
-            pp = Config.Lmoon8  # 'Waning Crecent'
-    elif (f > 0.6875):
-            pp = Config.Lmoon7  # 'Third Quarter'
-    elif (f > 0.5625):
-            pp = Config.Lmoon6  # 'Waning Gibbous'
-    elif (f > 0.4375):
-            pp = Config.Lmoon5  # 'Full Moon'
-    elif (f > 0.3125):
-            pp = Config.Lmoon4  # 'Waxing Gibbous'
-    elif (f > 0.1875):
-            pp = Config.Lmoon3  # 'First Quarter'
-    elif (f > 0.0625):
-            pp = Config.Lmoon2  # 'Waxing Crescent'
-    return pp
-
-
-def bearing(f):
-    wd = 'N'
-    if (f > 22.5):
-        wd = 'NE'
-    if (f > 67.5):
-        wd = 'E'
-    if (f > 112.5):
-        wd = 'SE'
-    if (f > 157.5):
-        wd = 'S'
-    if (f > 202.5):
-        wd = 'SO'
-    if (f > 247.5):
-        wd = 'O'
-    if (f > 292.5):
-        wd = 'NO'
-    if (f > 337.5):
-        wd = 'N'
-    return wd
-
-def wxfinished_owm():
-    global wxreply, wxdata, supress_current
-    global wxicon, temper, wxdesc, press, humidity
-    global wind, wind2, wdate, bottom, forecast
-    global wxicon2, temper2, wxdesc2, attribution
-    global daytime
-    owmicons = {
-        '01d': 'clear-day',
-        '02d': 'partly-cloudy-day',
-        '03d': 'partly-cloudy-day',
-        '04d': 'partly-cloudy-day',
-        '09d': 'rain',
-        '10d': 'rain',
-        '11d': 'thunderstorm',
-        '13d': 'snow',
-        '50d': 'fog',
-        '01n': 'clear-night',
-        '02n': 'partly-cloudy-night',
-        '03n': 'partly-cloudy-night',
-        '04n': 'partly-cloudy-night',
-        '09n': 'rain',
-        '10n': 'rain',
-        '11n': 'thunderstorm',
-        '13n': 'snow',
-        '50n': 'fog'
-    }
-
-    wxstr = str(wxreply.readAll(),'utf-8')
-    wxdata = json.loads(wxstr)
-    f = wxdata['current']
-    icon = f['weather'][0]['icon']
-    icon = owmicons[icon]
-    if not Config.use_metar:
-        attribution.setText("openweathermap")
-        attribution2.setText("openweathermap")
-        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + icon + ".png")
-        wxicon.setPixmap(wxiconpixmap.scaled(
-            wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wxicon2.setPixmap(wxiconpixmap.scaled(
-            wxicon.width(),
-            wxicon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wxdesc.setText(f['weather'][0]['description'].capitalize())
-        wxdesc2.setText(f['weather'][0]['description'].capitalize())
-
-        if Config.metric:
-            temper.setText(f'{round(f["temp"]*2/2):.1f}°C')
-            temper2.setText(f'{round(f["temp"]*2/2):.1f}°C')
-            press.setText(Config.LPressure + f'{round(f["pressure"]):.0f}mb')
-            humidity.setText(Config.LHumidity + f'{round(f["humidity"]):.0f}%')
-            wd = bearing(f['wind_deg'])
-            if Config.wind_degrees:
-                wd = str(f['wind_deg']) + u'°'
-            w = (Config.LWind +
-                 wd + ' ' +
-                 '%.1f' % (speedKmh(f['wind_speed'])) + 'kmh')
-            if 'wind_gust' in f:
-                w += (Config.Lgusting +
-                      '%.1f' % (speedKmh(f['wind_gust'])) + 'kmh')
-            wind.setText(w)
-            wind2.setText(Config.LFeelslike + f'{round(f["feels_like"]):.0f}°C')
-            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
-                int(f['dt']))))
-    # Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
-    # Config.LToday + f['precip_today_metric'] + 'mm')
-        else:
-            temper.setText(f'{round(tempToImp(f["temp"])*2/2):.1f}°F')
-            temper2.setText(f'{round(tempToImp(f["temp"])*2/2):.1f}°F')
-            press.setText(Config.LPressure + f'{round(pressi(f["pressure"])):.0f}in')
-            humidity.setText(Config.LHumidity + f'{round(f["humidity"]):.0f}%')
-            wd = bearing(f['wind_deg'])
-            if Config.wind_degrees:
-                wd = str(f['wind_deg']) + u'°'
-            w = (Config.LWind +
-                 wd + ' ' +
-                 '%.1f' % ((f['wind_speed'])) + 'mph')
-            if 'wind_gust' in f:
-                w += (Config.Lgusting +
-                      '%.1f' % ((f['wind_gust'])) + 'kph')
-            wind.setText(w)
-            wind2.setText(Config.LFeelslike + f'{round(tempToImp(f["feels_like"])):.0f}°F')
-            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
-                int(f['dt']))))
-    # Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
-    # Config.LToday + f['precip_today_in'] + 'in')
-    for i in range(0, 3):
-        f = wxdata['hourly'][i * 3 + 2]
-        fl = forecast[i]
-        wicon = f['weather'][0]['icon']
-        wicon = owmicons[wicon]
-        icon = fl.findChild(QtWidgets.QLabel, "icon")
-        wxiconpixmap = QtGui.QPixmap(
-            Config.icons + "/" + wicon + ".png")
-        icon.setPixmap(wxiconpixmap.scaled(
-            icon.width(),
-            icon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wx = fl.findChild(QtWidgets.QLabel, "wx")
-        day = fl.findChild(QtWidgets.QLabel, "day")
-
-        # # display the forecast day only if it is different from today
-        # if datetime.datetime.fromtimestamp(int(f['dt'])).strftime("%d") != datetime.datetime.now().strftime("%d") :
-        #     day.setText("{0:%A %H:%M}".format(datetime.datetime.fromtimestamp(
-        #         int(f['dt']))))
-        # else :
-        #     day.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
-        #         int(f['dt']))))
-        
-        # display the forecast hours difference (example : "+3h") rather than the forecast time
-        diff = datetime.datetime.fromtimestamp(int(f['dt'])) - datetime.datetime.now()
-        diff_hours = round(diff.seconds / 3600)
-        day.setText("+ " + str(diff_hours) + "h")
-
-        s = ''
-        pop = 0
-        ptype = ''
-        paccum = 0
-        if ('pop' in f):
-            pop = float(f['pop']) * 100.0
-        if ('snow' in f):
-            ptype = 'snow'
-            paccum = float(f['snow']['1h'])
-        if ('rain' in f):
-            ptype = 'rain'
-            paccum = float(f['rain']['1h'])
-
-        if (pop > 0.0 or ptype != ''):
-            s += '%.0f' % pop + '% '
-        if Config.metric:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.0f' % paccum + 'mm '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.0f' % paccum + 'mm '
-            s += '%.0f' % round(f['temp']) + u'°C'
-        else:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.0f' % heightImp(paccum) + 'in '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.0f' % heightImp(paccum) + 'in '
-            s += '%.0f' % round(tempToImp(f['temp'])) + u'°F'
-
-        wx.setStyleSheet(
-            "#wx { font-size: " +
-            str(int(25 * xscale * Config.fontmult)) + "px; }")
-        wx.setText(f['weather'][0]['description'] + "\n" + s)
-
-    for i in range(3, 9):
-        f = wxdata['daily'][i - 3]
-        wicon = f['weather'][0]['icon']
-        wicon = owmicons[wicon]
-        fl = forecast[i]
-        icon = fl.findChild(QtWidgets.QLabel, "icon")
-        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + wicon + ".png")
-        icon.setPixmap(wxiconpixmap.scaled(
-            icon.width(),
-            icon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wx = fl.findChild(QtWidgets.QLabel, "wx")
-        day = fl.findChild(QtWidgets.QLabel, "day")
-        day.setText("{0:%A}".format(datetime.datetime.fromtimestamp(
-            int(f['dt']))))
-        s = ''
-        pop = 0
-        ptype = ''
-        paccum = 0
-        if ('pop' in f):
-            pop = float(f['pop']) * 100.0
-        if ('rain' in f):
-            ptype = 'rain'
-            paccum = float(f['rain'])
-        if ('snow' in f):
-            ptype = 'snow'
-            paccum = float(f['snow'])
-
-        if (pop > 0.05 or ptype != ''):
-            s += '%.0f' % pop + '% '
-        if Config.metric:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.0f' % paccum + 'mm '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.0f' % paccum + 'mm '
-            s += '%.0f' % round(f['temp']['max']) + '/' + \
-                 '%.0f' % round(f['temp']['min'])
-        else:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.1f' % heightImp(paccum) + 'in '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.1f' % heightImp(paccum) + 'in '
-            s += '%.0f' % round(tempToImp(f['temp']['max'])) + '/' + \
-                 '%.0f' % round(tempToImp(f['temp']['min']))
-
-        wx.setStyleSheet(
-            "#wx { font-size: "
-            + str(int(19 * xscale * Config.fontmult)) + "px; }")
-        wx.setText(f['weather'][0]['description'] + "\n" + s)
-
-
-def wxfinished_ds():
-    global wxreply, wxdata, supress_current
-    global wxicon, temper, wxdesc, press, humidity
-    global wind, wind2, wdate, bottom, forecast
-    global wxicon2, temper2, wxdesc2, attribution
-    global daytime
-
-    attribution.setText("DarkSky.net")
-    attribution2.setText("DarkSky.net")
-
-    wxstr = str(wxreply.readAll())
-    wxdata = json.loads(wxstr)
-    f = wxdata['currently']
-    if not supress_current:
-        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + f['icon'] + ".png")
-        wxicon.setPixmap(wxiconpixmap.scaled(
-            wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wxicon2.setPixmap(wxiconpixmap.scaled(
-            wxicon.width(),
-            wxicon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wxdesc.setText(f['summary'])
-        wxdesc2.setText(f['summary'])
-
-        if Config.metric:
-            temper.setText('%.1f' % (tempm(f['temperature'])) + u'°C')
-            temper2.setText('%.1f' % (tempm(f['temperature'])) + u'°C')
-            press.setText(Config.LPressure + '%.1f' % f['pressure'] + 'mb')
-            humidity.setText(
-                Config.LHumidity + '%.0f%%' % (f['humidity']*100.0))
-            wd = bearing(f['windBearing'])
-            if Config.wind_degrees:
-                wd = str(f['windBearing']) + u'°'
-            wind.setText(Config.LWind +
-                         wd + ' ' +
-                         '%.1f' % (speedm(f['windSpeed'])) + 'kmh' +
-                         Config.Lgusting +
-                         '%.1f' % (speedm(f['windGust'])) + 'kmh')
-            wind2.setText(Config.LFeelslike +
-                          '%.1f' % (tempm(f['apparentTemperature'])) + u'°C')
-            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
-                int(f['time']))))
-    # Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
-    # Config.LToday + f['precip_today_metric'] + 'mm')
-        else:
-            temper.setText('%.1f' % (f['temperature']) + u'°F')
-            temper2.setText('%.1f' % (f['temperature']) + u'°F')
-            press.setText(
-                Config.LPressure + '%.2f' % pressi(f['pressure']) + 'in')
-            humidity.setText(
-                Config.LHumidity + '%.0f%%' % (f['humidity']*100.0))
-            wd = bearing(f['windBearing'])
-            if Config.wind_degrees:
-                wd = str(f['windBearing']) + u'°'
-            wind.setText(Config.LWind +
-                         wd + ' ' +
-                         '%.1f' % (f['windSpeed']) + 'mph' +
-                         Config.Lgusting +
-                         '%.1f' % (f['windGust']) + 'mph')
-            wind2.setText(Config.LFeelslike +
-                          '%.1f' % (f['apparentTemperature']) + u'°F')
-            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
-                int(f['time']))))
-    # Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
-    # Config.LToday + f['precip_today_in'] + 'in')
-
-    for i in range(0, 3):
-        f = wxdata['hourly']['data'][i * 3 + 2]
-        fl = forecast[i]
-        icon = fl.findChild(QtWidgets.QLabel, "icon")
-        wxiconpixmap = QtGui.QPixmap(
-            Config.icons + "/" + f['icon'] + ".png")
-        icon.setPixmap(wxiconpixmap.scaled(
-            icon.width(),
-            icon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wx = fl.findChild(QtWidgets.QLabel, "wx")
-        day = fl.findChild(QtWidgets.QLabel, "day")
-        day.setText("{0:%A %I:%M%p}".format(datetime.datetime.fromtimestamp(
-            int(f['time']))))
-        s = ''
-        pop = 0
-        ptype = ''
-        paccum = 0
-        if ('precipProbability' in f):
-            pop = float(f['precipProbability']) * 100.0
-        if ('precipAccumulation' in f):
-            paccum = float(f['precipAccumulation'])
-        if ('precipType' in f):
-            ptype = f['precipType']
-
-        if (pop > 0.0 or ptype != ''):
-            s += '%.0f' % pop + '% '
-        if Config.metric:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.0f' % heightm(paccum) + 'mm '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
-            s += '%.0f' % tempm(f['temperature']) + u'°C'
-        else:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.0f' % paccum + 'in '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.0f' % paccum + 'in '
-            s += '%.0f' % (f['temperature']) + u'°F'
-
-        wx.setStyleSheet("#wx { font-size: " + str(int(25 * xscale)) + "px; }")
-        wx.setText(f['summary'] + "\n" + s)
-
-    for i in range(3, 9):
-        f = wxdata['daily']['data'][i - 3]
-        fl = forecast[i]
-        icon = fl.findChild(QtWidgets.QLabel, "icon")
-        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + f['icon'] + ".png")
-        icon.setPixmap(wxiconpixmap.scaled(
-            icon.width(),
-            icon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wx = fl.findChild(QtWidgets.QLabel, "wx")
-        day = fl.findChild(QtWidgets.QLabel, "day")
-        day.setText("{0:%A}".format(datetime.datetime.fromtimestamp(
-            int(f['time']))))
-        s = ''
-        pop = 0
-        ptype = ''
-        paccum = 0
-        if ('precipProbability' in f):
-            pop = float(f['precipProbability']) * 100.0
-        if ('precipAccumulation' in f):
-            paccum = float(f['precipAccumulation'])
-        if ('precipType' in f):
-            ptype = f['precipType']
-
-        if (pop > 0.05 or ptype != ''):
-            s += '%.0f' % pop + '% '
-        if Config.metric:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.0f' % heightm(paccum) + 'mm '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
-            s += '%.0f' % tempm(f['temperatureHigh']) + '/' + \
-                 '%.0f' % tempm(f['temperatureLow'])
-        else:
-            if (ptype == 'snow'):
-                if (paccum > 0.05):
-                    s += Config.LSnow + '%.1f' % paccum + 'in '
-            else:
-                if (paccum > 0.05):
-                    s += Config.LRain + '%.1f' % paccum + 'in '
-            s += '%.0f' % f['temperatureHigh'] + '/' + \
-                 '%.0f' % f['temperatureLow']
-
-        wx.setStyleSheet("#wx { font-size: " + str(int(19 * xscale)) + "px; }")
-        wx.setText(f['summary'] + "\n" + s)
-
-
-cc_code_map = {
-            "freezing_rain_heavy": "Freezing Rain",
-            "freezing_rain": "Freezing Rain",
-            "freezing_rain_light": "Freezing Rain",
-            "freezing_drizzle": "Freezing Drizzle",
-            "ice_pellets_heavy": "Ice Pellets",
-            "ice_pellets": "Ice Pellets",
-            "ice_pellets_light": "Ice Pellets",
-            "snow_heavy": "Heavy Snow",
-            "snow": "Snow",
-            "snow_light": "Light Snow",
-            "flurries": "Flurries",
-            "tstorm": "Thunder Storm",
-            "rain_heavy": "Heavy Rain",
-            "rain": "Rain",
-            "rain_light": "Light Rain",
-            "drizzle": "Drizzle",
-            "fog_light": "Light Fog",
-            "fog": "Fog",
-            "cloudy": "Cloudy",
-            "mostly_cloudy": "Mostly Cloudy",
-            "partly_cloudy": "Partly Cloudy",
-            "mostly_clear": "Mostly Clear",
-            "clear": "Clear"
-}
-cc_code_metar = {
-            "Clear": u"Clair",
-            "Few Clouds": u"Quelques nuages",
-            "Scattered Clouds": u"Nuages épars",
-            "Mostly Cloudy": u"Plutôt nuageux",
-            "Cloudy": u"Nuageux",
-            "Drizzle": u"Bruine",
-            "Heavy Freezing Rain": u"Forte pluie verglaçante",
-            "Light Freezing Rain": u"Légère pluie verglaçante",
-            "Heavy Rain Showers": u"Fortes averses",
-            "Light Rain Showers": u"Légères averses",
-            "Heavy Blowing Rain": u"Forte pluie et vent",
-            "Light Blowing Rain": u"Légère pluie et vent",
-            "Freezing Rain": u"Pluie verglaçante",
-            "Rain Showers": u"Averses",
-            "Blowing Rain": u"Pluie et vent",
-            "Heavy Rain": u"Forte pluie",
-            "Light Rain": u"Légère pluie",
-            "Rain": u"Pluie",
-            "Heavy Freezing Snow": u"Forte neige verglaçante",
-            "Light Freezing Snow": u"Légère neige verglaçante",
-            "Heavy Snow Showers": u"Fortes chutes de neige",
-            "Light Snow Showers": u"Faibles chutes de neige",
-            "Heavy Blowing Snow": u"Forte neige et vent",
-            "Light Blowing Snow": u"Faible neige et vent",
-            "Freezing Snow": u"Neige verglaçante",
-            "Snow Showers": u"Chute de neige",
-            "Blowing Snow": u"Neige et vent",
-            "Heavy Snow": u"Forte neige",
-            "Light Snow": u"Légère neige",
-            "Snow": u"Neige",
-            "Blowing Snow Pellets": u"Grésil et vent",
-            "Snow Pellets": u"Grésil",
-            "Ice Crystals": u"Poudrin de glace",
-            "Ice Pellets": u"Faible grêle",
-            "Heavy Hail": u"Forte grêle",
-            "Hail": u"Grêle"
-}
-
-
-cc_code_icons = {
-            "freezing_rain_heavy": "sleet",
-            "freezing_rain": "sleet",
-            "freezing_rain_light": "sleet",
-            "freezing_drizzle": "sleet",
-            "ice_pellets_heavy": "sleet",
-            "ice_pellets": "sleet",
-            "ice_pellets_light": "sleet",
-            "snow_heavy": "snow",
-            "snow": "snow",
-            "snow_light": "snow",
-            "flurries": "snow",
-            "tstorm": "thunderstorm",
-            "rain_heavy": "rain",
-            "rain": "rain",
-            "rain_light": "rain",
-            "drizzle": "rain",
-            "fog_light": "fog",
-            "fog": "fog",
-            "cloudy": "cloudy",
-            "partly_cloudy": "partly-cloudy-day",
-            "mostly_cloudy": "partly-cloudy-day",
-            "mostly_clear": "partly-cloudy-day",
-            "clear": "clear-day"
-}
-
-
-def wxfinished_cc():
-    global wxreply, wxdata, supress_current
-    global wxicon, temper, wxdesc, press, humidity
-    global wind, wind2, wdate, bottom, forecast
-    global wxicon2, temper2, wxdesc2, attribution
-    global daytime
-    attribution.setText("climacell.co")
-    attribution2.setText("climacell.co")
-
-    wxstr = str(wxreply.readAll())
-    wxdata = json.loads(wxstr)
-    f = wxdata
-    dt = dateutil.parser.parse(f['observation_time']['value'])\
-        .astimezone(tzlocal.get_localzone())
-    icon = f['weather_code']['value']
-    icon = cc_code_icons[icon]
-    if not daytime:
-        icon = icon.replace('-day', '-night')
-    if not supress_current:
-        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + icon + ".png")
-        wxicon.setPixmap(wxiconpixmap.scaled(
-            wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wxicon2.setPixmap(wxiconpixmap.scaled(
-            wxicon.width(),
-            wxicon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wxdesc.setText(cc_code_map[f['weather_code']['value']])
-        wxdesc2.setText(cc_code_map[f['weather_code']['value']])
-
-        if Config.metric:
-            temper.setText('%.1f' % (tempm(f['temp']['value'])) + u'°C')
-            temper2.setText('%.1f' % (tempm(f['temp']['value'])) + u'°C')
-            press.setText(
-                Config.LPressure +
-                '%.1f' % barom(f['baro_pressure']['value']) + 'mm')
-            humidity.setText(
-                Config.LHumidity + '%.0f%%' % (f['humidity']['value']))
-            wd = bearing(f['wind_direction']['value'])
-            if Config.wind_degrees:
-                wd = str(f['wind_direction']['value']) + u'°'
-            wind.setText(Config.LWind +
-                         wd + ' ' +
-                         '%.1f' % (speedm(f['wind_speed']['value'])) + 'kmh' +
-                         Config.Lgusting +
-                         '%.1f' % (speedm(f['wind_gust']['value'])) + 'kmh')
-            wind2.setText(Config.LFeelslike +
-                          '%.1f' % (tempm(f['feels_like']['value'])) + u'°C')
-            wdate.setText("{0:%H:%M}".format(dt))
-    # Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
-    # Config.LToday + f['precip_today_metric'] + 'mm')
-        else:
-            temper.setText('%.1f' % (f['temp']['value']) + u'°F')
-            temper2.setText('%.1f' % (f['temp']['value']) + u'°F')
-            press.setText(
-                Config.LPressure +
-                '%.2f' % (f['baro_pressure']['value']) + 'in')
-            humidity.setText(
-                Config.LHumidity + '%.0f%%' % (f['humidity']['value']))
-            wd = bearing(f['wind_direction']['value'])
-            if Config.wind_degrees:
-                wd = str(f['wind_direction']['value']) + u'°'
-            wind.setText(Config.LWind +
-                         wd + ' ' +
-                         '%.1f' % (f['wind_speed']['value']) + 'mph' +
-                         Config.Lgusting +
-                         '%.1f' % (f['wind_gust']['value']) + 'mph')
-            wind2.setText(Config.LFeelslike +
-                          '%.1f' % (f['feels_like']['value']) + u'°F')
-            wdate.setText("{0:%H:%M}".format(dt))
-    # Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
-    # Config.LToday + f['precip_today_in'] + 'in')
-
-
-def wxfinished_cc2():
-    global wxreply, forecast
-    global daytime
-    wxstr2 = str(wxreply2.readAll())
-    # print('cc2', wxstr2)
-    wxdata2 = json.loads(wxstr2)
-
-    for i in range(0, 3):
-        f = wxdata2[i * 3 + 2]
-        # print(i, i*3+2, f)
-        fl = forecast[i]
-        wicon = f['weather_code']['value']
-        wicon = cc_code_icons[wicon]
-
-        dt = dateutil.parser.parse(f['observation_time']['value']) \
-            .astimezone(tzlocal.get_localzone())
-        if dt.day == datetime.datetime.now().day:
-            fdaytime = daytime
-        else:
-            fsunrise = sun.sunrise(dt)
-            fsunset = sun.sunset(dt)
-            print('calc daytime', fdaytime, dt, fsunrise, fsunset)
-            if dt.time() >= fsunrise and dt.time() <= fsunset:
-                fdaytime = True
-            else:
-                fdaytime = False
-
-        if not fdaytime:
-            wicon = wicon.replace('-day', '-night')
-        icon = fl.findChild(QtWidgets.QLabel, "icon")
-        wxiconpixmap = QtGui.QPixmap(
-            Config.icons + "/" + wicon + ".png")
-        icon.setPixmap(wxiconpixmap.scaled(
-            icon.width(),
-            icon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wx = fl.findChild(QtWidgets.QLabel, "wx")
-        day = fl.findChild(QtWidgets.QLabel, "day")
-        day.setText("{0:%A %I:%M%p}".format(
-            dateutil.parser.parse(f['observation_time']['value'])
-            .astimezone(tzlocal.get_localzone())))
-        s = ''
-        pop = float(f['precipitation_probability']['value'])
-        ptype = f['precipitation_type']['value']
-        if ptype == 'none':
-            ptype = ''
-        paccum = f['precipitation']['value']
-
-        if (pop > 0.0 or ptype != ''):
-            s += '%.0f' % pop + '% '
-        if Config.metric:
-            if (ptype == 'snow'):
-                if (paccum > 0.01):
-                    s += Config.LSnow + '%.0f' % heightm(paccum) + 'mm '
-            else:
-                if (paccum > 0.01):
-                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
-            s += '%.0f' % tempm(f['temp']['value']) + u'°C'
-        else:
-            if (ptype == 'snow'):
-                if (paccum > 0.01):
-                    s += Config.LSnow + '%.0f' % paccum + 'in '
-            else:
-                if (paccum > 0.01):
-                    s += Config.LRain + '%.0f' % paccum + 'in '
-            s += '%.0f' % (f['temp']['value']) + u'°F'
-
-        wx.setStyleSheet(
-            "#wx { font-size: " +
-            str(int(25 * xscale * Config.fontmult)) + "px; }")
-        wx.setText(cc_code_map[f['weather_code']['value']] + "\n" + s)
-
-
-def wxfinished_cc3():
-    global wxreply3, forecast
-    global daytime
-    wxstr3 = str(wxreply3.readAll())
-    # print('cc2', wxstr2)
-    wxdata3 = json.loads(wxstr3)
-    ioff = 0
-    dt = dateutil.parser.parse(
-        wxdata3[0]['observation_time']['value']+"T00:00:00")
-    if datetime.datetime.now().day != dt.day:
-        ioff += 1
-    for i in range(3, 9):
-        f = wxdata3[i - 3 + ioff]
-        wicon = f['weather_code']['value']
-        wicon = cc_code_icons[wicon]
-        fl = forecast[i]
-        icon = fl.findChild(QtWidgets.QLabel, "icon")
-        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + wicon + ".png")
-        icon.setPixmap(wxiconpixmap.scaled(
-            icon.width(),
-            icon.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation))
-        wx = fl.findChild(QtWidgets.QLabel, "wx")
-        day = fl.findChild(QtWidgets.QLabel, "day")
-        day.setText("{0:%A}".format(
-            dateutil.parser.parse(
-                f['observation_time']['value']+"T00:00:00"
-            )
-            ))
-        s = ''
-        pop = float(f['precipitation_probability']['value'])
-        ptype = ''
-        paccum = float(f['precipitation_accumulation']['value'])
-        wc = f['weather_code']['value']
-        if 'rain' in wc:
-            ptype = 'rain'
-        if 'drizzle' in wc:
-            ptype = 'rain'
-        if 'ice' in wc:
-            ptype = 'snow'
-        if 'flurries' in wc:
-            ptype = 'snow'
-        if 'snow' in wc:
-            ptype = 'snow'
-        if 'tstorm' in wc:
-            ptype = 'rain'
-
-        # if (pop > 0.05 and ptype == ''):
-        #     if f['temp'][1]['max']['value'] > 28:
-        #         ptype = 'rain'
-        #     else:
-        #         ptype = 'snow'
-        if (pop > 0.05 or ptype != ''):
-            s += '%.0f' % pop + '% '
-        if Config.metric:
-            if (ptype == 'snow'):
-                if (paccum > 0.01):
-                    s += Config.LSnow + '%.0f' % heightm(paccum*15) + 'mm '
-            else:
-                if (paccum > 0.01):
-                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
-            s += '%.0f' % tempm(f['temp'][1]['max']['value']) + '/' + \
-                 '%.0f' % tempm(f['temp'][0]['min']['value'])
-        else:
-            if (ptype == 'snow'):
-                if (paccum > 0.01):
-                    s += Config.LSnow + '%.1f' % (paccum*15) + 'in '
-            else:
-                if (paccum > 0.01):
-                    s += Config.LRain + '%.1f' % paccum + 'in '
-            s += '%.0f' % f['temp'][1]['max']['value'] + '/' + \
-                 '%.0f' % f['temp'][0]['min']['value']
-
-        wx.setStyleSheet(
-            "#wx { font-size: "
-            + str(int(19 * xscale * Config.fontmult)) + "px; }")
-        wx.setText(cc_code_map[f['weather_code']['value']] + "\n" + s)
-        print("cc_code_map2[f['weather_code']['value']]", cc_code_map[f['weather_code']['value']])
-
-
-metar_cond = [
-    ('CLR', '', '', 'Clear', 'clear-day', 0),
-    ('NSC', '', '', 'Clear', 'clear-day', 0),
-    ('SKC', '', '', 'Clear', 'clear-day', 0),
-    ('FEW', '', '', 'Few Clouds', 'partly-cloudy-day', 1),
-    ('NCD', '', '', 'Clear', 'clear-day', 0),
-    ('SCT', '', '', 'Scattered Clouds', 'partly-cloudy-day', 2),
-    ('BKN', '', '', 'Mostly Cloudy', 'partly-cloudy-day', 3),
-    ('OVC', '', '', 'Cloudy', 'cloudy', 4),
-
-    ('///', '', '', '', 'cloudy', 0),
-    ('UP', '', '', '', 'cloudy', 0),
-    ('VV', '', '', '', 'cloudy', 0),
-    ('//', '', '', '', 'cloudy', 0),
-
-    ('DZ', '', '', 'Drizzle', 'rain', 10),
-
-    ('RA', 'FZ', '+', 'Heavy Freezing Rain', 'sleet', 11),
-    ('RA', 'FZ', '-', 'Light Freezing Rain', 'sleet', 11),
-    ('RA', 'SH', '+', 'Heavy Rain Showers', 'sleet', 11),
-    ('RA', 'SH', '-', 'Light Rain Showers', 'rain', 11),
-    ('RA', 'BL', '+', 'Heavy Blowing Rain', 'rain', 11),
-    ('RA', 'BL', '-', 'Light Blowing Rain', 'rain', 11),
-    ('RA', 'FZ', '', 'Freezing Rain', 'sleet', 11),
-    ('RA', 'SH', '', 'Rain Showers', 'rain', 11),
-    ('RA', 'BL', '', 'Blowing Rain', 'rain', 11),
-    ('RA', '', '+', 'Heavy Rain', 'rain', 11),
-    ('RA', '', '-', 'Light Rain', 'rain', 11),
-    ('RA', '', '', 'Rain', 'rain', 11),
-
-    ('SN', 'FZ', '+', 'Heavy Freezing Snow', 'snow', 12),
-    ('SN', 'FZ', '-', 'Light Freezing Snow', 'snow', 12),
-    ('SN', 'SH', '+', 'Heavy Snow Showers', 'snow', 12),
-    ('SN', 'SH', '-', 'Light Snow Showers', 'snow', 12),
-    ('SN', 'BL', '+', 'Heavy Blowing Snow', 'snow', 12),
-    ('SN', 'BL', '-', 'Light Blowing Snow', 'snow', 12),
-    ('SN', 'FZ', '', 'Freezing Snow', 'snow', 12),
-    ('SN', 'SH', '', 'Snow Showers', 'snow', 12),
-    ('SN', 'BL', '', 'Blowing Snow', 'snow', 12),
-    ('SN', '', '+', 'Heavy Snow', 'snow', 12),
-    ('SN', '', '-', 'Light Snow', 'snow', 12),
-    ('SN', '', '', 'Rain', 'snow', 12),
-
-    ('SG', 'BL', '', 'Blowing Snow', 'snow', 12),
-    ('SG', '', '', 'Snow', 'snow', 12),
-    ('GS', 'BL', '', 'Blowing Snow Pellets', 'snow', 12),
-    ('GS', '', '', 'Snow Pellets', 'snow', 12),
-
-    ('IC', '', '', 'Ice Crystals', 'snow', 13),
-    ('PL', '', '', 'Ice Pellets', 'snow', 13),
-
-    ('GR', '', '+', 'Heavy Hail', 'thuderstorm', 14),
-    ('GR', '', '', 'Hail', 'thuderstorm', 14),
-]
-
-
-def feels_like(f):
-    t = f.temp.value('C')
-    d = f.dewpt.value('C')
-    h = (math.exp((17.625*d)/(243.04+d)) /
-         math.exp((17.625*t)/(243.04+t)))
-    t = f.temp.value('F')
-    w = f.wind_speed.value('MPH')
-    if t > 80 and h >= 0.40:
-        hi = (-42.379 + 2.04901523 * t + 10.14333127 * h - .22475541 * t * h -
-              .00683783 * t * t - .05481717 * h * h + .00122874 * t * t * h +
-              .00085282 * t * h * h - .00000199 * t * t * h * h)
-        if h < 0.13 and t >= 80.0 and t <= 112.0:
-            hi -= ((13 - h) / 4) * math.sqrt((17 - math.abs(t-95)) / 17)
-        if h > 0.85 and t >= 80.0 and t <= 112.0:
-            hi += ((h - 85)/10) * ((87 - t)/5)
-        return hi
-    if t < 50 and w >= 3:
-        wc = 35.74 + 0.6215 * t - 35.75 * \
-         (w ** 0.16) + 0.4275 * t * (w ** 0.16)
-        return wc
-    return t
-
-compass_french = {
-            "N": "N",
-            "S": "S",
-            "W": "O",
-            "E": "E",
-            "NW": "NO",
-            "SW": "SO",
-            "NE": "NE",
-            "SE": "SE",
-            "NNW": "NNO",
-            "SSW": "SSO",
-            "NNE": "NNE",
-            "SSE": "SSE",
-            "WNW": "ONO",
-            "WSW": "OSO",
-            "ENE": "ENE",
-            "ESE": "ESE"
-}
-
-def wxfinished_metar():
-    global metarreply
-    global wxicon, temper, wxdesc, press, humidity
-    global wind, wind2, wdate, bottom
-    global wxicon2, temper2, wxdesc2
-    global daytime
-    global attribution, attribution2
-
-    attribution.setText("METAR " + Config.METAR)
-    attribution2.setText("METAR " + Config.METAR)
-
-
-    try:
-        wxstr = str(metarreply.readAll(),'utf-8')
-    except:
-        print("Error : Could not extract METAR data from URL")
-        return
-    # print("[DEBUG] : ", wxstr)
-    for wxline in wxstr.splitlines():
-        if wxline.startswith(Config.METAR):
-            wxstr = wxline
-    f = Metar.Metar(wxstr,strict=False)
-    try:
-        dt = f.time.replace(tzinfo=tzutc()).astimezone(tzlocal.get_localzone())
-    except:
-        print("Error: METAR string is not valid")
-        print("METAR string : ", wxstr)
-        return
-    pri = -1
-    weather = ''
-    icon = ''
-    print(f.string())
-    for s in f.sky:
-        print("f.sky : ", s)
-        for c in metar_cond:
-            if s[0] == c[0]:
-                if c[5] > pri:
-                    pri = c[5]
-                    weather = c[3]
-                    icon = c[4]
-    for w in f.weather:
-        print("f.weather : ", w)
-        for c in metar_cond:
-            if w[2] == c[0]:
-                if c[1] > '':
-                    if w[1] == c[1]:
-                        if c[2] > '':
-                            if w[0][0:1] == c[2]:
-                                if c[5] > pri:
-                                    pri = c[5]
-                                    weather = c[3]
-                                    icon = c[4]
-                else:
-                    if c[2] > '':
-                        if w[0][0:1] == c[2]:
-                            if c[5] > pri:
-                                pri = c[5]
-                                weather = c[3]
-                                icon = c[4]
-                    else:
-                        if c[5] > pri:
-                            pri = c[5]
-                            weather = c[3]
-                            icon = c[4]
-    if weather == '':
-        weather = cc_code_metar['Clear']
-        for c in metar_cond:
-            icon = 'clear-day'
-            pri = c[5]
-    else:
-        weather = cc_code_metar[weather]
-    if not daytime:
-        icon = icon.replace('-day', '-night')
-
-    print("weather values :",icon, weather, pri)
-
-    wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + icon + ".png")
-    wxicon.setPixmap(wxiconpixmap.scaled(
-        wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
-        Qt.SmoothTransformation))
-    wxicon2.setPixmap(wxiconpixmap.scaled(
-        wxicon.width(),
-        wxicon.height(),
-        Qt.IgnoreAspectRatio,
-        Qt.SmoothTransformation))
-    wxdesc.setText(weather)
-    wxdesc2.setText(weather)
-    if Config.metric:
-        temper.setText('%.1f' % round((f.temp.value('C'))) + u'°C')
-        temper2.setText('%.1f' % round((f.temp.value('C'))) + u'°C')
-        press.setText(
-            Config.LPressure +
-            '%.1f' % f.press.value('MB') + 'mb')
-        t = f.temp.value('C')
-        d = f.dewpt.value('C')
-        h = 100.0 * (math.exp((17.625*d)/(243.04+d)) /
-                     math.exp((17.625*t)/(243.04+t)))
-        humidity.setText(
-            Config.LHumidity + '%.0f%%' % (h))
-        if f.wind_dir != None:
-            wd = f.wind_dir.compass()
-            wd = compass_french[wd]
-        else:
-            wd = 'variable'
-        if Config.wind_degrees:
-            wd = str(f.wind_dir.value) + u'°'
-        ws = (Config.LWind +
-              wd + ' ' +
-              '%.1f' % (f.wind_speed.value('KMH')) + 'kmh')
-        if f.wind_gust:
-            ws += (Config.Lgusting +
-                   '%.1f' % (f.wind_gust.value('KMH')) + 'kmh')
-        wind.setText(ws)
-        wind2.setText(Config.LFeelslike +
-                      ('%.0f' % (round(feels_like(f))) + u'°C'))
-        wdate.setText("{0:%H:%M}".format(dt))
-# Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
-# Config.LToday + f['precip_today_metric'] + 'mm')
-    else:
-        temper.setText('%.1f' % (f.temp.value('F')) + u'°F')
-        temper2.setText('%.1f' % (f.temp.value('F')) + u'°F')
-        press.setText(
-            Config.LPressure +
-            '%.2f' % f.press.value('IN') + 'in')
-        t = f.temp.value('C')
-        d = f.dewpt.value('C')
-        h = 100.0 * (math.exp((17.625*d)/(243.04+d)) /
-                     math.exp((17.625*t)/(243.04+t)))
-        humidity.setText(
-            Config.LHumidity + '%.0f%%' % (h))
-        wd = f.wind_dir.compass()
-        if Config.wind_degrees:
-            wd = str(f.wind_dir.value) + u'°'
-        ws = (Config.LWind +
-              wd + ' ' +
-              '%.1f' % (f.wind_speed.value('MPH')) + 'mph')
-        if f.wind_gust:
-            ws += (Config.Lgusting +
-                   '%.1f' % (f.wind_gust.value('MPH')) + 'mph')
-        wind.setText(ws)
-        wind2.setText(Config.LFeelslike +
-                      '%.1f' % (feels_like(f)) + u'°F')
-        wdate.setText("{0:%H:%M} {1}".format(dt, Config.METAR))
-# Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
-# Config.LToday + f['precip_today_in'] + 'in')
-
-
-def getwx():
-    global supress_current
-    supress_current = False
-    try:
-        if Config.use_metar :
-            supress_current = True
-            getwx_metar()
-    except:
-        pass
-
-    try:
-        ApiKeys.dsapi
-        getwx_ds()
-        return
-    except:
-        pass
-
-    try:
-        ApiKeys.ccapi
-        global cc_code_map, cc_code_metar
-        try:
-            cc_code_map = Config.Lcc_code_map
-            cc_code_metar = Config.Lcc_code_metar
-        except:
-            pass
-        getwx_cc()
-        return
-    except:
-        pass
-
-    try:
-        ApiKeys.owmapi
-        getwx_owm()
-        return
-    except:
-        pass
-
-
-def getwx_ds():
-    global wxurl
-    global wxreply
-    print ("getting current and forecast:" + time.ctime())
-    wxurl = 'https://api.darksky.net/forecast/' + \
-        ApiKeys.dsapi + \
-        '/'
-    wxurl += str(Config.location.lat) + ',' + \
-        str(Config.location.lng)
-    wxurl += '?units=us&lang=' + Config.Language.lower()
-    wxurl += '&r=' + str(random.random())
-    print (wxurl)
-    r = QUrl(wxurl)
-    r = QNetworkRequest(r)
-    wxreply = manager.get(r)
-    wxreply.finished.connect(wxfinished_ds)
-
-
-def getwx_owm():
-    global wxurl
-    global wxreply
-    print("getting current and forecast:" + time.ctime())
-    wxurl = 'https://api.openweathermap.org/data/2.5/onecall?appid=' + \
-        ApiKeys.owmapi
-    wxurl += "&lat=" + str(Config.location.lat) + '&lon=' + \
-        str(Config.location.lng)
-    wxurl += '&units=metric&lang=' + Config.Language.lower()
-    wxurl += '&r=' + str(random.random())
-    print(wxurl)
-    r = QUrl(wxurl)
-    r = QNetworkRequest(r)
-    wxreply = manager.get(r)
-    event = QEventLoop()
-    wxreply.finished.connect(event.quit)
-    wxreply.finished.connect(wxfinished_owm)
-    event.exec()
-    # print("wxreply ", str(wxreply.readAll()))
-
-
-def getwx_cc():
-    global wxurl
-    global wxurl2
-    global wxurl3
-    global wxreply
-    global wxreply2
-    global wxreply3
-    print("getting current:" + time.ctime())
-    wxurl = 'https://api.climacell.co/v3/weather/realtime?apikey=' + \
-        ApiKeys.ccapi
-    wxurl += "&lat=" + str(Config.location.lat) + '&lon=' + \
-        str(Config.location.lng)
-    wxurl += '&unit_system=us'
-    wxurl += '&fields=temp,weather_code,feels_like,humidity,'
-    wxurl += 'wind_speed,wind_direction,wind_gust,baro_pressure'
-    print(wxurl)
-    r = QUrl(wxurl)
-    r = QNetworkRequest(r)
-    wxreply = manager.get(r)
-    wxreply.finished.connect(wxfinished_cc)
-
-    print("getting hourly:" + time.ctime())
-    wxurl2 = 'https://api.climacell.co/v3/weather/forecast/hourly?apikey=' + \
-        ApiKeys.ccapi
-    wxurl2 += "&lat=" + str(Config.location.lat) + '&lon=' + \
-        str(Config.location.lng)
-    wxurl2 += '&unit_system=us'
-    wxurl2 += '&fields=temp,precipitation,precipitation_type,'
-    wxurl2 += 'precipitation_probability,weather_code'
-    print(wxurl2)
-    r2 = QUrl(wxurl2)
-    r2 = QNetworkRequest(r2)
-    wxreply2 = manager.get(r2)
-    wxreply2.finished.connect(wxfinished_cc2)
-
-    print("getting daily:" + time.ctime())
-    wxurl3 = 'https://api.climacell.co/v3/weather/forecast/daily?apikey=' + \
-        ApiKeys.ccapi
-    wxurl3 += "&lat=" + str(Config.location.lat) + '&lon=' + \
-        str(Config.location.lng)
-    wxurl3 += '&unit_system=us'
-    wxurl3 += '&fields=temp,precipitation_accumulation,'
-    wxurl3 += 'precipitation_probability,weather_code'
-    print(wxurl3)
-    r3 = QUrl(wxurl3)
-    r3 = QNetworkRequest(r3)
-    wxreply3 = manager.get(r3)
-    wxreply3.finished.connect(wxfinished_cc3)
-
-
-def getwx_metar():
-    global metarurl
-    global metarreply
-    metarurl = \
-        "https://tgftp.nws.noaa.gov/data/observations/metar/stations/" + \
-        Config.METAR + ".TXT"
-    print(metarurl)
-    r = QUrl(metarurl)
-    r = QNetworkRequest(r)
-    metarreply = manager.get(r)
-    event = QEventLoop()
-    metarreply.finished.connect(event.quit)
-    metarreply.finished.connect(wxfinished_metar)
-    event.exec()
-
-def getallwx():
-    getwx()
-   
-@QtCore.pyqtSlot(int)
-def on_stateChanged(state):
-        if state == MqttClient.Connected:
-            print(state)
-            client.subscribe("zigbee/sensor1")
-            client.subscribe("zigbee/sensor2")
-
-@QtCore.pyqtSlot(str)
-def on_messageSignal(msg):
-        try:
-            print("read from " + msg)
-            tempfinished(msg)
-
-        except ValueError:
-            print("error: Not is number")
-
-def qtstart():
-    global ctimer, wxtimer, temptimer
-    global manager
-    global objradar1
-    global objradar2
-    global objradar3
-    global objradar4
-    global sun, daytime, sunrise, sunset
-
-    dt = datetime.datetime.now().replace(tzinfo=tzlocal.get_localzone())
-    sun = suntimes(Config.location.lat, Config.location.lng)
-    dt = tzlocal.get_localzone().localize(datetime.datetime.now())
-    sunrise = sun.sunrise(dt)
-    sunset = sun.sunset(dt)
-    if dt.time() >= sunrise and dt.time() <= sunset:
-            daytime = True
-    else:
-            daytime = False
-    getallwx()
-
-    # gettemp()
-
-    objradar1.start(Config.radar_refresh * 60)
-    objradar1.wxstart()
-    objradar2.start(Config.radar_refresh * 60)
-    objradar2.wxstart()
-    objradar3.start(Config.radar_refresh * 60)
-    objradar4.start(Config.radar_refresh * 60)
-
-    ctimer = QtCore.QTimer()
-    ctimer.timeout.connect(tick)
-    ctimer.start(1000)
-
-    wxtimer = QtCore.QTimer()
-    wxtimer.timeout.connect(getallwx)
-    wxtimer.start(1000 * Config.weather_refresh *
-                  60 + random.uniform(1000, 10000))
-
-    # temptimer = QtCore.QTimer()
-    # temptimer.timeout.connect(gettemp)
-    # temptimer.start(1000 * 10 * 60 + random.uniform(1000, 10000))
-
-    if Config.useslideshow:
-        objimage1.start(Config.slide_time)
-
-
-class SS(QtWidgets.QLabel):
-    def __init__(self, parent, rect, myname):
-        self.myname = myname
-        self.rect = rect
-        QtWidgets.QLabel.__init__(self, parent)
-
-        self.pause = False
-        self.count = 0
-        self.img_list = []
-        self.img_inc = 1
-
-        self.get_images()
-
-        self.setObjectName("slideShow")
-        self.setGeometry(rect)
-        self.setStyleSheet("#slideShow { background-color: " +
-                           Config.slide_bg_color + "; }")
-        self.setAlignment(Qt.AlignHCenter | Qt.AlignCenter)
-
-    def start(self, interval):
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.run_ss)
-        self.timer.start(1000 * interval + random.uniform(1, 10))
-        self.run_ss()
-
-    def stop(self):
-        try:
-            self.timer.stop()
-            self.timer = None
-        except Exception:
-            pass
-
-    def run_ss(self):
-        self.get_images()
-        self.switch_image()
-
-    def switch_image(self):
-        if self.img_list:
-            if not self.pause:
-                self.count += self.img_inc
-                if self.count >= len(self.img_list):
-                    self.count = 0
-                self.show_image(self.img_list[self.count])
-                self.img_inc = 1
-
-    def show_image(self, image):
-        image = QtWidgets.QImage(image)
-
-        bg = QtGui.QPixmap.fromImage(image)
-        self.setPixmap(bg.scaled(
-                self.size(),
-                QtCore.Qt.KeepAspectRatio,
-                QtCore.Qt.SmoothTransformation))
-
-    def get_images(self):
-        self.get_local(Config.slides)
-
-    def play_pause(self):
-        if not self.pause:
-            self.pause = True
-        else:
-            self.pause = False
-
-    def prev_next(self, direction):
-        self.img_inc = direction
-        self.timer.stop()
-        self.switch_image()
-        self.timer.start()
-
-    def get_local(self, path):
-        try:
-            dirContent = os.listdir(path)
-        except OSError:
-            print("path '%s' doesn't exists." % path)
-
-        for each in dirContent:
-            fullFile = os.path.join(path, each)
-            if os.path.isfile(fullFile) and (fullFile.lower().endswith('png')
-               or fullFile.lower().endswith('jpg')):
-                    self.img_list.append(fullFile)
-
-
-class Radar(QtWidgets.QLabel):
-    def __init__(self, parent, radar, rect, myname):
-        global xscale, yscale
-        self.myname = myname
-        self.rect = rect
-        self.anim = 5
-        self.zoom = radar["zoom"]
-        self.point = radar["center"]
-        self.radar = radar
-        self.baseurl = self.mapurl(radar, rect)
-        print ("map base url: " + self.baseurl)
-        QtWidgets.QLabel.__init__(self, parent)
-        self.interval = Config.radar_refresh * 60
-        self.lastwx = 0
-        self.retries = 0
-        self.corners = getCorners(self.point, self.zoom,
-                                  rect.width(), rect.height())
-        self.baseTime = 0
-        self.cornerTiles = {
-         "NW": getTileXY(LatLng(self.corners["N"],
-                                self.corners["W"]), self.zoom),
-         "NE": getTileXY(LatLng(self.corners["N"],
-                                self.corners["E"]), self.zoom),
-         "SE": getTileXY(LatLng(self.corners["S"],
-                                self.corners["E"]), self.zoom),
-         "SW": getTileXY(LatLng(self.corners["S"],
-                                self.corners["W"]), self.zoom)
-        }
-        self.tiles = []
-        self.tiletails = []
-        self.totalWidth = 0
-        self.totalHeight = 0
-        self.tilesWidth = 0
-        self.tilesHeight = 0
-
-        self.setObjectName("radar")
-        self.setGeometry(rect)
-        self.setStyleSheet("#radar { background-color: grey; }")
-        self.setAlignment(Qt.AlignCenter)
-
-        self.wwx = QtWidgets.QLabel(self)
-        self.wwx.setObjectName("wx")
-        self.wwx.setStyleSheet("#wx { background-color: transparent; }")
-        self.wwx.setGeometry(0, 0, rect.width(), rect.height())
-
-        self.wmk = QtWidgets.QLabel(self)
-        self.wmk.setObjectName("mk")
-        self.wmk.setStyleSheet("#mk { background-color: transparent; }")
-        self.wmk.setGeometry(0, 0, rect.width(), rect.height())
-
-        for y in range(int(self.cornerTiles["NW"]["Y"]),
-                       int(self.cornerTiles["SW"]["Y"])+1):
-            self.totalHeight += 256
-            self.tilesHeight += 1
-            for x in range(int(self.cornerTiles["NW"]["X"]),
-                           int(self.cornerTiles["NE"]["X"])+1):
-                tile = {"X": x, "Y": y}
-                self.tiles.append(tile)
-                if 'color' not in radar:
-                    radar['color'] = 6
-                if 'smooth' not in radar:
-                    radar['smooth'] = 1
-                if 'snow' not in radar:
-                    radar['snow'] = 1
-                tail = "/256/%d/%d/%d/%d/%d_%d.png" % (self.zoom, x, y,
-                                                       radar['color'],
-                                                       radar['smooth'],
-                                                       radar['snow'])
-                if 'oldcolor' in radar:
-                    tail = "/256/%d/%d/%d.png?color=%d" % (self.zoom, x, y,
-                                                           radar['color']
-                                                           )
-                self.tiletails.append(tail)
-        for x in range(int(self.cornerTiles["NW"]["X"]),
-                       int(self.cornerTiles["NE"]["X"])+1):
-            self.totalWidth += 256
-            self.tilesWidth += 1
-        self.frameImages = []
-        self.frameIndex = 0
-        self.displayedFrame = 0
-        self.ticker = 0
-        self.lastget = 0
-
-    def rtick(self):
-        if time.time() > (self.lastget + self.interval):
-            self.get(time.time())
-            self.lastget = time.time()
-        if len(self.frameImages) < 1:
-            return
-        if self.displayedFrame == 0:
-            self.ticker += 1
-            if self.ticker < 5:
-                return
-        self.ticker = 0
-        # print("len frameImages :", len(self.frameImages), "self.displayedFrame : ", self.displayedFrame)
-        f = self.frameImages[self.displayedFrame]
-        self.wwx.setPixmap(f["image"])
-        self.displayedFrame += 1
-        if self.displayedFrame >= len(self.frameImages):
-            self.displayedFrame = 0
-
-    def get(self, t=0):
-        t = int(t / 600)*600
-        if t > 0 and self.baseTime == t:
-            return
-        if t == 0:
-            t = self.baseTime
-        else:
-            self.baseTime = t
-        newf = []
-        for f in self.frameImages:
-            if f["time"] >= (t - self.anim * 600):
-                newf.append(f)
-        self.frameImages = newf
-        firstt = t - self.anim * 600
-        for tt in range(firstt, t+1, 600):
-            print ("get... " + str(tt) + " " + self.myname)
-            gotit = False
-            for f in self.frameImages:
-                if f["time"] == tt:
-                    gotit = True
-            if not gotit:
-                self.getTiles(tt)
-                break
-
-    def getTiles(self, t, i=0):
-        t = int(t / 600)*600
-        self.getTime = t
-        self.getIndex = i
-        if i == 0:
-            self.tileurls = []
-            self.tileQimages = []
-            for tt in self.tiletails:
-                tileurl = "https://tilecache.rainviewer.com/v2/radar/%d/%s" \
-                    % (t, tt)
-                self.tileurls.append(tileurl)
-        print (self.myname + " " + str(self.getIndex) + " " + self.tileurls[i])
-        self.tilereq = QNetworkRequest(QUrl(self.tileurls[i]))
-        self.tilereply = manager.get(self.tilereq)
-        self.tilereply.finished.connect(self.getTilesReply)
-
-    def getTilesReply(self):
-        print ("getTilesReply " + str(self.getIndex))
-        if self.tilereply.error() != QNetworkReply.NoError:
-                return
-        self.tileQimages.append(QImage())
-        self.tileQimages[self.getIndex].loadFromData(self.tilereply.readAll())
-        self.getIndex = self.getIndex + 1
-        if self.getIndex < len(self.tileurls):
-            self.getTiles(self.getTime, self.getIndex)
-        else:
-            self.combineTiles()
-            self.get()
-
-    def combineTiles(self):
-        global radar1
-        ii = QImage(self.tilesWidth*256, self.tilesHeight*256,
-                    QImage.Format_ARGB32)
-        painter = QPainter()
-        painter.begin(ii)
-        painter.setPen(QColor(255, 255, 255, 255))
-        painter.setFont(QFont("Arial", 10))
-        i = 0
-        xo = self.cornerTiles["NW"]["X"]
-        xo = int((int(xo) - xo)*256)
-        yo = self.cornerTiles["NW"]["Y"]
-        yo = int((int(yo) - yo)*256)
-        for y in range(0, self.totalHeight, 256):
-            for x in range(0, self.totalWidth, 256):
-                if self.tileQimages[i].format() == 5:
-                    painter.drawImage(x, y, self.tileQimages[i])
-                # painter.drawRect(x, y, 255, 255)
-                # painter.drawText(x+3, y+12, self.tiletails[i])
-                i += 1
-        painter.end()
-        painter = None
-        self.tileQimages = []
-        ii2 = ii.copy(-xo, -yo, self.rect.width(), self.rect.height())
-        ii = None
-        painter2 = QPainter()
-        painter2.begin(ii2)
-        timestamp = "{0:%H:%M} rainvewer.com".format(
-                    datetime.datetime.fromtimestamp(self.getTime))
-        painter2.setPen(QColor(63, 63, 63, 255))
-        painter2.setFont(QFont("Arial", 8))
-        painter2.setRenderHint(QPainter.TextAntialiasing)
-        painter2.drawText(3-1, 12-1, timestamp)
-        painter2.drawText(3+2, 12+1, timestamp)
-        painter2.setPen(QColor(255, 255, 255, 255))
-        painter2.drawText(3, 12, timestamp)
-        painter2.drawText(3+1, 12, timestamp)
-        painter2.end()
-        painter2 = None
-        ii3 = QPixmap(ii2)
-        ii2 = None
-        self.frameImages.append({"time": self.getTime, "image": ii3})
-        ii3 = None
-
-    def mapurl(self, radar, rect):
-        mb = 0
-        try:
-            mb = Config.usemapbox
-        except:
-            pass
-        if mb:
-            return self.mapboxurl(radar, rect)
-        else:
-            return self.googlemapurl(radar, rect)
-
-    def mapboxurl(self, radar, rect):
-        #  note we're using google maps zoom factor.
-        #  Mapbox equivilant zoom is one less
-        #  They seem to be using 512x512 tiles instead of 256x256
-        style = 'mapbox/satellite-streets-v10'
-        if 'style' in radar:
-            style = radar['style']
-        return 'https://api.mapbox.com/styles/v1/' + \
-               style + \
-               '/static/' + \
-               str(radar['center'].lng) + ',' + \
-               str(radar['center'].lat) + ',' + \
-               str(radar['zoom']-1) + ',0,0/' + \
-               str(rect.width()) + 'x' + str(rect.height()) + \
-               '?access_token=' + ApiKeys.mbapi
-
-    def googlemapurl(self, radar, rect):
-        urlp = []
-        if len(ApiKeys.googleapi) > 0:
-            urlp.append('key=' + ApiKeys.googleapi)
-        urlp.append(
-            'center=' + str(radar['center'].lat) +
-            ',' + str(radar['center'].lng))
-        zoom = radar['zoom']
-        rsize = rect.size()
-        if rsize.width() > 640 or rsize.height() > 640:
-            rsize = QtCore.QSize(rsize.width() / 2, rsize.height() / 2)
-            zoom -= 1
-        urlp.append('zoom=' + str(zoom))
-        urlp.append('size=' + str(rsize.width()) + 'x' + str(rsize.height()))
-        urlp.append('maptype=hybrid')
-
-        return 'http://maps.googleapis.com/maps/api/staticmap?' + \
-            '&'.join(urlp)
-
-    def basefinished(self):
-        if self.basereply.error() != QNetworkReply.NoError:
-            return
-        self.basepixmap = QPixmap()
-        self.basepixmap.loadFromData(self.basereply.readAll())
-        if self.basepixmap.size() != self.rect.size():
-            self.basepixmap = self.basepixmap.scaled(self.rect.size(),
-                                                     Qt.KeepAspectRatio,
-                                                     Qt.SmoothTransformation)
-        self.setPixmap(self.basepixmap)
-
-        # make marker pixmap
-        self.mkpixmap = QPixmap(self.basepixmap.size())
-        self.mkpixmap.fill(Qt.transparent)
-        br = QBrush(QColor(Config.dimcolor))
-        painter = QPainter()
-        painter.begin(self.mkpixmap)
-        painter.fillRect(0, 0, self.mkpixmap.width(),
-                         self.mkpixmap.height(), br)
-        for marker in self.radar['markers']:
-            if 'visible' not in marker or marker['visible'] == 1:
-                pt = getPoint(marker["location"], self.point, self.zoom,
-                              self.rect.width(), self.rect.height())
-                mk2 = QImage()
-                mkfile = 'teardrop'
-                if 'image' in marker:
-                    mkfile = marker['image']
-                if os.path.dirname(mkfile) == '':
-                    mkfile = os.path.join('markers', mkfile)
-                if os.path.splitext(mkfile)[1] == '':
-                    mkfile += '.png'
-                mk2.load(mkfile)
-                if mk2.format != QImage.Format_ARGB32:
-                    mk2 = mk2.convertToFormat(QImage.Format_ARGB32)
-                mkh = 80  # self.rect.height() / 5
-                if 'size' in marker:
-                    if marker['size'] == 'small':
-                        mkh = 64
-                    if marker['size'] == 'mid':
-                        mkh = 70
-                    if marker['size'] == 'tiny':
-                        mkh = 40
-                if 'color' in marker:
-                    c = QColor(marker['color'])
-                    (cr, cg, cb, ca) = c.getRgbF()
-                    for x in range(0, mk2.width()):
-                        for y in range(0, mk2.height()):
-                            (r, g, b, a) = QColor.fromRgba(
-                                           mk2.pixel(x, y)).getRgbF()
-                            r = r * cr
-                            g = g * cg
-                            b = b * cb
-                            mk2.setPixel(x, y, QColor.fromRgbF(r, g, b, a)
-                                         .rgba())
-                mk2 = mk2.scaledToHeight(mkh, 1)
-                painter.drawImage(pt.x-mkh/2, pt.y-mkh/2, mk2)
-
-        painter.end()
-
-        self.wmk.setPixmap(self.mkpixmap)
-
-
-    def getbase(self):
-        global manager
-        self.basereq = QNetworkRequest(QUrl(self.baseurl))
-        self.basereply = manager.get(self.basereq)
-        self.basereply.finished.connect(self.basefinished)
-        # QtCore.QObject.connect(self.basereply, QtCore.SIGNAL(
-        #     "finished()"), self.basefinished)
-
-    def start(self, interval=0):
-        if interval > 0:
-            self.interval = interval
-        self.getbase()
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.rtick)
-        self.lastget = time.time() - self.interval + random.uniform(3, 10)
-
-    def wxstart(self):
-        print ("wxstart for " + self.myname)
-        self.timer.start(200)
-
-    def wxstop(self):
-        print ("wxstop for " + self.myname)
-        self.timer.stop()
-
-    def stop(self):
-        try:
-            self.timer.stop()
-            self.timer = None
-        except Exception:
-            pass
-
-
-def realquit():
-    QtWidgets.QApplication.exit(0)
-
-
-def myquit(a=0, b=0):
-    global objradar1, objradar2, objradar3, objradar4
-    global ctimer, wtimer, temptimer
-
-    objradar1.stop()
-    objradar2.stop()
-    objradar3.stop()
-    objradar4.stop()
-    ctimer.stop()
-    wxtimer.stop()
-    # temptimer.stop()
-    if Config.useslideshow:
-        objimage1.stop()
-
-    QtCore.QTimer.singleShot(30, realquit)
-
-
-def fixupframe(frame, onoff):
-    for child in frame.children():
-        if isinstance(child, Radar):
-            if onoff:
-                # print "calling wxstart on radar on ",frame.objectName()
-                child.wxstart()
-            else:
-                # print "calling wxstop on radar on ",frame.objectName()
-                child.wxstop()
-
-
-def nextframe(plusminus):
-    global frames, framep
-    frames[framep].setVisible(False)
-    fixupframe(frames[framep], False)
-    framep += plusminus
-    if framep >= len(frames):
-        framep = 0
-    if framep < 0:
-        framep = len(frames) - 1
-    frames[framep].setVisible(True)
-    fixupframe(frames[framep], True)
-
-
-class myMain(QtWidgets.QWidget):
-
-    def keyPressEvent(self, event):
-        global weatherplayer, lastkeytime
-        if isinstance(event, QtWidgets.QKeyEvent):
-            # print event.key(), format(event.key(), '08x')
-            if event.key() == Qt.Key_F4:
-                myquit()
-            if event.key() == Qt.Key_F2:
-                if time.time() > lastkeytime:
-                    if weatherplayer is None:
-                        weatherplayer = Popen(
-                            ["mpg123", "-q", Config.noaastream])
-                    else:
-                        weatherplayer.kill()
-                        weatherplayer = None
-                lastkeytime = time.time() + 2
-            if event.key() == Qt.Key_Space:
-                nextframe(1)
-            if event.key() == Qt.Key_Left:
-                nextframe(-1)
-            if event.key() == Qt.Key_Right:
-                nextframe(1)
-            if event.key() == Qt.Key_F6:  # Previous Image
-                objimage1.prev_next(-1)
-            if event.key() == Qt.Key_F7:  # Next Image
-                objimage1.prev_next(1)
-            if event.key() == Qt.Key_F8:  # Play/Pause
-                objimage1.play_pause()
-            if event.key() == Qt.Key_F9:  # Foreground Toggle
-                if foreGround.isVisible():
-                    foreGround.hide()
-                else:
-                    foreGround.show()
-
-    def mousePressEvent(self, event):
-        if type(event) == QtGui.QMouseEvent:
-            nextframe(1)
-
-class MqttClient(QtCore.QObject):
-    Disconnected = 0
-    Connecting = 1
-    Connected = 2
-
-    MQTT_3_1 = mqtt.MQTTv31
-    MQTT_3_1_1 = mqtt.MQTTv311
-    connected = QtCore.pyqtSignal()
-    disconnected = QtCore.pyqtSignal()
-
-    stateChanged = QtCore.pyqtSignal(int)
-    hostnameChanged = QtCore.pyqtSignal(str)
-    portChanged = QtCore.pyqtSignal(int)
-    keepAliveChanged = QtCore.pyqtSignal(int)
-    cleanSessionChanged = QtCore.pyqtSignal(bool)
-    protocolVersionChanged = QtCore.pyqtSignal(int)
-
-    messageSignal = QtCore.pyqtSignal(str)
-
-    def __init__(self, parent=None):
-        super(MqttClient, self).__init__(parent)
-
-        self.m_hostname = "localhost"
-        self.m_port = 1883
-        self.m_keepAlive = 60
-        self.m_cleanSession = True
-        self.m_protocolVersion = MqttClient.MQTT_3_1
-
-        self.m_state = MqttClient.Disconnected
-
-        self.m_client =  mqtt.Client(clean_session=self.m_cleanSession,
-            protocol=self.protocolVersion)
-
-        self.m_client.on_connect = self.on_connect
-        self.m_client.on_message = self.on_message
-        self.m_client.on_disconnect = self.on_disconnect
-    
-    @QtCore.pyqtProperty(int, notify=stateChanged)
-    def state(self):
-        return self.m_state
-
-    @state.setter
-    def state(self, state):
-        if self.m_state == state: return
-        self.m_state = state
-        self.stateChanged.emit(state) 
-
-    @QtCore.pyqtProperty(str, notify=hostnameChanged)
-    def hostname(self):
-        return self.m_hostname
-
-    @hostname.setter
-    def hostname(self, hostname):
-        if self.m_hostname == hostname: return
-        self.m_hostname = hostname
-        self.hostnameChanged.emit(hostname)
-
-    @QtCore.pyqtProperty(int, notify=portChanged)
-    def port(self):
-        return self.m_port
-
-    @port.setter
-    def port(self, port):
-        if self.m_port == port: return
-        self.m_port = port
-        self.portChanged.emit(port)
-
-    @QtCore.pyqtProperty(int, notify=keepAliveChanged)
-    def keepAlive(self):
-        return self.m_keepAlive
-
-    @keepAlive.setter
-    def keepAlive(self, keepAlive):
-        if self.m_keepAlive == keepAlive: return
-        self.m_keepAlive = keepAlive
-        self.keepAliveChanged.emit(keepAlive)
-
-    @QtCore.pyqtProperty(bool, notify=cleanSessionChanged)
-    def cleanSession(self):
-        return self.m_cleanSession
-
-    @cleanSession.setter
-    def cleanSession(self, cleanSession):
-        if self.m_cleanSession == cleanSession: return
-        self.m_cleanSession = cleanSession
-        self.cleanSessionChanged.emit(cleanSession)
-
-    @QtCore.pyqtProperty(int, notify=protocolVersionChanged)
-    def protocolVersion(self):
-        return self.m_protocolVersion
-
-    @protocolVersion.setter
-    def protocolVersion(self, protocolVersion):
-        if self.m_protocolVersion == protocolVersion: return
-        if protocolVersion in (MqttClient.MQTT_3_1, MQTT_3_1_1):
-            self.m_protocolVersion = protocolVersion
-            self.protocolVersionChanged.emit(protocolVersion)
-
-    #################################################################
-    @QtCore.pyqtSlot()
-    def connectToHost(self):
-        if self.m_hostname:
-            self.m_client.connect(self.m_hostname, 
-                port=self.port, 
-                keepalive=self.keepAlive)
-
-            self.state = MqttClient.Connecting
-            self.m_client.loop_start()
-
-    @QtCore.pyqtSlot()
-    def disconnectFromHost(self):
-        self.m_client.disconnect()
-
-    def subscribe(self, path):
-        if self.state == MqttClient.Connected:
-            self.m_client.subscribe(path)
-
-    #################################################################
-    # callbacks
-    def on_message(self, mqttc, obj, msg):
-        topic = msg.topic
-        mstr = msg.payload.decode("ascii")
-        idx = mstr.index("}")
-        mstr = mstr[:idx] + ",\"topic\":\"" + topic + "\"" + mstr[idx:]
-        # print("on message() : ", mstr)
-        # print("on_message", mstr, obj, mqttc)
-        self.messageSignal.emit(mstr)
-
-    def on_connect(self, *args):
-        # print("on_connect", args)
-        self.state = MqttClient.Connected
-        self.connected.emit()
-
-    def on_disconnect(self, *args):
-        # print("on_disconnect", args)
-        self.state = MqttClient.Disconnected
-        self.disconnected.emit()
-
-configname = 'Config'
-
-if len(sys.argv) > 1:
-    configname = sys.argv[1]
-
-if not os.path.isfile(configname + ".py"):
-    print ("Config file not found %s" % configname + ".py")
-    exit(1)
-
-Config = __import__(configname)
-
-# define default values for new/optional config variables.
-
-try:
-    Config.location
-except AttributeError:
-    Config.location = Config.wulocation
-
-try:
-    Config.metric
-except AttributeError:
-    Config.metric = 0
-
-try:
-    Config.weather_refresh
-except AttributeError:
-    Config.weather_refresh = 30   # minutes
-
-try:
-    Config.radar_refresh
-except AttributeError:
-    Config.radar_refresh = 10    # minutes
-
-try:
-    Config.fontattr
-except AttributeError:
-    Config.fontattr = ''
-
-try:
-    Config.dimcolor
-except AttributeError:
-    Config.dimcolor = QColor('#000000')
-    Config.dimcolor.setAlpha(0)
-
-try:
-    Config.DateLocale
-except AttributeError:
-    Config.DateLocale = ''
-
-try:
-    Config.wind_degrees
-except AttributeError:
-    Config.wind_degrees = 0
-
-try:
-    Config.digital
-except AttributeError:
-    Config.digital = 0
-
-try:
-    Config.Language
-except AttributeError:
-    try:
-        Config.Language = Config.wuLanguage
-    except AttributeError:
-        Config.Language = "en"
-
-try:
-    Config.fontmult
-except AttributeError:
-    Config.fontmult = 1.0
-
-try:
-    Config.LPressure
-except AttributeError:
-    Config.LPressure = "Pressure "
-    Config.LHumidity = "Humidity "
-    Config.LWind = "Wind "
-    Config.Lgusting = " gusting "
-    Config.LFeelslike = "Feels like "
-    Config.LPrecip1hr = " Precip 1hr:"
-    Config.LToday = "Today: "
-    Config.LSunRise = "Sun Rise:"
-    Config.LSet = " Set: "
-    Config.LMoonPhase = " Moon Phase:"
-    Config.LInsideTemp = "Inside Temp "
-    Config.LRain = " Rain: "
-    Config.LSnow = " Snow: "
-
-try:
-    Config.Lmoon1
-    Config.Lmoon2
-    Config.Lmoon3
-    Config.Lmoon4
-    Config.Lmoon5
-    Config.Lmoon6
-    Config.Lmoon7
-    Config.Lmoon8
-except AttributeError:
-    Config.Lmoon1 = 'New Moon'
-    Config.Lmoon2 = 'Waxing Crescent'
-    Config.Lmoon3 = 'First Quarter'
-    Config.Lmoon4 = 'Waxing Gibbous'
-    Config.Lmoon5 = 'Full Moon'
-    Config.Lmoon6 = 'Waning Gibbous'
-    Config.Lmoon7 = 'Third Quarter'
-    Config.Lmoon8 = 'Waning Crecent'
-
-try:
-    Config.digitalformat2
-except AttributeError:
-    Config.digitalformat2 = "{0:%H:%M:%S}"
-
-try:
-    Config.useslideshow
-except AttributeError:
-    Config.useslideshow = 0
-
-
-#
-# Check if Mapbox API key is set, and use mapbox if so
-try:
-    if ApiKeys.mbapi[:3].lower() == "pk.":
-        Config.usemapbox = 1
-except AttributeError:
-    pass
-
-
-try:
-    if Config.METAR != '':
-        from metar import Metar
-except AttributeError:
-    pass
-
-lastmin = -1
-lastday = -1
-pdy = ""
-lasttimestr = ""
-weatherplayer = None
-lastkeytime = 0
-lastapiget = time.time()
-
-app = QtWidgets.QApplication(sys.argv)
-desktop = app.desktop()
-rec = desktop.screenGeometry()
-height = rec.height()
-width = rec.width()
-
-signal.signal(signal.SIGINT, myquit)
-
-w = myMain()
-w.setWindowTitle(os.path.basename(__file__))
-
-w.setStyleSheet("QWidget { background-color: black;}")
-
-# connectMqtt()
-global client
-client = MqttClient()
-client.stateChanged.connect(on_stateChanged)
-client.messageSignal.connect(on_messageSignal)
-
-client.connectToHost()
-
-# fullbgpixmap = QtGui.QPixmap(Config.background)
-# fullbgrect = fullbgpixmap.rect()
-# xscale = float(width)/fullbgpixmap.width()
-# yscale = float(height)/fullbgpixmap.height()
-
-xscale = float(width) / 1440.0
-yscale = float(height) / 900.0
-
-frames = []
-framep = 0
-
-frame1 = QtWidgets.QFrame(w)
-frame1.setObjectName("frame1")
-frame1.setGeometry(0, 0, width, height)
-frame1.setStyleSheet("#frame1 { background-color: black; border-image: url(" +
-                     Config.background + ") 0 0 0 0 stretch stretch;}")
-frames.append(frame1)
-
-if Config.useslideshow:
-    imgRect = QtCore.QRect(0, 0, width, height)
-    objimage1 = SS(frame1, imgRect, "image1")
-
-frame2 = QtWidgets.QFrame(w)
-frame2.setObjectName("frame2")
-frame2.setGeometry(0, 0, width, height)
-frame2.setStyleSheet("#frame2 { background-color: blue; border-image: url(" +
-                     Config.background + ") 0 0 0 0 stretch stretch;}")
-frame2.setVisible(False)
-frames.append(frame2)
-
-# frame3 = QtGui.QFrame(w)
-# frame3.setObjectName("frame3")
-# frame3.setGeometry(0,0,width,height)
-# frame3.setStyleSheet("#frame3 { background-color: blue; border-image:
-#       url("+Config.background+") 0 0 0 0 stretch stretch;}")
-# frame3.setVisible(False)
-# frames.append(frame3)
-
-foreGround = QtWidgets.QFrame(frame1)
-foreGround.setObjectName("foreGround")
-foreGround.setStyleSheet("#foreGround { background-color: transparent; }")
-foreGround.setGeometry(0, 0, width, height)
-
-squares1 = QtWidgets.QFrame(foreGround)
-squares1.setObjectName("squares1")
-squares1.setGeometry(0, height - yscale * 600, xscale * 340, yscale * 600)
-squares1.setStyleSheet(
-    "#squares1 { background-color: transparent; border-image: url(" +
-    Config.squares1 +
-    ") 0 0 0 0 stretch stretch;}")
-
-squares2 = QtWidgets.QFrame(foreGround)
-squares2.setObjectName("squares2")
-squares2.setGeometry(width - xscale * 340, 0, xscale * 340, yscale * 900)
-squares2.setStyleSheet(
-    "#squares2 { background-color: transparent; border-image: url(" +
-    Config.squares2 +
-    ") 0 0 0 0 stretch stretch;}")
-
-if not Config.digital:
-    clockface = QtWidgets.QFrame(foreGround)
-    clockface.setObjectName("clockface")
-    clockrect = QtCore.QRect(
-        width / 2 - height * .325,
-        height * .45 - height * .4,
-        height * .65,
-        height * .65)
-    clockface.setGeometry(clockrect)
-    clockface.setStyleSheet(
-        "#clockface { background-color: transparent; border-image: url(" +
-        Config.clockface +
-        ") 0 0 0 0 stretch stretch;}")
-
-    hourhand = QtWidgets.QLabel(foreGround)
-    hourhand.setObjectName("hourhand")
-    hourhand.setStyleSheet("#hourhand { background-color: transparent; }")
-
-    minhand = QtWidgets.QLabel(foreGround)
-    minhand.setObjectName("minhand")
-    minhand.setStyleSheet("#minhand { background-color: transparent; }")
-
-    sechand = QtWidgets.QLabel(foreGround)
-    sechand.setObjectName("sechand")
-    sechand.setStyleSheet("#sechand { background-color: transparent; }")
-
-    hourpixmap = QtGui.QPixmap(Config.hourhand)
-    hourpixmap2 = QtGui.QPixmap(Config.hourhand)
-    minpixmap = QtGui.QPixmap(Config.minhand)
-    minpixmap2 = QtGui.QPixmap(Config.minhand)
-    secpixmap = QtGui.QPixmap(Config.sechand)
-    secpixmap2 = QtGui.QPixmap(Config.sechand)
-else:
-    clockface = QtWidgets.QLabel(foreGround)
-    clockface.setObjectName("clockface")
-    clockrect = QtCore.QRect(
-        width / 2 - height * .325,
-        height * .45 - height * .4,
-        height * .65,
-        height * .65)
-    clockface.setGeometry(clockrect)
-    dcolor = QColor(Config.digitalcolor).darker(0).name()
-    lcolor = QColor(Config.digitalcolor).lighter(120).name()
-    clockface.setStyleSheet(
-        "#clockface { background-color: transparent; font-family:sans-serif;" +
-        " font-weight: light; color: " +
-        lcolor +
-        "; background-color: transparent; font-size: " +
-        str(int(Config.digitalsize * xscale)) +
-        "px; " +
-        Config.fontattr +
-        "}")
-    clockface.setAlignment(Qt.AlignCenter)
-    clockface.setGeometry(clockrect)
-    glow = QtWidgets.QGraphicsDropShadowEffect()
-    glow.setOffset(0)
-    glow.setBlurRadius(50)
-    glow.setColor(QColor(dcolor))
-    clockface.setGraphicsEffect(glow)
-
-
-radar1rect = QtCore.QRect(3 * xscale, 344 * yscale, 300 * xscale, 275 * yscale)
-objradar1 = Radar(foreGround, Config.radar1, radar1rect, "radar1")
-
-radar2rect = QtCore.QRect(3 * xscale, 622 * yscale, 300 * xscale, 275 * yscale)
-objradar2 = Radar(foreGround, Config.radar2, radar2rect, "radar2")
-
-radar3rect = QtCore.QRect(13 * xscale, 50 * yscale, 700 * xscale, 700 * yscale)
-objradar3 = Radar(frame2, Config.radar3, radar3rect, "radar3")
-
-radar4rect = QtCore.QRect(726 * xscale, 50 * yscale,
-                          700 * xscale, 700 * yscale)
-objradar4 = Radar(frame2, Config.radar4, radar4rect, "radar4")
-
-actualweather = QtWidgets.QLabel(foreGround)
-actualweather.setObjectName("actualweather")
-actualweather.setStyleSheet("#actualweather { background-color: rgba(0, 0, 0, 40%);}")
-                    # " border-width: 10px; border-style: solid; border-image: linear-gradient(to top, black, rgba(0, 0, 0, 0)) 1 100%; }")
-
-actualweather.setGeometry(0, 0, 300 * xscale, 337 * yscale)
-
-datex = QtWidgets.QLabel(foreGround)
-datex.setObjectName("datex")
-datex.setStyleSheet("#datex { font-family:sans-serif; color: " +
-                    Config.textcolor +
-                    "; background-color: transparent; font-size: " +
-                    str(int(50 * xscale * Config.fontmult)) +
-                    "px; " +
-                    Config.fontattr +
-                    "}")
-datex.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-datex.setGeometry(0, 0, width, 100 * yscale)
-
-datex2 = QtWidgets.QLabel(frame2)
-datex2.setObjectName("datex2")
-datex2.setStyleSheet("#datex2 { font-family:sans-serif; color: " +
-                     Config.textcolor +
-                     "; background-color: transparent; font-size: " +
-                     str(int(50 * xscale * Config.fontmult)) + "px; " +
-                     Config.fontattr +
-                     "}")
-datex2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-datex2.setGeometry(800 * xscale, 780 * yscale, 640 * xscale, 100)
-datey2 = QtWidgets.QLabel(frame2)
-datey2.setObjectName("datey2")
-datey2.setStyleSheet("#datey2 { font-family:sans-serif; color: " +
-                     Config.textcolor +
-                     "; background-color: transparent; font-size: " +
-                     str(int(50 * xscale * Config.fontmult)) +
-                     "px; " +
-                     Config.fontattr +
-                     "}")
-datey2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-datey2.setGeometry(800 * xscale, 840 * yscale, 640 * xscale, 100)
-
-attribution = QtWidgets.QLabel(foreGround)
-attribution.setObjectName("attribution")
-attribution.setStyleSheet("#attribution { " +
-                          " background-color: transparent; color: " +
-                          Config.textcolor +
-                          "; font-size: " +
-                          str(int(12 * xscale)) +
-                          "px; " +
-                          Config.fontattr +
-                          "}")
-attribution.setAlignment(Qt.AlignTop)
-attribution.setGeometry(6 * xscale, 3 * yscale, 100 * xscale, 100)
-
-ypos = -25
-wxicon = QtWidgets.QLabel(foreGround)
-wxicon.setObjectName("wxicon")
-wxicon.setStyleSheet("#wxicon { background-color: transparent; }")
-wxicon.setGeometry(75 * xscale, ypos * yscale, 150 * xscale, 150 * yscale)
-
-attribution2 = QtWidgets.QLabel(frame2)
-attribution2.setObjectName("attribution2")
-attribution2.setStyleSheet("#attribution2 { " +
-                           "background-color: transparent; color: " +
-                           Config.textcolor +
-                           "; font-size: " +
-                           str(int(12 * xscale * Config.fontmult)) +
-                           "px; " +
-                           Config.fontattr +
-                           "}")
-attribution2.setAlignment(Qt.AlignTop)
-attribution2.setGeometry(6 * xscale, 880 * yscale, 100 * xscale, 100)
-
-wxicon2 = QtWidgets.QLabel(frame2)
-wxicon2.setObjectName("wxicon2")
-wxicon2.setStyleSheet("#wxicon2 { background-color: transparent; }")
-wxicon2.setGeometry(0 * xscale, 750 * yscale, 150 * xscale, 150 * yscale)
-
-ypos += 130
-wxdesc = QtWidgets.QLabel(foreGround)
-wxdesc.setObjectName("wxdesc")
-wxdesc.setStyleSheet("#wxdesc { background-color: transparent; color: " +
-                     Config.textcolor +
-                     "; font-size: " +
-                     str(int(30 * xscale)) +
-                     "px; " +
-                     Config.fontattr +
-                     "}")
-wxdesc.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-wxdesc.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
-
-wxdesc2 = QtWidgets.QLabel(frame2)
-wxdesc2.setObjectName("wxdesc2")
-wxdesc2.setStyleSheet("#wxdesc2 { background-color: transparent; color: " +
-                      Config.textcolor +
-                      "; font-size: " +
-                      str(int(50 * xscale * Config.fontmult)) +
-                      "px; " +
-                      Config.fontattr +
-                      "}")
-wxdesc2.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-wxdesc2.setGeometry(400 * xscale, 800 * yscale, 400 * xscale, 100)
-
-ypos += 25
-temper = QtWidgets.QLabel(foreGround)
-temper.setObjectName("temper")
-temper.setStyleSheet("#temper { background-color: transparent; color: " +
-                     Config.textcolor +
-                     "; font-size: " +
-                     str(int(70 * xscale * Config.fontmult)) +
-                     "px; " +
-                     Config.fontattr +
-                     "}")
-temper.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-temper.setGeometry(3 * xscale, ypos * yscale,
-                   300 * xscale, 100 * yscale)
-
-temper2 = QtWidgets.QLabel(frame2)
-temper2.setObjectName("temper2")
-temper2.setStyleSheet("#temper2 { background-color: transparent; color: " +
-                      Config.textcolor +
-                      "; font-size: " +
-                      str(int(70 * xscale * Config.fontmult)) +
-                      "px; " +
-                      Config.fontattr +
-                      "}")
-temper2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-temper2.setGeometry(125 * xscale, 780 * yscale, 300 * xscale, 100)
-
-ypos += 80
-press = QtWidgets.QLabel(foreGround)
-press.setObjectName("press")
-press.setStyleSheet("#press { background-color: transparent; color: " +
-                    Config.textcolor +
-                    "; font-size: " +
-                    str(int(25 * xscale * Config.fontmult)) +
-                    "px; " +
-                    Config.fontattr +
-                    "}")
-press.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-press.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
-
-ypos += 30
-humidity = QtWidgets.QLabel(foreGround)
-humidity.setObjectName("humidity")
-humidity.setStyleSheet("#humidity { background-color: transparent; color: " +
-                       Config.textcolor +
-                       "; font-size: " +
-                       str(int(25 * xscale * Config.fontmult)) +
-                       "px; " +
-                       Config.fontattr +
-                       "}")
-humidity.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-humidity.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
-
-ypos += 30
-wind = QtWidgets.QLabel(foreGround)
-wind.setObjectName("wind")
-wind.setStyleSheet("#wind { background-color: transparent; color: " +
-                   Config.textcolor +
-                   "; font-size: " +
-                   str(int(20 * xscale * Config.fontmult)) +
-                   "px; " +
-                   Config.fontattr +
-                   "}")
-wind.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-wind.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
-
-ypos += 20
-wind2 = QtWidgets.QLabel(foreGround)
-wind2.setObjectName("wind2")
-wind2.setStyleSheet("#wind2 { background-color: transparent; color: " +
-                    Config.textcolor +
-                    "; font-size: " +
-                    str(int(20 * xscale * Config.fontmult)) +
-                    "px; " +
-                    Config.fontattr +
-                    "}")
-wind2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-wind2.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
-
-ypos += 20
-wdate = QtWidgets.QLabel(foreGround)
-wdate.setObjectName("wdate")
-wdate.setStyleSheet("#wdate { background-color: transparent; color: " +
-                    Config.textcolor +
-                    "; font-size: " +
-                    str(int(15 * xscale * Config.fontmult)) +
-                    "px; " +
-                    Config.fontattr +
-                    "}")
-wdate.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-wdate.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
-
-bottom = QtWidgets.QLabel(foreGround)
-bottom.setObjectName("bottom")
-bottom.setStyleSheet("#bottom { font-family:sans-serif; color: " +
-                     Config.textcolor +
-                     "; background-color: rgba(0, 0, 0, 40%); font-size: " +
-                     str(int(30 * xscale * Config.fontmult)) +
-                     "px; " +
-                     Config.fontattr +
-                     "}")
-bottom.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-bottom.setGeometry(310 * xscale, height - 78 * yscale, width - 620 * xscale, 80 * yscale)
-
-temp = QtWidgets.QLabel(foreGround)
-temp.setObjectName("temp")
-temp.setStyleSheet("#temp { font-family:sans-serif; color: " +
-                   Config.textcolor +
-                   "; background-color: transparent; font-size: " +
-                   str(int(30 * xscale * Config.fontmult)) +
-                   "px; " +
-                   Config.fontattr +
-                   "}")
-temp.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-temp.setGeometry(0, height - 100 * yscale, width, 50 * yscale)
-
-
-forecast = []
-for i in range(0, 9):
-    lab = QtWidgets.QLabel(foreGround)
-    lab.setObjectName("forecast" + str(i))
-    lab.setStyleSheet("QWidget { background-color: rgba(0, 0, 0, 40%); color: " +
-                      Config.textcolor +
-                      "; font-size: " +
-                      str(int(20 * xscale * Config.fontmult)) +
-                      "px; " +
-                      Config.fontattr +
-                      "}")
-    lab.setGeometry(1137 * xscale, i * 100 * yscale,
-                    300 * xscale, 100 * yscale)
-
-    icon = QtWidgets.QLabel(lab)
-    icon.setStyleSheet("#icon { background-color: rgba(0, 0, 0, 40%); }")
-    icon.setGeometry(0, 0, 100 * xscale, 100 * yscale)
-    icon.setObjectName("icon")
-
-    wx = QtWidgets.QLabel(lab)
-    wx.setStyleSheet("#wx { background-color: transparent; }")
-    wx.setGeometry(100 * xscale, 5 * yscale, 200 * xscale, 120 * yscale)
-    wx.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-    wx.setWordWrap(True)
-    wx.setObjectName("wx")
-
-    day = QtWidgets.QLabel(lab)
-    day.setStyleSheet("#day { background-color: transparent; }")
-    day.setGeometry(100 * xscale, 75 * yscale, 200 * xscale, 25 * yscale)
-    day.setAlignment(Qt.AlignRight | Qt.AlignBottom)
-    day.setObjectName("day")
-
-    forecast.append(lab)
-
-sensor1 = QtWidgets.QLabel(foreGround)
-sensor1.setObjectName("sensor1")
-sensor1.setStyleSheet("#sensor1 { font-family:sans-serif; color: " +
-                     Config.textcolor +
-                     "; background-color: rgba(0, 0, 0, 40%); font-size: " +
-                     str(int(30 * xscale * Config.fontmult)) +
-                     "px; " +
-                     Config.fontattr +
-                     "}")
-sensor1.setGeometry(width / 2 - 400 * xscale , height - 280 * yscale, 400 * xscale, 170 * yscale)
-sensor1.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-
-sensor1Battery = QtWidgets.QLabel(foreGround)
-sensor1Battery.setStyleSheet("#sensor1Battery { background-color: transparent; }")
-sensor1Battery.setObjectName("sensor1Battery")
-sensor1Battery.setGeometry(width / 2 - 135 * xscale , height - 250 * yscale, 40 * xscale, 40 * yscale)
-
-sensor1Date = QtWidgets.QLabel(foreGround)
-sensor1Date.setObjectName("sensor1Date")
-sensor1Date.setStyleSheet("#sensor1Date { background-color: transparent; color: " +
-                    Config.textcolor +
-                    "; font-size: " +
-                    str(int(15 * xscale * Config.fontmult)) +
-                    "px; " +
-                    Config.fontattr +
-                    "}")
-sensor1Date.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-sensor1Date.setGeometry(width / 2 - 400 * xscale , height - 140 * yscale, 400 * xscale, 20 * yscale)
-
-sensor1Strength = QtWidgets.QLabel(foreGround)
-sensor1Strength.setStyleSheet("#sensor1Strength { background-color: transparent; }")
-sensor1Strength.setObjectName("sensor1Strength")
-sensor1Strength.setGeometry(width / 2 - 310 * xscale , height - 250 * yscale, 40 * xscale, 40 * yscale)
-
-sensor2 = QtWidgets.QLabel(foreGround)
-sensor2.setObjectName("sensor2")
-sensor2.setStyleSheet("#sensor2 { font-family:sans-serif; color: " +
-                     Config.textcolor +
-                     "; background-color: rgba(0, 0, 0, 40%); font-size: " +
-                     str(int(30 * xscale * Config.fontmult)) +
-                     "px; " +
-                     Config.fontattr +
-                     "}")
-sensor2.setGeometry(width / 2 , height - 280 * yscale, 400 * xscale, 170 * yscale)
-sensor2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-
-sensor2Battery = QtWidgets.QLabel(foreGround)
-sensor2Battery.setStyleSheet("#sensor2Battery { background-color: transparent; }")
-sensor2Battery.setObjectName("sensor2Battery")
-sensor2Battery.setGeometry(width / 2 + 90 * xscale , height - 250 * yscale, 40 * xscale, 40 * yscale)
-
-sensor2Date = QtWidgets.QLabel(foreGround)
-sensor2Date.setObjectName("sensor2Date")
-sensor2Date.setStyleSheet("#sensor2Date { background-color: transparent; color: " +
-                    Config.textcolor +
-                    "; font-size: " +
-                    str(int(15 * xscale * Config.fontmult)) +
-                    "px; " +
-                    Config.fontattr +
-                    "}")
-sensor2Date.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-sensor2Date.setGeometry(width / 2 , height - 140 * yscale, 400 * xscale, 20 * yscale)
-
-sensor2Strength = QtWidgets.QLabel(foreGround)
-sensor2Strength.setStyleSheet("#sensor2Strength { background-color: transparent; }")
-sensor2Strength.setObjectName("sensor2Strength")
-sensor2Strength.setGeometry(width / 2 + 275 * xscale , height - 250 * yscale, 40 * xscale, 40 * yscale)
-
-manager = QtNetwork.QNetworkAccessManager()
-
-# proxy = QNetworkProxy()
-# proxy.setType(QNetworkProxy.HttpProxy)
-# proxy.setHostName("localhost")
-# proxy.setPort(8888)
-# QNetworkProxy.setApplicationProxy(proxy)
-
-stimer = QtCore.QTimer()
-stimer.singleShot(10, qtstart)
-
-# print radarurl(Config.radar1,radar1rect)
-
-w.show()
-w.showFullScreen()
-
-sys.exit(app.exec_())
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or 
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the 
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# -*- coding: utf-8 -*-                 # NOQA
+
+import sys
+import os
+import platform
+import signal
+import datetime
+from threading import Event
+import dateutil.parser
+import tzlocal
+import time
+import json
+import locale
+import random
+import math 
+import paho.mqtt.client as mqtt
+from metar import Metar
+
+from PyQt5 import QtGui, QtCore, QtNetwork, QtWidgets
+from PyQt5.QtGui import QPixmap, QBrush, QColor
+from PyQt5.QtGui import QPainter, QImage, QFont
+from PyQt5.QtCore import QEventLoop, QUrl, pyqtSignal
+from PyQt5.QtCore import Qt
+from PyQt5.QtNetwork import QNetworkReply
+from PyQt5.QtNetwork import QNetworkRequest
+from subprocess import Popen
+
+sys.dont_write_bytecode = True
+from GoogleMercatorProjection import getPoints, getTilePlan, tilePlanReport  # NOQA
+from GoogleMercatorProjection import LatLng  # NOQA
+from LocalTiles import openTileSource, stitchedName, tilesMtime  # NOQA
+from NetworkQueue import DownloadQueue, PRIO_WEATHER, PRIO_HIDDEN  # NOQA
+from NetworkQueue import PRIO_RADAR_NEWEST, PRIO_RADAR_HISTORY  # NOQA
+from NetworkQueue import LINK_GOOD, LINK_POOR, LINK_BAD, LINK_VERY_BAD  # NOQA
+from NetworkUsage import NetworkUsage  # NOQA
+from Sensors import SensorRegistry, MessageCoalescer, parseReading  # NOQA
+from SensorStore import SensorStore  # NOQA
+from MqttLoop import QtMqttLoop  # NOQA
+import WeatherSnapshot  # NOQA
+from MqttReplay import MqttRecorder, Replayer, ReplayMessage, ReplayStats  # NOQA
+import Instrumentation  # NOQA
+from Instrumentation import timed, LagMonitor  # NOQA
+from MemoryReport import MemoryMonitor, rss  # NOQA
+from Metrics import MetricsPage, MetricsServer  # NOQA
+from Instrumentation import timeline, measure  # NOQA
+import Tracing  # NOQA
+import ApiKeys                                              # NOQA
+
+timeline.mark('imports')
+
+
+# base URL of each data provider, Config.provider_urls overrides them
+# (for example to use the StandIn.py local server)
+PROVIDERS = {
+    'owm': 'https://api.openweathermap.org',
+    'metar': 'https://tgftp.nws.noaa.gov',
+    'rainviewer': 'https://tilecache.rainviewer.com',
+    'mapbox': 'https://api.mapbox.com',
+    'google': 'http://maps.googleapis.com',
+    'climacell': 'https://api.climacell.co',
+    'darksky': 'https://api.darksky.net',
+}
+
+
+def provider(name):
+    return Config.provider_urls.get(name, PROVIDERS[name]).rstrip('/')
+
+
+class tzutc(datetime.tzinfo):
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=0, minutes=0)
+
+
+class suntimes:
+    def __init__(self, lat, long):
+        self.lat = lat
+        self.long = long
+
+    def sunrise(self, when=None):
+        if when is None:
+            when = datetime.datetime.now(tz=tzlocal.get_localzone())
+        self.__preptime(when)
+        self.__calc()
+        return suntimes.__timefromdecimalday(self.sunrise_t)
+
+    def sunset(self, when=None):
+        if when is None:
+            when = datetime.datetime.now(tz=tzlocal.get_localzone())
+        self.__preptime(when)
+        self.__calc()
+        return suntimes.__timefromdecimalday(self.sunset_t)
+
+    @staticmethod
+    def __timefromdecimalday(day):
+        hours = 24.0*day
+        h = int(hours)
+        minutes = (hours-h)*60
+        m = int(minutes)
+        seconds = (minutes-m)*60
+        s = int(seconds)
+        return datetime.time(hour=h, minute=m, second=s)
+
+    def __preptime(self, when):
+        # datetime days are numbered in the Gregorian calendar
+        # while the calculations from NOAA are distibuted as
+        # OpenOffice spreadsheets with days numbered from
+        # 1/1/1900. The difference are those numbers taken for
+        # 18/12/2010
+        self.day = when.toordinal()-(734124-40529)
+        t = when.time()
+        self.time = (t.hour + t.minute/60.0 + t.second/3600.0) / 24.0
+
+        self.timezone = 0
+        offset = when.utcoffset()
+        if offset is not None:
+            self.timezone = offset.seconds / 3600.0 + (offset.days * 24)
+
+    def __calc(self):
+        timezone = self.timezone  # in hours, east is positive
+        longitude = self.long     # in decimal degrees, east is positive
+        latitude = self.lat       # in decimal degrees, north is positive
+
+        time = self.time  # percentage past midnight, i.e. noon  is 0.5
+        day = self.day     # daynumber 1=1/1/1900
+
+        Jday = day+2415018.5 + time - timezone / 24  # Julian day
+        Jcent = (Jday - 2451545) / 36525    # Julian century
+
+        Manom = 357.52911 + Jcent * (35999.05029 - 0.0001537 * Jcent)
+        Mlong = 280.46646 + Jcent * (36000.76983 + Jcent * 0.0003032) % 360
+        Eccent = 0.016708634 - Jcent * (0.000042037 + 0.0001537 * Jcent)
+        Mobliq = (23 + (26 + ((21.448 - Jcent * (46.815 + Jcent *
+                  (0.00059 - Jcent * 0.001813)))) / 60) / 60)
+        obliq = (Mobliq + 0.00256 *
+                 math.cos(math.radians(125.04-1934.136 * Jcent)))
+        vary = (math.tan(math.radians(obliq / 2)) *
+                math.tan(math.radians(obliq / 2)))
+        Seqcent = (math.sin(math.radians(Manom)) *
+                   (1.914602 - Jcent*(0.004817 + 0.000014 * Jcent)) +
+                   math.sin(math.radians(2 * Manom))
+                   * (0.019993 - 0.000101 * Jcent) +
+                   math.sin(math.radians(3 * Manom)) * 0.000289)
+        Struelong = Mlong + Seqcent
+        Sapplong = (Struelong - 0.00569 - 0.00478 *
+                    math.sin(math.radians(125.04-1934.136*Jcent)))
+        declination = (math.degrees(math.asin(math.sin(math.radians(obliq)) *
+                       math.sin(math.radians(Sapplong)))))
+
+        eqtime = (4 * math.degrees(vary * math.sin(2 * math.radians(Mlong)) -
+                  2 * Eccent*math.sin(math.radians(Manom)) + 4 * Eccent *
+                  vary * math.sin(math.radians(Manom)) *
+                  math.cos(2 * math.radians(Mlong)) - 0.5 * vary * vary *
+                  math.sin(4 * math.radians(Mlong)) - 1.25 * Eccent * Eccent *
+                  math.sin(2*math.radians(Manom))))
+
+        hourangle0 = (math.cos(math.radians(90.833)) /
+                      (math.cos(math.radians(latitude)) *
+                      math.cos(math.radians(declination))) -
+                      math.tan(math.radians(latitude)) *
+                      math.tan(math.radians(declination)))
+
+        self.solarnoon_t = (720-4 * longitude - eqtime + timezone * 60) / 1440
+        # sun never sets
+        if hourangle0 > 1.0:
+            self.sunrise_t = 0.0
+            self.sunset_t = 1.0 - 1.0/86400.0
+            return
+        if hourangle0 < -1.0:
+            self.sunrise_t = 0.0
+            self.sunset_t = 0.0
+            return
+
+        hourangle = math.degrees(math.acos(hourangle0))
+
+        self.sunrise_t = self.solarnoon_t - hourangle * 4 / 1440
+        self.sunset_t = self.solarnoon_t + hourangle * 4 / 1440
+
+
+
+# https://gist.github.com/miklb/ed145757971096565723
+def moon_phase(dt=None):
+    if dt is None:
+        dt = datetime.datetime.now()
+    diff = dt - datetime.datetime(2001, 1, 1)
+    days = float(diff.days) + (float(diff.seconds) / 86400.0)
+    lunations = 0.20439731 + float(days) * 0.03386319269
+    return lunations % 1.0
+
+@timed('tick')
+def tick():
+    global hourpixmap, minpixmap, secpixmap
+    global hourpixmap2, minpixmap2, secpixmap2
+    global lastmin, lastday, lasttimestr
+    global clockrect
+    global datex, datex2, datey2, pdy
+    global sun, daytime, sunrise, sunset
+    global bottom
+
+    if lagmonitor is not None:
+        lagmonitor.beat()
+
+    if Config.DateLocale != "":
+        try:
+            locale.setlocale(locale.LC_TIME, Config.DateLocale)
+        except:
+            pass
+
+    now = datetime.datetime.now()
+    if Config.digital:
+        timestr = Config.digitalformat.format(now)
+        if Config.digitalformat.find("%I") > -1:
+            if timestr[0] == '0':
+                timestr = timestr[1:99]
+        if lasttimestr != timestr:
+            clockface.setText(timestr.lower())
+        lasttimestr = timestr
+    else:
+        angle = now.second * 6
+        ts = secpixmap.size()
+        secpixmap2 = secpixmap.transformed(
+            QtGui.QTransform().scale(
+                float(clockrect.width()) / ts.height(),
+                float(clockrect.height()) / ts.height()
+            ).rotate(angle),
+            Qt.SmoothTransformation
+        )
+        sechand.setPixmap(secpixmap2)
+        ts = secpixmap2.size()
+        sechand.setGeometry(
+            clockrect.center().x() - ts.width() / 2,
+            clockrect.center().y() - ts.height() / 2,
+            ts.width(),
+            ts.height()
+        )
+        if now.minute != lastmin:
+            angle = now.minute * 6
+            ts = minpixmap.size()
+            minpixmap2 = minpixmap.transformed(
+                QtGui.QTransform().scale(
+                    float(clockrect.width()) / ts.height(),
+                    float(clockrect.height()) / ts.height()
+                ).rotate(angle),
+                Qt.SmoothTransformation
+            )
+            minhand.setPixmap(minpixmap2)
+            ts = minpixmap2.size()
+            minhand.setGeometry(
+                clockrect.center().x() - ts.width() / 2,
+                clockrect.center().y() - ts.height() / 2,
+                ts.width(),
+                ts.height()
+            )
+
+            angle = ((now.hour % 12) + now.minute / 60.0) * 30.0
+            ts = hourpixmap.size()
+            hourpixmap2 = hourpixmap.transformed(
+                QtGui.QTransform().scale(
+                    float(clockrect.width()) / ts.height(),
+                    float(clockrect.height()) / ts.height()
+                ).rotate(angle),
+                Qt.SmoothTransformation
+            )
+            hourhand.setPixmap(hourpixmap2)
+            ts = hourpixmap2.size()
+            hourhand.setGeometry(
+                clockrect.center().x() - ts.width() / 2,
+                clockrect.center().y() - ts.height() / 2,
+                ts.width(),
+                ts.height()
+            )
+
+    dy = Config.digitalformat2.format(now)
+    if Config.digitalformat2.find("%I") > -1:
+        if dy[0] == '0':
+            dy = dy[1:99]
+    if dy != pdy:
+        pdy = dy
+        datey2.setText(dy)
+
+    if now.minute != lastmin:
+        lastmin = now.minute
+        if now.time() >= sunrise and now.time() <= sunset:
+            daytime = True
+        else:
+            daytime = False
+
+    if now.day != lastday:
+        lastday = now.day
+        # date
+        sup = 'th'
+        if (now.day == 1 or now.day == 21 or now.day == 31):
+            sup = 'st'
+        if (now.day == 2 or now.day == 22):
+            sup = 'nd'
+        if (now.day == 3 or now.day == 23):
+            sup = 'rd'
+        if Config.DateLocale != "":
+            sup = ""
+        ds = now.strftime("%A %d %B %Y").capitalize()
+        ds2 = now.strftime("%a %d %b %Y").capitalize()
+        # ds = "{0:%A %B} {0.day}<sup>{1}</sup> {0.year}".format(now, sup)
+        # ds2 = "{0:%a %b} {0.day}<sup>{1}</sup> {0.year}".format(now, sup)
+        print(ds)
+        datex.setText(ds)
+        datex2.setText(ds2)
+        dt = tzlocal.get_localzone().localize(now)
+        sunrise = sun.sunrise(dt)
+        sunset = sun.sunset(dt)
+        bottomText = ""
+        bottomText += (Config.LSunRise +
+                       "{0:%H:%M}".format(sunrise) +
+                       Config.LSet +
+                       "{0:%H:%M}".format(sunset)) + "\n"
+        bottomText += (Config.LMoonPhase + phase(moon_phase()))
+        bottom.setText(bottomText)
+
+
+@timed('tempfinished')
+def tempfinished(reading):
+    if reading.temperature is None:
+        return
+    if reading.linkquality is None:
+        print("Info : no quality information available in the MQTT message")
+    if reading.voltage is None:
+        print("Info : no voltage information available in the MQTT message")
+    if reading.battery is None:
+        print("Info : no battery information available in the MQTT message")
+
+    sensor = sensorRegistry.lookup(reading.topic)
+    if sensor is None:
+        print("tempfinished() error : Could not find the corresponding MQTT topic " + reading.topic + " in the configuration !")
+        return
+    sensorStore.append(reading)
+    sensorGrid.update(sensor, reading)
+
+
+def storeflush():
+    global lastmaintain
+    try:
+        sensorStore.flush()
+        # downsampling of the archive, once an hour is plenty
+        if time.time() - lastmaintain > 3600:
+            lastmaintain = time.time()
+            sensorStore.maintain()
+    except Exception as e:
+        print("storeflush() error : " + str(e))
+
+lastmaintain = 0
+
+
+def usagesave():
+    global usagehour
+    netusage.save()
+    # the rollup of the last full hour, when there is a new one
+    hour = time.strftime('%Y-%m-%dT%H', time.gmtime(time.time() - 3600))
+    if hour != usagehour:
+        usagehour = hour
+        lines = netusage.report(hour)
+        if lines:
+            print("network usage " + hour + "h UTC:")
+            for line in lines:
+                print("  " + line)
+
+usagehour = ''
+
+
+def pixmapBytes(pixmap):
+    if pixmap is None or pixmap.isNull():
+        return 0
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+def memtallies():
+    # {name: (count, bytes)} of what the clock holds on to
+    radars = [objradar1, objradar2, objradar3, objradar4]
+    frames = [f["image"] for r in radars for f in r.frameImages]
+    bases = []
+    for r in radars:
+        bases.append(getattr(r, 'basepixmap', None))
+        bases.append(getattr(r, 'mkpixmap', None))
+    bases = [b for b in bases if b is not None]
+    sparks = [spark.pix for cell in sensorGrid.cells
+              for spark in cell.sparklines.values()]
+    tallies = {
+        'radar frames': (len(frames), sum(pixmapBytes(p) for p in frames)),
+        'radar basemaps': (len(bases), sum(pixmapBytes(p) for p in bases)),
+        'sparklines': (len(sparks), sum(pixmapBytes(p) for p in sparks)),
+        'sensor history': (sum(len(ring) for ring in sensorStore.rings.values()),
+                           0),
+        'wxdata': (1, len(json.dumps(wxdata)) if 'wxdata' in globals() else 0),
+    }
+    if Config.useslideshow:
+        tallies['slides'] = (len(objimage1.img_list),
+                             pixmapBytes(objimage1.pixmap()))
+    return tallies
+
+
+def memreport():
+    for line in memmonitor.report(memtallies()):
+        print("memory " + line)
+
+
+def metricsupdate():
+    # built here in the GUI thread, the HTTP thread only serves the text
+    now = time.time()
+    m = MetricsPage()
+    m.gauge('process_resident_memory_bytes', rss(), help='Resident set size')
+    if lagmonitor is not None:
+        m.histogram('event_loop_lag_seconds', lagmonitor.hist,
+                    help='Lateness of the 1s clock tick')
+        m.counter('event_loop_stalls', lagmonitor.stalls,
+                  help='GUI thread stalls longer than the threshold')
+    hists, caches = Instrumentation.cumulative()
+    for name in sorted(hists):
+        m.histogram('callback_seconds', hists[name], {'callback': name},
+                    'Wall time of the GUI thread callbacks')
+    for name in sorted(caches):
+        hits, misses = caches[name]
+        m.counter('cache_hits', hits, {'cache': name}, 'Cache hits')
+        m.counter('cache_misses', misses, {'cache': name}, 'Cache misses')
+        if hits + misses:
+            m.gauge('cache_hit_ratio', hits / float(hits + misses),
+                    {'cache': name}, 'Cache hits over lookups')
+
+    for radar in (objradar1, objradar2, objradar3, objradar4):
+        labels = {'radar': radar.myname}
+        m.gauge('radar_frames', len(radar.frameImages), labels,
+                'Radar frames ready to show')
+        m.gauge('radar_frames_expected', radar.expectedFrames, labels,
+                'Radar frames wanted at the current link level')
+        stats = radar.frameStats
+        m.counter('radar_frames_shown', stats.shown, labels,
+                  'Radar animation frames shown')
+        m.counter('radar_frames_late', stats.late, labels,
+                  'Frames shown more than half a period late')
+        m.counter('radar_frames_dropped', stats.dropped, labels,
+                  'Animation ticks that never came')
+        m.histogram('radar_frame_interval_seconds', stats.interval, labels,
+                    'Time between two animation frames')
+        m.histogram('radar_frame_lateness_seconds', stats.lateness, labels,
+                    'Time a frame came after its plan')
+        m.histogram('radar_frame_swap_seconds', stats.swap, labels,
+                    'Cost of setting the frame pixmap')
+        if radar.frameImages:
+            newest = max(f["time"] for f in radar.frameImages)
+            m.gauge('radar_frame_age_seconds', now - newest, labels,
+                    'Age of the newest radar frame')
+
+    for name, t in sorted(netusage.lastok.items()):
+        m.gauge('provider_last_success_timestamp_seconds', t,
+                {'provider': name}, 'Last good answer of the provider')
+    for name, c in sorted(netusage.totals.items()):
+        labels = {'provider': name}
+        m.counter('provider_requests', c['requests'], labels,
+                  'Requests sent to the provider')
+        m.counter('provider_refused', c['refused'], labels,
+                  'Requests refused by the quota guard')
+        m.counter('provider_errors', c['errors'], labels,
+                  'Failed requests')
+        m.counter('provider_bytes', c['bytes'], labels, 'Bytes received')
+    m.gauge('net_queue_pending', len(netqueue.pending),
+            help='Downloads waiting for a slot')
+    m.gauge('net_queue_active', len(netqueue.active),
+            help='Downloads in flight')
+    m.counter('net_queue_preempted', netqueue.preempted,
+              help='Hidden downloads aborted for more important ones')
+    m.gauge('net_link_level', netqueue.estimator.level,
+            help='Link quality, 0 good to 3 very bad')
+
+    stats = client.coalescer.stats()
+    m.counter('mqtt_messages', stats['received'],
+              help='MQTT sensor messages received')
+    m.counter('mqtt_messages_coalesced', stats['coalesced'],
+              help='Messages replaced by a newer one before display')
+    m.counter('mqtt_flushes', stats['flushes'],
+              help='Batches of readings handed to the GUI thread')
+    m.gauge('mqtt_pending', stats['pending'], help='Readings not shown yet')
+    for topic, sensor in sorted(sensorGrid.sensors.items()):
+        reading = sensorGrid.latest.get(topic)
+        if reading is None:
+            continue
+        labels = {'sensor': sensor.name, 'topic': topic}
+        m.gauge('sensor_last_reading_timestamp_seconds', reading.time,
+                labels, 'Time of the last reading of the sensor')
+        m.gauge('sensor_staleness_seconds', now - reading.time, labels,
+                'Seconds since the last reading of the sensor')
+    metricsserver.publish(m.text())
+
+
+def tracedump(a=0, b=0):
+    try:
+        n = Tracing.tracer.write(Config.trace_file)
+        print("trace: %d events written to %s" % (n, Config.trace_file))
+    except (IOError, OSError) as e:
+        print("trace not written : " + str(e))
+
+
+def startupmark(name):
+    if timeline.mark(name) and timeline.complete():
+        startupreport()
+
+
+def startupreport():
+    if timeline.done:
+        return
+    timeline.done = True
+    print("startup timeline:")
+    for line in timeline.report():
+        print("  " + line)
+    if Config.startup_trace != '':
+        try:
+            timeline.export(Config.startup_trace,
+                            {'config': configname, 'host': platform.node()})
+        except (IOError, OSError) as e:
+            print("startup timeline not saved : " + str(e))
+
+
+class FirstPaint(QtCore.QObject):
+    # marks the first paint of the main window
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint:
+            startupmark('first paint')
+            obj.removeEventFilter(self)
+        return False
+
+
+def instsummary():
+    print("GUI thread callbacks, last " + str(Config.instrument_interval) + "s:")
+    for line in Instrumentation.summary(True, Config.instrument_interval):
+        print("  " + line)
+    if lagmonitor is not None:
+        print("  " + lagmonitor.report())
+    print("radar animations, since the start:")
+    for name in sorted(Instrumentation.frames):
+        print("  " + Instrumentation.frames[name].report())
+
+def getBatteryIcon(f):
+    if f > 80:
+        return 'fullbattery'
+    elif f > 30:
+        return 'halfbattery'
+    else:
+        return 'lowbattery'
+
+def getSignalIcon(f):
+    if f > 191 :
+        return 'highsignal'
+    elif f > 127 :
+        return 'mediumhighsignal'
+    elif f > 63 : 
+        return 'mediumlowsignal'
+    else : 
+        return 'lowsignal'
+
+def speedMph(f):
+    return f / 0.621371192
+
+def speedKmh(f):
+    return f * 3.6
+
+def pressi(f):
+    return f * 0.029530
+
+
+def heightImp(f):
+    return f / 25.4
+
+
+def barom(f):
+    return f * 25.4
+
+
+def phase(f):
+    pp = Config.Lmoon1          # 'New Moon'
+    if (f > 0.9375):
+            pp = Config.Lmoon1  # 'New Moon'
+    elif (f > 0.8125):
+            pp = Config.Lmoon8  # 'Waning Crecent'
+    elif (f > 0.6875):
+            pp = Config.Lmoon7  # 'Third Quarter'
+    elif (f > 0.5625):
+            pp = Config.Lmoon6  # 'Waning Gibbous'
+    elif (f > 0.4375):
+            pp = Config.Lmoon5  # 'Full Moon'
+    elif (f > 0.3125):
+            pp = Config.Lmoon4  # 'Waxing Gibbous'
+    elif (f > 0.1875):
+            pp = Config.Lmoon3  # 'First Quarter'
+    elif (f > 0.0625):
+            pp = Config.Lmoon2  # 'Waxing Crescent'
+    return pp
+
+
+def bearing(f):
+    wd = 'N'
+    if (f > 22.5):
+        wd = 'NE'
+    if (f > 67.5):
+        wd = 'E'
+    if (f > 112.5):
+        wd = 'SE'
+    if (f > 157.5):
+        wd = 'S'
+    if (f > 202.5):
+        wd = 'SO'
+    if (f > 247.5):
+        wd = 'O'
+    if (f > 292.5):
+        wd = 'NO'
+    if (f > 337.5):
+        wd = 'N'
+    return wd
+
+def replyFailed(reply, what):
+    # a failed download, or one refused by the quota guard: there is
+    # nothing to parse, the next refresh tries again
+    if reply.error() == QNetworkReply.NoError:
+        return False
+    print("Error : " + what + " download failed (error " +
+          str(int(reply.error())) + ")")
+    return True
+
+
+@timed('wxfinished_owm')
+def wxfinished_owm():
+    global wxreply, wxdata
+    if replyFailed(wxreply, "weather"):
+        return
+    wxstr = str(wxreply.readAll(),'utf-8')
+    wxdata = WeatherSnapshot.compactOwm(json.loads(wxstr))
+    showwx_owm(wxdata)
+    publishwx(WeatherSnapshot.messages(Config.wx_topic, snapshot=wxdata))
+
+
+def showwx_owm(wxdata):
+    # wxdata is the compacted one call answer, see WeatherSnapshot
+    global wxicon, temper, wxdesc, press, humidity
+    global wind, wind2, wdate, bottom, forecast
+    global wxicon2, temper2, wxdesc2, attribution
+    global daytime
+    owmicons = {
+        '01d': 'clear-day',
+        '02d': 'partly-cloudy-day',
+        '03d': 'partly-cloudy-day',
+        '04d': 'partly-cloudy-day',
+        '09d': 'rain',
+        '10d': 'rain',
+        '11d': 'thunderstorm',
+        '13d': 'snow',
+        '50d': 'fog',
+        '01n': 'clear-night',
+        '02n': 'partly-cloudy-night',
+        '03n': 'partly-cloudy-night',
+        '04n': 'partly-cloudy-night',
+        '09n': 'rain',
+        '10n': 'rain',
+        '11n': 'thunderstorm',
+        '13n': 'snow',
+        '50n': 'fog'
+    }
+
+    f = wxdata['current']
+    icon = f['weather'][0]['icon']
+    icon = owmicons[icon]
+    if not Config.use_metar:
+        attribution.setText("openweathermap")
+        attribution2.setText("openweathermap")
+        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + icon + ".png")
+        wxicon.setPixmap(wxiconpixmap.scaled(
+            wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wxicon2.setPixmap(wxiconpixmap.scaled(
+            wxicon.width(),
+            wxicon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wxdesc.setText(f['weather'][0]['description'].capitalize())
+        wxdesc2.setText(f['weather'][0]['description'].capitalize())
+
+        if Config.metric:
+            temper.setText(f'{round(f["temp"]*2/2):.1f}°C')
+            temper2.setText(f'{round(f["temp"]*2/2):.1f}°C')
+            press.setText(Config.LPressure + f'{round(f["pressure"]):.0f}mb')
+            humidity.setText(Config.LHumidity + f'{round(f["humidity"]):.0f}%')
+            wd = bearing(f['wind_deg'])
+            if Config.wind_degrees:
+                wd = str(f['wind_deg']) + u'°'
+            w = (Config.LWind +
+                 wd + ' ' +
+                 '%.1f' % (speedKmh(f['wind_speed'])) + 'kmh')
+            if 'wind_gust' in f:
+                w += (Config.Lgusting +
+                      '%.1f' % (speedKmh(f['wind_gust'])) + 'kmh')
+            wind.setText(w)
+            wind2.setText(Config.LFeelslike + f'{round(f["feels_like"]):.0f}°C')
+            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
+                int(f['dt']))))
+    # Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
+    # Config.LToday + f['precip_today_metric'] + 'mm')
+        else:
+            temper.setText(f'{round(tempToImp(f["temp"])*2/2):.1f}°F')
+            temper2.setText(f'{round(tempToImp(f["temp"])*2/2):.1f}°F')
+            press.setText(Config.LPressure + f'{round(pressi(f["pressure"])):.0f}in')
+            humidity.setText(Config.LHumidity + f'{round(f["humidity"]):.0f}%')
+            wd = bearing(f['wind_deg'])
+            if Config.wind_degrees:
+                wd = str(f['wind_deg']) + u'°'
+            w = (Config.LWind +
+                 wd + ' ' +
+                 '%.1f' % ((f['wind_speed'])) + 'mph')
+            if 'wind_gust' in f:
+                w += (Config.Lgusting +
+                      '%.1f' % ((f['wind_gust'])) + 'kph')
+            wind.setText(w)
+            wind2.setText(Config.LFeelslike + f'{round(tempToImp(f["feels_like"])):.0f}°F')
+            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
+                int(f['dt']))))
+    # Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
+    # Config.LToday + f['precip_today_in'] + 'in')
+    for i in range(0, 3):
+        f = wxdata['hourly'][i * 3 + 2]
+        fl = forecast[i]
+        wicon = f['weather'][0]['icon']
+        wicon = owmicons[wicon]
+        icon = fl.findChild(QtWidgets.QLabel, "icon")
+        wxiconpixmap = QtGui.QPixmap(
+            Config.icons + "/" + wicon + ".png")
+        icon.setPixmap(wxiconpixmap.scaled(
+            icon.width(),
+            icon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wx = fl.findChild(QtWidgets.QLabel, "wx")
+        day = fl.findChild(QtWidgets.QLabel, "day")
+
+        # # display the forecast day only if it is different from today
+        # if datetime.datetime.fromtimestamp(int(f['dt'])).strftime("%d") != datetime.datetime.now().strftime("%d") :
+        #     day.setText("{0:%A %H:%M}".format(datetime.datetime.fromtimestamp(
+        #         int(f['dt']))))
+        # else :
+        #     day.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
+        #         int(f['dt']))))
+        
+        # display the forecast hours difference (example : "+3h") rather than the forecast time
+        diff = datetime.datetime.fromtimestamp(int(f['dt'])) - datetime.datetime.now()
+        diff_hours = round(diff.seconds / 3600)
+        day.setText("+ " + str(diff_hours) + "h")
+
+        s = ''
+        pop = 0
+        ptype = ''
+        paccum = 0
+        if ('pop' in f):
+            pop = float(f['pop']) * 100.0
+        if ('snow' in f):
+            ptype = 'snow'
+            paccum = float(f['snow']['1h'])
+        if ('rain' in f):
+            ptype = 'rain'
+            paccum = float(f['rain']['1h'])
+
+        if (pop > 0.0 or ptype != ''):
+            s += '%.0f' % pop + '% '
+        if Config.metric:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.0f' % paccum + 'mm '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.0f' % paccum + 'mm '
+            s += '%.0f' % round(f['temp']) + u'°C'
+        else:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.0f' % heightImp(paccum) + 'in '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.0f' % heightImp(paccum) + 'in '
+            s += '%.0f' % round(tempToImp(f['temp'])) + u'°F'
+
+        wx.setStyleSheet(
+            "#wx { font-size: " +
+            str(int(25 * xscale * Config.fontmult)) + "px; }")
+        wx.setText(f['weather'][0]['description'] + "\n" + s)
+
+    for i in range(3, 9):
+        f = wxdata['daily'][i - 3]
+        wicon = f['weather'][0]['icon']
+        wicon = owmicons[wicon]
+        fl = forecast[i]
+        icon = fl.findChild(QtWidgets.QLabel, "icon")
+        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + wicon + ".png")
+        icon.setPixmap(wxiconpixmap.scaled(
+            icon.width(),
+            icon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wx = fl.findChild(QtWidgets.QLabel, "wx")
+        day = fl.findChild(QtWidgets.QLabel, "day")
+        day.setText("{0:%A}".format(datetime.datetime.fromtimestamp(
+            int(f['dt']))))
+        s = ''
+        pop = 0
+        ptype = ''
+        paccum = 0
+        if ('pop' in f):
+            pop = float(f['pop']) * 100.0
+        if ('rain' in f):
+            ptype = 'rain'
+            paccum = float(f['rain'])
+        if ('snow' in f):
+            ptype = 'snow'
+            paccum = float(f['snow'])
+
+        if (pop > 0.05 or ptype != ''):
+            s += '%.0f' % pop + '% '
+        if Config.metric:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.0f' % paccum + 'mm '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.0f' % paccum + 'mm '
+            s += '%.0f' % round(f['temp']['max']) + '/' + \
+                 '%.0f' % round(f['temp']['min'])
+        else:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.1f' % heightImp(paccum) + 'in '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.1f' % heightImp(paccum) + 'in '
+            s += '%.0f' % round(tempToImp(f['temp']['max'])) + '/' + \
+                 '%.0f' % round(tempToImp(f['temp']['min']))
+
+        wx.setStyleSheet(
+            "#wx { font-size: "
+            + str(int(19 * xscale * Config.fontmult)) + "px; }")
+        wx.setText(f['weather'][0]['description'] + "\n" + s)
+    startupmark('weather')
+
+
+def wxfinished_ds():
+    global wxreply, wxdata, supress_current
+    global wxicon, temper, wxdesc, press, humidity
+    global wind, wind2, wdate, bottom, forecast
+    global wxicon2, temper2, wxdesc2, attribution
+    global daytime
+
+    attribution.setText("DarkSky.net")
+    attribution2.setText("DarkSky.net")
+
+    if replyFailed(wxreply, "weather"):
+        return
+    wxstr = str(wxreply.readAll())
+    wxdata = json.loads(wxstr)
+    f = wxdata['currently']
+    if not supress_current:
+        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + f['icon'] + ".png")
+        wxicon.setPixmap(wxiconpixmap.scaled(
+            wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wxicon2.setPixmap(wxiconpixmap.scaled(
+            wxicon.width(),
+            wxicon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wxdesc.setText(f['summary'])
+        wxdesc2.setText(f['summary'])
+
+        if Config.metric:
+            temper.setText('%.1f' % (tempm(f['temperature'])) + u'°C')
+            temper2.setText('%.1f' % (tempm(f['temperature'])) + u'°C')
+            press.setText(Config.LPressure + '%.1f' % f['pressure'] + 'mb')
+            humidity.setText(
+                Config.LHumidity + '%.0f%%' % (f['humidity']*100.0))
+            wd = bearing(f['windBearing'])
+            if Config.wind_degrees:
+                wd = str(f['windBearing']) + u'°'
+            wind.setText(Config.LWind +
+                         wd + ' ' +
+                         '%.1f' % (speedm(f['windSpeed'])) + 'kmh' +
+                         Config.Lgusting +
+                         '%.1f' % (speedm(f['windGust'])) + 'kmh')
+            wind2.setText(Config.LFeelslike +
+                          '%.1f' % (tempm(f['apparentTemperature'])) + u'°C')
+            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
+                int(f['time']))))
+    # Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
+    # Config.LToday + f['precip_today_metric'] + 'mm')
+        else:
+            temper.setText('%.1f' % (f['temperature']) + u'°F')
+            temper2.setText('%.1f' % (f['temperature']) + u'°F')
+            press.setText(
+                Config.LPressure + '%.2f' % pressi(f['pressure']) + 'in')
+            humidity.setText(
+                Config.LHumidity + '%.0f%%' % (f['humidity']*100.0))
+            wd = bearing(f['windBearing'])
+            if Config.wind_degrees:
+                wd = str(f['windBearing']) + u'°'
+            wind.setText(Config.LWind +
+                         wd + ' ' +
+                         '%.1f' % (f['windSpeed']) + 'mph' +
+                         Config.Lgusting +
+                         '%.1f' % (f['windGust']) + 'mph')
+            wind2.setText(Config.LFeelslike +
+                          '%.1f' % (f['apparentTemperature']) + u'°F')
+            wdate.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(
+                int(f['time']))))
+    # Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
+    # Config.LToday + f['precip_today_in'] + 'in')
+
+    for i in range(0, 3):
+        f = wxdata['hourly']['data'][i * 3 + 2]
+        fl = forecast[i]
+        icon = fl.findChild(QtWidgets.QLabel, "icon")
+        wxiconpixmap = QtGui.QPixmap(
+            Config.icons + "/" + f['icon'] + ".png")
+        icon.setPixmap(wxiconpixmap.scaled(
+            icon.width(),
+            icon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wx = fl.findChild(QtWidgets.QLabel, "wx")
+        day = fl.findChild(QtWidgets.QLabel, "day")
+        day.setText("{0:%A %I:%M%p}".format(datetime.datetime.fromtimestamp(
+            int(f['time']))))
+        s = ''
+        pop = 0
+        ptype = ''
+        paccum = 0
+        if ('precipProbability' in f):
+            pop = float(f['precipProbability']) * 100.0
+        if ('precipAccumulation' in f):
+            paccum = float(f['precipAccumulation'])
+        if ('precipType' in f):
+            ptype = f['precipType']
+
+        if (pop > 0.0 or ptype != ''):
+            s += '%.0f' % pop + '% '
+        if Config.metric:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.0f' % heightm(paccum) + 'mm '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
+            s += '%.0f' % tempm(f['temperature']) + u'°C'
+        else:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.0f' % paccum + 'in '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.0f' % paccum + 'in '
+            s += '%.0f' % (f['temperature']) + u'°F'
+
+        wx.setStyleSheet("#wx { font-size: " + str(int(25 * xscale)) + "px; }")
+        wx.setText(f['summary'] + "\n" + s)
+
+    for i in range(3, 9):
+        f = wxdata['daily']['data'][i - 3]
+        fl = forecast[i]
+        icon = fl.findChild(QtWidgets.QLabel, "icon")
+        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + f['icon'] + ".png")
+        icon.setPixmap(wxiconpixmap.scaled(
+            icon.width(),
+            icon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wx = fl.findChild(QtWidgets.QLabel, "wx")
+        day = fl.findChild(QtWidgets.QLabel, "day")
+        day.setText("{0:%A}".format(datetime.datetime.fromtimestamp(
+            int(f['time']))))
+        s = ''
+        pop = 0
+        ptype = ''
+        paccum = 0
+        if ('precipProbability' in f):
+            pop = float(f['precipProbability']) * 100.0
+        if ('precipAccumulation' in f):
+            paccum = float(f['precipAccumulation'])
+        if ('precipType' in f):
+            ptype = f['precipType']
+
+        if (pop > 0.05 or ptype != ''):
+            s += '%.0f' % pop + '% '
+        if Config.metric:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.0f' % heightm(paccum) + 'mm '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
+            s += '%.0f' % tempm(f['temperatureHigh']) + '/' + \
+                 '%.0f' % tempm(f['temperatureLow'])
+        else:
+            if (ptype == 'snow'):
+                if (paccum > 0.05):
+                    s += Config.LSnow + '%.1f' % paccum + 'in '
+            else:
+                if (paccum > 0.05):
+                    s += Config.LRain + '%.1f' % paccum + 'in '
+            s += '%.0f' % f['temperatureHigh'] + '/' + \
+                 '%.0f' % f['temperatureLow']
+
+        wx.setStyleSheet("#wx { font-size: " + str(int(19 * xscale)) + "px; }")
+        wx.setText(f['summary'] + "\n" + s)
+
+
+cc_code_map = {
+            "freezing_rain_heavy": "Freezing Rain",
+            "freezing_rain": "Freezing Rain",
+            "freezing_rain_light": "Freezing Rain",
+            "freezing_drizzle": "Freezing Drizzle",
+            "ice_pellets_heavy": "Ice Pellets",
+            "ice_pellets": "Ice Pellets",
+            "ice_pellets_light": "Ice Pellets",
+            "snow_heavy": "Heavy Snow",
+            "snow": "Snow",
+            "snow_light": "Light Snow",
+            "flurries": "Flurries",
+            "tstorm": "Thunder Storm",
+            "rain_heavy": "Heavy Rain",
+            "rain": "Rain",
+            "rain_light": "Light Rain",
+            "drizzle": "Drizzle",
+            "fog_light": "Light Fog",
+            "fog": "Fog",
+            "cloudy": "Cloudy",
+            "mostly_cloudy": "Mostly Cloudy",
+            "partly_cloudy": "Partly Cloudy",
+            "mostly_clear": "Mostly Clear",
+            "clear": "Clear"
+}
+cc_code_metar = {
+            "Clear": u"Clair",
+            "Few Clouds": u"Quelques nuages",
+            "Scattered Clouds": u"Nuages épars",
+            "Mostly Cloudy": u"Plutôt nuageux",
+            "Cloudy": u"Nuageux",
+            "Drizzle": u"Bruine",
+            "Heavy Freezing Rain": u"Forte pluie verglaçante",
+            "Light Freezing Rain": u"Légère pluie verglaçante",
+            "Heavy Rain Showers": u"Fortes averses",
+            "Light Rain Showers": u"Légères averses",
+            "Heavy Blowing Rain": u"Forte pluie et vent",
+            "Light Blowing Rain": u"Légère pluie et vent",
+            "Freezing Rain": u"Pluie verglaçante",
+            "Rain Showers": u"Averses",
+            "Blowing Rain": u"Pluie et vent",
+            "Heavy Rain": u"Forte pluie",
+            "Light Rain": u"Légère pluie",
+            "Rain": u"Pluie",
+            "Heavy Freezing Snow": u"Forte neige verglaçante",
+            "Light Freezing Snow": u"Légère neige verglaçante",
+            "Heavy Snow Showers": u"Fortes chutes de neige",
+            "Light Snow Showers": u"Faibles chutes de neige",
+            "Heavy Blowing Snow": u"Forte neige et vent",
+            "Light Blowing Snow": u"Faible neige et vent",
+            "Freezing Snow": u"Neige verglaçante",
+            "Snow Showers": u"Chute de neige",
+            "Blowing Snow": u"Neige et vent",
+            "Heavy Snow": u"Forte neige",
+            "Light Snow": u"Légère neige",
+            "Snow": u"Neige",
+            "Blowing Snow Pellets": u"Grésil et vent",
+            "Snow Pellets": u"Grésil",
+            "Ice Crystals": u"Poudrin de glace",
+            "Ice Pellets": u"Faible grêle",
+            "Heavy Hail": u"Forte grêle",
+            "Hail": u"Grêle"
+}
+
+
+cc_code_icons = {
+            "freezing_rain_heavy": "sleet",
+            "freezing_rain": "sleet",
+            "freezing_rain_light": "sleet",
+            "freezing_drizzle": "sleet",
+            "ice_pellets_heavy": "sleet",
+            "ice_pellets": "sleet",
+            "ice_pellets_light": "sleet",
+            "snow_heavy": "snow",
+            "snow": "snow",
+            "snow_light": "snow",
+            "flurries": "snow",
+            "tstorm": "thunderstorm",
+            "rain_heavy": "rain",
+            "rain": "rain",
+            "rain_light": "rain",
+            "drizzle": "rain",
+            "fog_light": "fog",
+            "fog": "fog",
+            "cloudy": "cloudy",
+            "partly_cloudy": "partly-cloudy-day",
+            "mostly_cloudy": "partly-cloudy-day",
+            "mostly_clear": "partly-cloudy-day",
+            "clear": "clear-day"
+}
+
+
+def wxfinished_cc():
+    global wxreply, wxdata, supress_current
+    global wxicon, temper, wxdesc, press, humidity
+    global wind, wind2, wdate, bottom, forecast
+    global wxicon2, temper2, wxdesc2, attribution
+    global daytime
+    attribution.setText("climacell.co")
+    attribution2.setText("climacell.co")
+
+    if replyFailed(wxreply, "weather"):
+        return
+    wxstr = str(wxreply.readAll())
+    wxdata = json.loads(wxstr)
+    f = wxdata
+    dt = dateutil.parser.parse(f['observation_time']['value'])\
+        .astimezone(tzlocal.get_localzone())
+    icon = f['weather_code']['value']
+    icon = cc_code_icons[icon]
+    if not daytime:
+        icon = icon.replace('-day', '-night')
+    if not supress_current:
+        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + icon + ".png")
+        wxicon.setPixmap(wxiconpixmap.scaled(
+            wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wxicon2.setPixmap(wxiconpixmap.scaled(
+            wxicon.width(),
+            wxicon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wxdesc.setText(cc_code_map[f['weather_code']['value']])
+        wxdesc2.setText(cc_code_map[f['weather_code']['value']])
+
+        if Config.metric:
+            temper.setText('%.1f' % (tempm(f['temp']['value'])) + u'°C')
+            temper2.setText('%.1f' % (tempm(f['temp']['value'])) + u'°C')
+            press.setText(
+                Config.LPressure +
+                '%.1f' % barom(f['baro_pressure']['value']) + 'mm')
+            humidity.setText(
+                Config.LHumidity + '%.0f%%' % (f['humidity']['value']))
+            wd = bearing(f['wind_direction']['value'])
+            if Config.wind_degrees:
+                wd = str(f['wind_direction']['value']) + u'°'
+            wind.setText(Config.LWind +
+                         wd + ' ' +
+                         '%.1f' % (speedm(f['wind_speed']['value'])) + 'kmh' +
+                         Config.Lgusting +
+                         '%.1f' % (speedm(f['wind_gust']['value'])) + 'kmh')
+            wind2.setText(Config.LFeelslike +
+                          '%.1f' % (tempm(f['feels_like']['value'])) + u'°C')
+            wdate.setText("{0:%H:%M}".format(dt))
+    # Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
+    # Config.LToday + f['precip_today_metric'] + 'mm')
+        else:
+            temper.setText('%.1f' % (f['temp']['value']) + u'°F')
+            temper2.setText('%.1f' % (f['temp']['value']) + u'°F')
+            press.setText(
+                Config.LPressure +
+                '%.2f' % (f['baro_pressure']['value']) + 'in')
+            humidity.setText(
+                Config.LHumidity + '%.0f%%' % (f['humidity']['value']))
+            wd = bearing(f['wind_direction']['value'])
+            if Config.wind_degrees:
+                wd = str(f['wind_direction']['value']) + u'°'
+            wind.setText(Config.LWind +
+                         wd + ' ' +
+                         '%.1f' % (f['wind_speed']['value']) + 'mph' +
+                         Config.Lgusting +
+                         '%.1f' % (f['wind_gust']['value']) + 'mph')
+            wind2.setText(Config.LFeelslike +
+                          '%.1f' % (f['feels_like']['value']) + u'°F')
+            wdate.setText("{0:%H:%M}".format(dt))
+    # Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
+    # Config.LToday + f['precip_today_in'] + 'in')
+
+
+def wxfinished_cc2():
+    global wxreply, forecast
+    global daytime
+    if replyFailed(wxreply2, "hourly forecast"):
+        return
+    wxstr2 = str(wxreply2.readAll())
+    # print('cc2', wxstr2)
+    wxdata2 = json.loads(wxstr2)
+
+    for i in range(0, 3):
+        f = wxdata2[i * 3 + 2]
+        # print(i, i*3+2, f)
+        fl = forecast[i]
+        wicon = f['weather_code']['value']
+        wicon = cc_code_icons[wicon]
+
+        dt = dateutil.parser.parse(f['observation_time']['value']) \
+            .astimezone(tzlocal.get_localzone())
+        if dt.day == datetime.datetime.now().day:
+            fdaytime = daytime
+        else:
+            fsunrise = sun.sunrise(dt)
+            fsunset = sun.sunset(dt)
+            print('calc daytime', fdaytime, dt, fsunrise, fsunset)
+            if dt.time() >= fsunrise and dt.time() <= fsunset:
+                fdaytime = True
+            else:
+                fdaytime = False
+
+        if not fdaytime:
+            wicon = wicon.replace('-day', '-night')
+        icon = fl.findChild(QtWidgets.QLabel, "icon")
+        wxiconpixmap = QtGui.QPixmap(
+            Config.icons + "/" + wicon + ".png")
+        icon.setPixmap(wxiconpixmap.scaled(
+            icon.width(),
+            icon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wx = fl.findChild(QtWidgets.QLabel, "wx")
+        day = fl.findChild(QtWidgets.QLabel, "day")
+        day.setText("{0:%A %I:%M%p}".format(
+            dateutil.parser.parse(f['observation_time']['value'])
+            .astimezone(tzlocal.get_localzone())))
+        s = ''
+        pop = float(f['precipitation_probability']['value'])
+        ptype = f['precipitation_type']['value']
+        if ptype == 'none':
+            ptype = ''
+        paccum = f['precipitation']['value']
+
+        if (pop > 0.0 or ptype != ''):
+            s += '%.0f' % pop + '% '
+        if Config.metric:
+            if (ptype == 'snow'):
+                if (paccum > 0.01):
+                    s += Config.LSnow + '%.0f' % heightm(paccum) + 'mm '
+            else:
+                if (paccum > 0.01):
+                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
+            s += '%.0f' % tempm(f['temp']['value']) + u'°C'
+        else:
+            if (ptype == 'snow'):
+                if (paccum > 0.01):
+                    s += Config.LSnow + '%.0f' % paccum + 'in '
+            else:
+                if (paccum > 0.01):
+                    s += Config.LRain + '%.0f' % paccum + 'in '
+            s += '%.0f' % (f['temp']['value']) + u'°F'
+
+        wx.setStyleSheet(
+            "#wx { font-size: " +
+            str(int(25 * xscale * Config.fontmult)) + "px; }")
+        wx.setText(cc_code_map[f['weather_code']['value']] + "\n" + s)
+
+
+def wxfinished_cc3():
+    global wxreply3, forecast
+    global daytime
+    if replyFailed(wxreply3, "daily forecast"):
+        return
+    wxstr3 = str(wxreply3.readAll())
+    # print('cc2', wxstr2)
+    wxdata3 = json.loads(wxstr3)
+    ioff = 0
+    dt = dateutil.parser.parse(
+        wxdata3[0]['observation_time']['value']+"T00:00:00")
+    if datetime.datetime.now().day != dt.day:
+        ioff += 1
+    for i in range(3, 9):
+        f = wxdata3[i - 3 + ioff]
+        wicon = f['weather_code']['value']
+        wicon = cc_code_icons[wicon]
+        fl = forecast[i]
+        icon = fl.findChild(QtWidgets.QLabel, "icon")
+        wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + wicon + ".png")
+        icon.setPixmap(wxiconpixmap.scaled(
+            icon.width(),
+            icon.height(),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+        wx = fl.findChild(QtWidgets.QLabel, "wx")
+        day = fl.findChild(QtWidgets.QLabel, "day")
+        day.setText("{0:%A}".format(
+            dateutil.parser.parse(
+                f['observation_time']['value']+"T00:00:00"
+            )
+            ))
+        s = ''
+        pop = float(f['precipitation_probability']['value'])
+        ptype = ''
+        paccum = float(f['precipitation_accumulation']['value'])
+        wc = f['weather_code']['value']
+        if 'rain' in wc:
+            ptype = 'rain'
+        if 'drizzle' in wc:
+            ptype = 'rain'
+        if 'ice' in wc:
+            ptype = 'snow'
+        if 'flurries' in wc:
+            ptype = 'snow'
+        if 'snow' in wc:
+            ptype = 'snow'
+        if 'tstorm' in wc:
+            ptype = 'rain'
+
+        # if (pop > 0.05 and ptype == ''):
+        #     if f['temp'][1]['max']['value'] > 28:
+        #         ptype = 'rain'
+        #     else:
+        #         ptype = 'snow'
+        if (pop > 0.05 or ptype != ''):
+            s += '%.0f' % pop + '% '
+        if Config.metric:
+            if (ptype == 'snow'):
+                if (paccum > 0.01):
+                    s += Config.LSnow + '%.0f' % heightm(paccum*15) + 'mm '
+            else:
+                if (paccum > 0.01):
+                    s += Config.LRain + '%.0f' % heightm(paccum) + 'mm '
+            s += '%.0f' % tempm(f['temp'][1]['max']['value']) + '/' + \
+                 '%.0f' % tempm(f['temp'][0]['min']['value'])
+        else:
+            if (ptype == 'snow'):
+                if (paccum > 0.01):
+                    s += Config.LSnow + '%.1f' % (paccum*15) + 'in '
+            else:
+                if (paccum > 0.01):
+                    s += Config.LRain + '%.1f' % paccum + 'in '
+            s += '%.0f' % f['temp'][1]['max']['value'] + '/' + \
+                 '%.0f' % f['temp'][0]['min']['value']
+
+        wx.setStyleSheet(
+            "#wx { font-size: "
+            + str(int(19 * xscale * Config.fontmult)) + "px; }")
+        wx.setText(cc_code_map[f['weather_code']['value']] + "\n" + s)
+        print("cc_code_map2[f['weather_code']['value']]", cc_code_map[f['weather_code']['value']])
+
+
+metar_cond = [
+    ('CLR', '', '', 'Clear', 'clear-day', 0),
+    ('NSC', '', '', 'Clear', 'clear-day', 0),
+    ('SKC', '', '', 'Clear', 'clear-day', 0),
+    ('FEW', '', '', 'Few Clouds', 'partly-cloudy-day', 1),
+    ('NCD', '', '', 'Clear', 'clear-day', 0),
+    ('SCT', '', '', 'Scattered Clouds', 'partly-cloudy-day', 2),
+    ('BKN', '', '', 'Mostly Cloudy', 'partly-cloudy-day', 3),
+    ('OVC', '', '', 'Cloudy', 'cloudy', 4),
+
+    ('///', '', '', '', 'cloudy', 0),
+    ('UP', '', '', '', 'cloudy', 0),
+    ('VV', '', '', '', 'cloudy', 0),
+    ('//', '', '', '', 'cloudy', 0),
+
+    ('DZ', '', '', 'Drizzle', 'rain', 10),
+
+    ('RA', 'FZ', '+', 'Heavy Freezing Rain', 'sleet', 11),
+    ('RA', 'FZ', '-', 'Light Freezing Rain', 'sleet', 11),
+    ('RA', 'SH', '+', 'Heavy Rain Showers', 'sleet', 11),
+    ('RA', 'SH', '-', 'Light Rain Showers', 'rain', 11),
+    ('RA', 'BL', '+', 'Heavy Blowing Rain', 'rain', 11),
+    ('RA', 'BL', '-', 'Light Blowing Rain', 'rain', 11),
+    ('RA', 'FZ', '', 'Freezing Rain', 'sleet', 11),
+    ('RA', 'SH', '', 'Rain Showers', 'rain', 11),
+    ('RA', 'BL', '', 'Blowing Rain', 'rain', 11),
+    ('RA', '', '+', 'Heavy Rain', 'rain', 11),
+    ('RA', '', '-', 'Light Rain', 'rain', 11),
+    ('RA', '', '', 'Rain', 'rain', 11),
+
+    ('SN', 'FZ', '+', 'Heavy Freezing Snow', 'snow', 12),
+    ('SN', 'FZ', '-', 'Light Freezing Snow', 'snow', 12),
+    ('SN', 'SH', '+', 'Heavy Snow Showers', 'snow', 12),
+    ('SN', 'SH', '-', 'Light Snow Showers', 'snow', 12),
+    ('SN', 'BL', '+', 'Heavy Blowing Snow', 'snow', 12),
+    ('SN', 'BL', '-', 'Light Blowing Snow', 'snow', 12),
+    ('SN', 'FZ', '', 'Freezing Snow', 'snow', 12),
+    ('SN', 'SH', '', 'Snow Showers', 'snow', 12),
+    ('SN', 'BL', '', 'Blowing Snow', 'snow', 12),
+    ('SN', '', '+', 'Heavy Snow', 'snow', 12),
+    ('SN', '', '-', 'Light Snow', 'snow', 12),
+    ('SN', '', '', 'Rain', 'snow', 12),
+
+    ('SG', 'BL', '', 'Blowing Snow', 'snow', 12),
+    ('SG', '', '', 'Snow', 'snow', 12),
+    ('GS', 'BL', '', 'Blowing Snow Pellets', 'snow', 12),
+    ('GS', '', '', 'Snow Pellets', 'snow', 12),
+
+    ('IC', '', '', 'Ice Crystals', 'snow', 13),
+    ('PL', '', '', 'Ice Pellets', 'snow', 13),
+
+    ('GR', '', '+', 'Heavy Hail', 'thuderstorm', 14),
+    ('GR', '', '', 'Hail', 'thuderstorm', 14),
+]
+
+
+def feels_like(f):
+    t = f.temp.value('C')
+    d = f.dewpt.value('C')
+    h = (math.exp((17.625*d)/(243.04+d)) /
+         math.exp((17.625*t)/(243.04+t)))
+    t = f.temp.value('F')
+    w = f.wind_speed.value('MPH')
+    if t > 80 and h >= 0.40:
+        hi = (-42.379 + 2.04901523 * t + 10.14333127 * h - .22475541 * t * h -
+              .00683783 * t * t - .05481717 * h * h + .00122874 * t * t * h +
+              .00085282 * t * h * h - .00000199 * t * t * h * h)
+        if h < 0.13 and t >= 80.0 and t <= 112.0:
+            hi -= ((13 - h) / 4) * math.sqrt((17 - math.abs(t-95)) / 17)
+        if h > 0.85 and t >= 80.0 and t <= 112.0:
+            hi += ((h - 85)/10) * ((87 - t)/5)
+        return hi
+    if t < 50 and w >= 3:
+        wc = 35.74 + 0.6215 * t - 35.75 * \
+         (w ** 0.16) + 0.4275 * t * (w ** 0.16)
+        return wc
+    return t
+
+compass_french = {
+            "N": "N",
+            "S": "S",
+            "W": "O",
+            "E": "E",
+            "NW": "NO",
+            "SW": "SO",
+            "NE": "NE",
+            "SE": "SE",
+            "NNW": "NNO",
+            "SSW": "SSO",
+            "NNE": "NNE",
+            "SSE": "SSE",
+            "WNW": "ONO",
+            "WSW": "OSO",
+            "ENE": "ENE",
+            "ESE": "ESE"
+}
+
+@timed('wxfinished_metar')
+def wxfinished_metar():
+    global metarreply
+
+    if replyFailed(metarreply, "METAR"):
+        return
+    try:
+        wxstr = str(metarreply.readAll(),'utf-8')
+    except:
+        print("Error : Could not extract METAR data from URL")
+        return
+    # print("[DEBUG] : ", wxstr)
+    for wxline in wxstr.splitlines():
+        if wxline.startswith(Config.METAR):
+            wxstr = wxline
+    if showwx_metar(wxstr):
+        publishwx(WeatherSnapshot.messages(Config.wx_topic, metar=wxstr))
+
+
+def showwx_metar(wxstr):
+    # wxstr is the METAR report line, returns False if it is not valid
+    global wxicon, temper, wxdesc, press, humidity
+    global wind, wind2, wdate, bottom
+    global wxicon2, temper2, wxdesc2
+    global daytime
+    global attribution, attribution2
+
+    attribution.setText("METAR " + Config.METAR)
+    attribution2.setText("METAR " + Config.METAR)
+
+    f = Metar.Metar(wxstr,strict=False)
+    try:
+        dt = f.time.replace(tzinfo=tzutc()).astimezone(tzlocal.get_localzone())
+    except:
+        print("Error: METAR string is not valid")
+        print("METAR string : ", wxstr)
+        return False
+    pri = -1
+    weather = ''
+    icon = ''
+    print(f.string())
+    for s in f.sky:
+        print("f.sky : ", s)
+        for c in metar_cond:
+            if s[0] == c[0]:
+                if c[5] > pri:
+                    pri = c[5]
+                    weather = c[3]
+                    icon = c[4]
+    for w in f.weather:
+        print("f.weather : ", w)
+        for c in metar_cond:
+            if w[2] == c[0]:
+                if c[1] > '':
+                    if w[1] == c[1]:
+                        if c[2] > '':
+                            if w[0][0:1] == c[2]:
+                                if c[5] > pri:
+                                    pri = c[5]
+                                    weather = c[3]
+                                    icon = c[4]
+                else:
+                    if c[2] > '':
+                        if w[0][0:1] == c[2]:
+                            if c[5] > pri:
+                                pri = c[5]
+                                weather = c[3]
+                                icon = c[4]
+                    else:
+                        if c[5] > pri:
+                            pri = c[5]
+                            weather = c[3]
+                            icon = c[4]
+    if weather == '':
+        weather = cc_code_metar['Clear']
+        for c in metar_cond:
+            icon = 'clear-day'
+            pri = c[5]
+    else:
+        weather = cc_code_metar[weather]
+    if not daytime:
+        icon = icon.replace('-day', '-night')
+
+    print("weather values :",icon, weather, pri)
+
+    wxiconpixmap = QtGui.QPixmap(Config.icons + "/" + icon + ".png")
+    wxicon.setPixmap(wxiconpixmap.scaled(
+        wxicon.width(), wxicon.height(), Qt.IgnoreAspectRatio,
+        Qt.SmoothTransformation))
+    wxicon2.setPixmap(wxiconpixmap.scaled(
+        wxicon.width(),
+        wxicon.height(),
+        Qt.IgnoreAspectRatio,
+        Qt.SmoothTransformation))
+    wxdesc.setText(weather)
+    wxdesc2.setText(weather)
+    if Config.metric:
+        temper.setText('%.1f' % round((f.temp.value('C'))) + u'°C')
+        temper2.setText('%.1f' % round((f.temp.value('C'))) + u'°C')
+        press.setText(
+            Config.LPressure +
+            '%.1f' % f.press.value('MB') + 'mb')
+        t = f.temp.value('C')
+        d = f.dewpt.value('C')
+        h = 100.0 * (math.exp((17.625*d)/(243.04+d)) /
+                     math.exp((17.625*t)/(243.04+t)))
+        humidity.setText(
+            Config.LHumidity + '%.0f%%' % (h))
+        if f.wind_dir != None:
+            wd = f.wind_dir.compass()
+            wd = compass_french[wd]
+        else:
+            wd = 'variable'
+        if Config.wind_degrees:
+            wd = str(f.wind_dir.value) + u'°'
+        ws = (Config.LWind +
+              wd + ' ' +
+              '%.1f' % (f.wind_speed.value('KMH')) + 'kmh')
+        if f.wind_gust:
+            ws += (Config.Lgusting +
+                   '%.1f' % (f.wind_gust.value('KMH')) + 'kmh')
+        wind.setText(ws)
+        wind2.setText(Config.LFeelslike +
+                      ('%.0f' % (round(feels_like(f))) + u'°C'))
+        wdate.setText("{0:%H:%M}".format(dt))
+# Config.LPrecip1hr + f['precip_1hr_metric'] + 'mm ' +
+# Config.LToday + f['precip_today_metric'] + 'mm')
+    else:
+        temper.setText('%.1f' % (f.temp.value('F')) + u'°F')
+        temper2.setText('%.1f' % (f.temp.value('F')) + u'°F')
+        press.setText(
+            Config.LPressure +
+            '%.2f' % f.press.value('IN') + 'in')
+        t = f.temp.value('C')
+        d = f.dewpt.value('C')
+        h = 100.0 * (math.exp((17.625*d)/(243.04+d)) /
+                     math.exp((17.625*t)/(243.04+t)))
+        humidity.setText(
+            Config.LHumidity + '%.0f%%' % (h))
+        wd = f.wind_dir.compass()
+        if Config.wind_degrees:
+            wd = str(f.wind_dir.value) + u'°'
+        ws = (Config.LWind +
+              wd + ' ' +
+              '%.1f' % (f.wind_speed.value('MPH')) + 'mph')
+        if f.wind_gust:
+            ws += (Config.Lgusting +
+                   '%.1f' % (f.wind_gust.value('MPH')) + 'mph')
+        wind.setText(ws)
+        wind2.setText(Config.LFeelslike +
+                      '%.1f' % (feels_like(f)) + u'°F')
+        wdate.setText("{0:%H:%M} {1}".format(dt, Config.METAR))
+# Config.LPrecip1hr + f['precip_1hr_in'] + 'in ' +
+# Config.LToday + f['precip_today_in'] + 'in')
+    startupmark('weather')
+    return True
+
+
+def publishwx(messages):
+    # share the refreshed weather with the other stations (retained)
+    if Config.wx_mqtt != 'publish':
+        return
+    for topic, payload in messages:
+        client.publish(topic, payload, qos=1, retain=True)
+
+
+wxparts = {}
+wxpending = False
+
+
+@QtCore.pyqtSlot(str, object)
+def on_rawSignal(topic, payload):
+    # weather published by another station (Config.wx_mqtt 'subscribe')
+    global wxpending
+    part = topic[len(Config.wx_topic) + 1:]
+    try:
+        value = WeatherSnapshot.decode(payload)
+    except ValueError:
+        print("Info : ignoring invalid weather message on " + topic)
+        return
+    if part == 'metar':
+        if Config.use_metar:
+            showwx_metar(value)
+        return
+    if part not in WeatherSnapshot.PARTS:
+        return
+    wxparts[part] = value
+    # the parts come one after the other, show them once
+    if not wxpending:
+        wxpending = True
+        QtCore.QTimer.singleShot(200, showwx_mqtt)
+
+
+def showwx_mqtt():
+    global wxdata, wxpending
+    wxpending = False
+    for part in WeatherSnapshot.PARTS:
+        if part not in wxparts:
+            return
+    wxdata = dict(wxparts)
+    try:
+        showwx_owm(wxdata)
+    except (KeyError, IndexError, TypeError) as e:
+        print("Error : incomplete weather snapshot from MQTT : " + str(e))
+
+
+def getwx():
+    global supress_current
+    supress_current = False
+    try:
+        if Config.use_metar :
+            supress_current = True
+            getwx_metar()
+    except:
+        pass
+
+    try:
+        ApiKeys.dsapi
+        getwx_ds()
+        return
+    except:
+        pass
+
+    try:
+        ApiKeys.ccapi
+        global cc_code_map, cc_code_metar
+        try:
+            cc_code_map = Config.Lcc_code_map
+            cc_code_metar = Config.Lcc_code_metar
+        except:
+            pass
+        getwx_cc()
+        return
+    except:
+        pass
+
+    try:
+        ApiKeys.owmapi
+        getwx_owm()
+        return
+    except:
+        pass
+
+
+def getwx_ds():
+    global wxurl
+    global wxreply
+    print ("getting current and forecast:" + time.ctime())
+    wxurl = provider('darksky') + '/forecast/' + \
+        ApiKeys.dsapi + \
+        '/'
+    wxurl += str(Config.location.lat) + ',' + \
+        str(Config.location.lng)
+    wxurl += '?units=us&lang=' + Config.Language.lower()
+    wxurl += '&r=' + str(random.random())
+    print (wxurl)
+    r = QUrl(wxurl)
+    r = QNetworkRequest(r)
+    wxreply = netqueue.get(r, PRIO_WEATHER, provider='darksky')
+    wxreply.finished.connect(wxfinished_ds)
+
+
+def getwx_owm():
+    global wxurl
+    global wxreply
+    print("getting current and forecast:" + time.ctime())
+    wxurl = provider('owm') + '/data/2.5/onecall?appid=' + \
+        ApiKeys.owmapi
+    wxurl += "&lat=" + str(Config.location.lat) + '&lon=' + \
+        str(Config.location.lng)
+    wxurl += '&units=metric&lang=' + Config.Language.lower()
+    wxurl += '&r=' + str(random.random())
+    print(wxurl)
+    r = QUrl(wxurl)
+    r = QNetworkRequest(r)
+    wxreply = netqueue.get(r, PRIO_WEATHER, provider='owm')
+    event = QEventLoop()
+    wxreply.finished.connect(event.quit)
+    wxreply.finished.connect(wxfinished_owm)
+    event.exec()
+    # print("wxreply ", str(wxreply.readAll()))
+
+
+def getwx_cc():
+    global wxurl
+    global wxurl2
+    global wxurl3
+    global wxreply
+    global wxreply2
+    global wxreply3
+    print("getting current:" + time.ctime())
+    wxurl = provider('climacell') + '/v3/weather/realtime?apikey=' + \
+        ApiKeys.ccapi
+    wxurl += "&lat=" + str(Config.location.lat) + '&lon=' + \
+        str(Config.location.lng)
+    wxurl += '&unit_system=us'
+    wxurl += '&fields=temp,weather_code,feels_like,humidity,'
+    wxurl += 'wind_speed,wind_direction,wind_gust,baro_pressure'
+    print(wxurl)
+    r = QUrl(wxurl)
+    r = QNetworkRequest(r)
+    wxreply = netqueue.get(r, PRIO_WEATHER, provider='climacell')
+    wxreply.finished.connect(wxfinished_cc)
+
+    print("getting hourly:" + time.ctime())
+    wxurl2 = provider('climacell') + '/v3/weather/forecast/hourly?apikey=' + \
+        ApiKeys.ccapi
+    wxurl2 += "&lat=" + str(Config.location.lat) + '&lon=' + \
+        str(Config.location.lng)
+    wxurl2 += '&unit_system=us'
+    wxurl2 += '&fields=temp,precipitation,precipitation_type,'
+    wxurl2 += 'precipitation_probability,weather_code'
+    print(wxurl2)
+    r2 = QUrl(wxurl2)
+    r2 = QNetworkRequest(r2)
+    wxreply2 = netqueue.get(r2, PRIO_WEATHER, provider='climacell')
+    wxreply2.finished.connect(wxfinished_cc2)
+
+    print("getting daily:" + time.ctime())
+    wxurl3 = provider('climacell') + '/v3/weather/forecast/daily?apikey=' + \
+        ApiKeys.ccapi
+    wxurl3 += "&lat=" + str(Config.location.lat) + '&lon=' + \
+        str(Config.location.lng)
+    wxurl3 += '&unit_system=us'
+    wxurl3 += '&fields=temp,precipitation_accumulation,'
+    wxurl3 += 'precipitation_probability,weather_code'
+    print(wxurl3)
+    r3 = QUrl(wxurl3)
+    r3 = QNetworkRequest(r3)
+    wxreply3 = netqueue.get(r3, PRIO_WEATHER, provider='climacell')
+    wxreply3.finished.connect(wxfinished_cc3)
+
+
+def getwx_metar():
+    global metarurl
+    global metarreply
+    metarurl = \
+        provider('metar') + "/data/observations/metar/stations/" + \
+        Config.METAR + ".TXT"
+    print(metarurl)
+    r = QUrl(metarurl)
+    r = QNetworkRequest(r)
+    metarreply = netqueue.get(r, PRIO_WEATHER, provider='metar')
+    event = QEventLoop()
+    metarreply.finished.connect(event.quit)
+    metarreply.finished.connect(wxfinished_metar)
+    event.exec()
+
+def getallwx():
+    # in subscribe mode, the weather comes from another station
+    if Config.wx_mqtt == 'subscribe':
+        return
+    getwx()
+   
+@QtCore.pyqtSlot(int)
+def on_stateChanged(state):
+        # the subscriptions are renewed by MqttClient.on_connect
+        print("MQTT state " + str(state))
+
+@QtCore.pyqtSlot(object)
+def on_readingSignal(reading):
+        print("read from " + reading.topic)
+        if replayStats is None:
+            tempfinished(reading)
+            return
+        t = time.perf_counter()
+        tempfinished(reading)
+        replayStats.add(time.time() - reading.time, time.perf_counter() - t)
+
+replayStats = None
+
+def qtstart():
+    global ctimer, wxtimer, temptimer, storetimer, insttimer, memtimer
+    global usagetimer, metricstimer
+    global manager
+    global objradar1
+    global objradar2
+    global objradar3
+    global objradar4
+    global sun, daytime, sunrise, sunset
+
+    dt = datetime.datetime.now().replace(tzinfo=tzlocal.get_localzone())
+    sun = suntimes(Config.location.lat, Config.location.lng)
+    dt = tzlocal.get_localzone().localize(datetime.datetime.now())
+    sunrise = sun.sunrise(dt)
+    sunset = sun.sunset(dt)
+    if dt.time() >= sunrise and dt.time() <= sunset:
+            daytime = True
+    else:
+            daytime = False
+    startupmark('qtstart')
+    getallwx()
+    startupmark('getallwx done')
+
+    # gettemp()
+
+    objradar1.start(Config.radar_refresh * 60)
+    objradar1.wxstart()
+    objradar2.start(Config.radar_refresh * 60)
+    objradar2.wxstart()
+    objradar3.start(Config.radar_refresh * 60)
+    objradar4.start(Config.radar_refresh * 60)
+    startupmark('radars started')
+
+    ctimer = QtCore.QTimer()
+    ctimer.timeout.connect(tick)
+    ctimer.start(1000)
+    if lagmonitor is not None:
+        lagmonitor.start()
+
+    wxtimer = QtCore.QTimer()
+    wxtimer.timeout.connect(getallwx)
+    wxtimer.start(1000 * Config.weather_refresh *
+                  60 + random.uniform(1000, 10000))
+
+    # temptimer = QtCore.QTimer()
+    # temptimer.timeout.connect(gettemp)
+    # temptimer.start(1000 * 10 * 60 + random.uniform(1000, 10000))
+
+    storetimer = QtCore.QTimer()
+    storetimer.timeout.connect(storeflush)
+    storetimer.start(1000 * Config.sensor_db_commit)
+
+    usagetimer = QtCore.QTimer()
+    usagetimer.timeout.connect(usagesave)
+    usagetimer.start(1000 * 300)
+
+    if metricsserver is not None:
+        metricsupdate()
+        metricstimer = QtCore.QTimer()
+        metricstimer.timeout.connect(metricsupdate)
+        metricstimer.start(1000 * Config.metrics_interval)
+        metricsserver.start()
+
+    if memmonitor is not None:
+        memtimer = QtCore.QTimer()
+        memtimer.timeout.connect(memreport)
+        memtimer.start(1000 * Config.memory_report)
+
+    if Config.instrument:
+        insttimer = QtCore.QTimer()
+        insttimer.timeout.connect(instsummary)
+        insttimer.start(1000 * Config.instrument_interval)
+
+    if Config.useslideshow:
+        objimage1.start(Config.slide_time)
+
+
+class SS(QtWidgets.QLabel):
+    def __init__(self, parent, rect, myname):
+        self.myname = myname
+        self.rect = rect
+        QtWidgets.QLabel.__init__(self, parent)
+
+        self.pause = False
+        self.count = 0
+        self.img_list = []
+        self.img_inc = 1
+
+        self.get_images()
+
+        self.setObjectName("slideShow")
+        self.setGeometry(rect)
+        self.setStyleSheet("#slideShow { background-color: " +
+                           Config.slide_bg_color + "; }")
+        self.setAlignment(Qt.AlignHCenter | Qt.AlignCenter)
+
+    def start(self, interval):
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.run_ss)
+        self.timer.start(1000 * interval + random.uniform(1, 10))
+        self.run_ss()
+
+    def stop(self):
+        try:
+            self.timer.stop()
+            self.timer = None
+        except Exception:
+            pass
+
+    def run_ss(self):
+        self.get_images()
+        self.switch_image()
+
+    def switch_image(self):
+        if self.img_list:
+            if not self.pause:
+                self.count += self.img_inc
+                if self.count >= len(self.img_list):
+                    self.count = 0
+                self.show_image(self.img_list[self.count])
+                self.img_inc = 1
+
+    @timed('ss.show_image')
+    def show_image(self, image):
+        image = QtWidgets.QImage(image)
+
+        bg = QtGui.QPixmap.fromImage(image)
+        self.setPixmap(bg.scaled(
+                self.size(),
+                QtCore.Qt.KeepAspectRatio,
+                QtCore.Qt.SmoothTransformation))
+
+    def get_images(self):
+        self.get_local(Config.slides)
+
+    def play_pause(self):
+        if not self.pause:
+            self.pause = True
+        else:
+            self.pause = False
+
+    def prev_next(self, direction):
+        self.img_inc = direction
+        self.timer.stop()
+        self.switch_image()
+        self.timer.start()
+
+    def get_local(self, path):
+        # the list is built again on each run, new or removed slides
+        # are picked up and it does not grow forever
+        try:
+            dirContent = sorted(os.listdir(path))
+        except OSError:
+            print("path '%s' doesn't exists." % path)
+            return
+
+        img_list = []
+        for each in dirContent:
+            fullFile = os.path.join(path, each)
+            if os.path.isfile(fullFile) and (fullFile.lower().endswith('png')
+               or fullFile.lower().endswith('jpg')):
+                    img_list.append(fullFile)
+        self.img_list = img_list
+
+
+class Sparkline(QtWidgets.QLabel):
+    # 24 hour trend of one sensor value. The pixmap is only touched when a
+    # sample arrives: it is scrolled left by the elapsed time and the new
+    # segment is drawn at the right edge, so the cost does not depend on
+    # the length of the history. It is drawn again from the history only
+    # when a value falls outside of the y range, and once the whole width
+    # has scrolled by, to fit the range again.
+    def __init__(self, parent, myname, rect, span=86400):
+        QtWidgets.QLabel.__init__(self, parent)
+        self.setObjectName(myname)
+        self.setStyleSheet("#" + myname + " { background-color: transparent; }")
+        self.setGeometry(rect)
+        self.span = span
+        self.pen = QtGui.QPen(QColor(Config.textcolor))
+        self.pen.setWidthF(max(1.0, 1.5 * xscale))
+        self.pix = QPixmap(rect.width(), rect.height())
+        self.pix.fill(Qt.transparent)
+        self.end = None       # time at the right edge
+        self.last = None      # last sample drawn, (time, value)
+        self.lo = None
+        self.hi = None
+        self.scrolled = 0
+
+    def xAt(self, t):
+        return (self.width() - 1) - (self.end - t) * (self.width() - 1) / self.span
+
+    def yAt(self, v):
+        h = self.height() - 2
+        return 1 + h - (v - self.lo) * h / (self.hi - self.lo)
+
+    def painter(self):
+        painter = QPainter(self.pix)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self.pen)
+        return painter
+
+    def redraw(self, history):
+        self.pix.fill(Qt.transparent)
+        self.last = None
+        self.scrolled = 0
+        if history:
+            self.end = history[-1][0]
+            history = [p for p in history if p[0] >= self.end - self.span]
+            values = [v for t, v in history]
+            pad = max((max(values) - min(values)) * 0.1, 0.5)
+            self.lo = min(values) - pad
+            self.hi = max(values) + pad
+            path = QtGui.QPainterPath()
+            path.moveTo(self.xAt(history[0][0]), self.yAt(history[0][1]))
+            for t, v in history[1:]:
+                path.lineTo(self.xAt(t), self.yAt(v))
+            painter = self.painter()
+            painter.drawPath(path)
+            painter.end()
+            self.last = history[-1]
+        self.setPixmap(self.pix)
+
+    def add(self, t, v, history):
+        # history is only called when everything has to be drawn again.
+        # The right edge is kept on the pixel grid, it can be up to half a
+        # pixel past the newest sample: only a sample older than the last
+        # one drawn is out of order
+        if self.last is None or v < self.lo or v > self.hi or \
+                t < self.last[0] or self.scrolled >= self.width():
+            self.redraw(history())
+            return
+        # the pixmap is scrolled before a painter is opened on it
+        shift = int(round((t - self.end) * (self.width() - 1) / self.span))
+        if shift > 0:
+            self.pix.scroll(-shift, 0, self.pix.rect())
+        painter = self.painter()
+        if shift > 0:
+            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+            painter.fillRect(self.width() - shift, 0, shift, self.height(),
+                             Qt.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+            # the right edge stays on the pixel grid of what is drawn
+            self.end += shift * self.span / (self.width() - 1)
+            self.scrolled += shift
+        painter.drawLine(QtCore.QPointF(self.xAt(self.last[0]), self.yAt(self.last[1])),
+                         QtCore.QPointF(self.xAt(t), self.yAt(v)))
+        painter.end()
+        self.last = (t, v)
+        self.setPixmap(self.pix)
+
+
+class SensorPanel:
+    # the labels showing one Zigbee sensor: values, battery and signal
+    # icons, and the time of the last reading. The offsets are for a
+    # 400x170 panel, scale shrinks everything for smaller grid cells.
+    def __init__(self, parent, myname, rect, batteryx, strengthx, sparkx,
+                 scale=1.0):
+        self.myname = myname
+        self.sensor = None
+        self.icons = {}
+        self.text = QtWidgets.QLabel(parent)
+        self.text.setObjectName(myname)
+        self.text.setStyleSheet("#" + myname + " { font-family:sans-serif; color: " +
+                                Config.textcolor +
+                                "; background-color: rgba(0, 0, 0, 40%); font-size: " +
+                                str(int(30 * xscale * scale * Config.fontmult)) +
+                                "px; " +
+                                Config.fontattr +
+                                "}")
+        self.text.setGeometry(rect)
+        self.text.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+
+        self.battery = QtWidgets.QLabel(parent)
+        self.battery.setStyleSheet("#" + myname + "Battery { background-color: transparent; }")
+        self.battery.setObjectName(myname + "Battery")
+        self.battery.setGeometry(rect.x() + batteryx * xscale * scale,
+                                 rect.y() + 30 * yscale * scale,
+                                 40 * xscale * scale, 40 * yscale * scale)
+
+        self.date = QtWidgets.QLabel(parent)
+        self.date.setObjectName(myname + "Date")
+        self.date.setStyleSheet("#" + myname + "Date { background-color: transparent; color: " +
+                                Config.textcolor +
+                                "; font-size: " +
+                                str(int(15 * xscale * scale * Config.fontmult)) +
+                                "px; " +
+                                Config.fontattr +
+                                "}")
+        self.date.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+        self.date.setGeometry(rect.x(), rect.y() + 140 * yscale * scale,
+                              rect.width(), 20 * yscale * scale)
+
+        self.strength = QtWidgets.QLabel(parent)
+        self.strength.setStyleSheet("#" + myname + "Strength { background-color: transparent; }")
+        self.strength.setObjectName(myname + "Strength")
+        self.strength.setGeometry(rect.x() + strengthx * xscale * scale,
+                                  rect.y() + 30 * yscale * scale,
+                                  40 * xscale * scale, 40 * yscale * scale)
+
+        # one trend line beside each value line of the text
+        self.sparklines = {}
+        if Config.sensor_sparklines:
+            for i, metric in enumerate(('temperature', 'humidity', 'pressure')):
+                self.sparklines[metric] = Sparkline(
+                    parent, myname + "Spark" + str(i),
+                    QtCore.QRect(rect.x() + sparkx * xscale * scale,
+                                 rect.y() + (42 + i * 36) * yscale * scale,
+                                 80 * xscale * scale, 26 * yscale * scale))
+
+    def widgets(self):
+        return [self.text, self.battery, self.date, self.strength] + \
+            list(self.sparklines.values())
+
+    def setVisible(self, visible):
+        for widget in self.widgets():
+            widget.setVisible(visible)
+
+    def setIcon(self, label, icon):
+        # the icons only change now and then, skip the reload
+        if self.icons.get(label) == icon:
+            Instrumentation.count('icon', True)
+            return
+        Instrumentation.count('icon', False)
+        self.icons[label] = icon
+        resIcon = QPixmap('icons/' + icon + '.png')
+        label.setPixmap(resIcon.scaled(
+            label.width(), label.height(), Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation))
+
+    def bind(self, sensor, reading):
+        # show another sensor in this panel, reading may be None when
+        # nothing was received from it yet
+        self.sensor = sensor
+        self.icons = {}
+        self.battery.clear()
+        self.strength.clear()
+        self.date.clear()
+        for metric, spark in self.sparklines.items():
+            spark.redraw(sensorStore.history(sensor.topic, metric))
+        if reading is None:
+            self.text.setText(f'{sensor.name} :\n')
+        else:
+            self.update(sensor, reading, False)
+
+    def update(self, sensor, reading, trend=True):
+        humidity = reading.humidity or 0
+        pressure = reading.pressure or 0
+        self.text.setText(f'{sensor.name} :\n{reading.temperature:.1f}°C \nHumidité : {humidity:.0f}% \nPression : {pressure:.0f}hPa \n')
+        self.date.setText("{0:%H:%M}".format(datetime.datetime.fromtimestamp(reading.time)))
+        if reading.battery is not None:
+            self.setIcon(self.battery, getBatteryIcon(reading.battery))
+        if reading.linkquality is not None:
+            self.setIcon(self.strength, getSignalIcon(reading.linkquality))
+        if not trend:
+            return
+        for metric, spark in self.sparklines.items():
+            value = getattr(reading, metric)
+            if value is not None:
+                spark.add(reading.time, value,
+                          lambda m=metric: sensorStore.history(sensor.topic, m))
+
+
+class SensorGrid:
+    # Lays out the sensors in a grid of cols x rows panels. Only the
+    # panels of one page exist as widgets, the other sensors are kept as
+    # data (their last reading) and the pages rotate when they do not
+    # all fit. A sensor is shown in the cell of its registry slot.
+    def __init__(self, parent, rect, cols, rows, pagetime):
+        self.cols = cols
+        self.rows = rows
+        self.page = 0
+        self.pages = 1
+        self.latest = {}
+        self.sensors = {}
+        self.cells = []
+        cellw = rect.width() / cols
+        cellh = rect.height() / rows
+        scale = min(cellw / (400 * xscale), cellh / (170 * yscale))
+        for r in range(rows):
+            for c in range(cols):
+                # panels in odd columns have the icons mirrored
+                if c % 2 == 0:
+                    offsets = (265, 90, 5)
+                else:
+                    offsets = (90, 275, 315)
+                cell = SensorPanel(parent, "sensor" + str(len(self.cells) + 1),
+                                   QtCore.QRect(rect.x() + c * cellw,
+                                                rect.y() + r * cellh,
+                                                cellw, cellh),
+                                   offsets[0], offsets[1], offsets[2], scale)
+                cell.setVisible(False)
+                self.cells.append(cell)
+
+        self.pagelabel = QtWidgets.QLabel(parent)
+        self.pagelabel.setObjectName("sensorPage")
+        self.pagelabel.setStyleSheet("#sensorPage { background-color: transparent; color: " +
+                                     Config.textcolor + "; font-size: " +
+                                     str(int(15 * xscale * Config.fontmult)) + "px; }")
+        self.pagelabel.setAlignment(Qt.AlignRight | Qt.AlignBottom)
+        self.pagelabel.setGeometry(rect.x() + rect.width() - 60 * xscale,
+                                   rect.y() + rect.height() - 20 * yscale,
+                                   55 * xscale, 20 * yscale)
+        self.pagelabel.hide()
+
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.nextPage)
+        self.pagetime = pagetime
+
+    def add(self, sensor):
+        # a sensor known before its first reading gets its cell now
+        if sensor.slot is None or sensor.topic in self.sensors:
+            return
+        self.sensors[sensor.topic] = sensor
+        pages = max(s.slot for s in self.sensors.values()) // len(self.cells) + 1
+        if pages != self.pages:
+            self.pages = pages
+            if pages > 1 and not self.timer.isActive():
+                self.timer.start(1000 * self.pagetime)
+        self.showPage(self.page)
+
+    def update(self, sensor, reading):
+        self.latest[sensor.topic] = reading
+        if sensor.topic not in self.sensors:
+            self.add(sensor)
+            return
+        cell = self.cell(sensor)
+        if cell is not None:
+            cell.update(sensor, reading)
+
+    def cell(self, sensor):
+        i = sensor.slot - self.page * len(self.cells)
+        if 0 <= i < len(self.cells) and self.cells[i].sensor is sensor:
+            return self.cells[i]
+        return None
+
+    def showPage(self, page):
+        self.page = page
+        byslot = dict((s.slot, s) for s in self.sensors.values())
+        for i, cell in enumerate(self.cells):
+            sensor = byslot.get(page * len(self.cells) + i)
+            if sensor is None:
+                cell.sensor = None
+                cell.setVisible(False)
+                continue
+            if cell.sensor is not sensor:
+                cell.bind(sensor, self.latest.get(sensor.topic))
+            cell.setVisible(True)
+        if self.pages > 1:
+            self.pagelabel.setText("%d/%d" % (page + 1, self.pages))
+            self.pagelabel.show()
+            self.pagelabel.raise_()
+        else:
+            self.pagelabel.hide()
+
+    def nextPage(self):
+        self.showPage((self.page + 1) % self.pages)
+
+
+class Radar(QtWidgets.QLabel):
+    def __init__(self, parent, radar, rect, myname):
+        global xscale, yscale
+        self.myname = myname
+        self.rect = rect
+        self.anim = 5
+        self.zoom = radar["zoom"]
+        self.plan = getTilePlan(radar["center"], self.zoom,
+                                rect.width(), rect.height())
+        if 'snap' in radar and radar['snap'] == 1:
+            radar['center'] = self.plan['snapped']['center']
+            self.plan = getTilePlan(radar["center"], self.zoom,
+                                    rect.width(), rect.height())
+        print(myname + " tiles: " + tilePlanReport(self.plan))
+        self.point = radar["center"]
+        self.radar = radar
+        self.basetiles = Config.basemap_tiles
+        if 'basemap' in radar:
+            self.basetiles = radar['basemap']
+        self.baseurl = ''
+        if self.basetiles == '':
+            self.baseurl = self.mapurl(radar, rect)
+            print ("map base url: " + self.baseurl)
+        else:
+            print ("map base tiles: " + self.basetiles)
+        QtWidgets.QLabel.__init__(self, parent)
+        self.interval = Config.radar_refresh * 60
+        self.lastwx = 0
+        self.retries = 0
+        self.baseTime = 0
+
+        self.setObjectName("radar")
+        self.setGeometry(rect)
+        self.setStyleSheet("#radar { background-color: grey; }")
+        self.setAlignment(Qt.AlignCenter)
+
+        self.wwx = QtWidgets.QLabel(self)
+        self.wwx.setObjectName("wx")
+        self.wwx.setStyleSheet("#wx { background-color: transparent; }")
+        self.wwx.setGeometry(0, 0, rect.width(), rect.height())
+
+        self.wmk = QtWidgets.QLabel(self)
+        self.wmk.setObjectName("mk")
+        self.wmk.setStyleSheet("#mk { background-color: transparent; }")
+        self.wmk.setGeometry(0, 0, rect.width(), rect.height())
+
+        if 'color' not in radar:
+            radar['color'] = 6
+        if 'smooth' not in radar:
+            radar['smooth'] = 1
+        if 'snow' not in radar:
+            radar['snow'] = 1
+        # full zoom, and one zoom level out used on a poor network link,
+        # covering the same area with half the pixels (upscaled locally)
+        self.layers = [self.makeLayer(self.plan)]
+        if self.zoom > 1:
+            self.layers.append(self.makeLayer(getTilePlan(
+                radar["center"], self.zoom - 1,
+                (rect.width() + 1) // 2, (rect.height() + 1) // 2)))
+        self.layer = self.layers[0]
+        self.tiles = self.layer["tiles"]
+        self.tiletails = self.layer["tails"]
+        self.lowzoom = False
+        self.linklevel = LINK_GOOD
+        self.frameImages = []
+        self.frameIndex = 0
+        self.displayedFrame = 0
+        self.ticker = 0
+        self.pause = 5
+        self.lastget = 0
+        self.expectedFrames = self.anim + 1
+        self.frameStats = Instrumentation.frameStats(
+            myname, Config.radar_frame_ms / 1000.0, self.pause)
+
+    def makeLayer(self, plan):
+        # only the tiles overlapping the viewport are fetched
+        radar = self.radar
+        zoom = plan['zoom']
+        tiles = []
+        tails = []
+        for tile in plan['tiles']:
+            if not tile["valid"]:
+                continue
+            tiles.append(tile)
+            x = tile["X"]
+            y = tile["Y"]
+            tail = "/256/%d/%d/%d/%d/%d_%d.png" % (zoom, x, y,
+                                                   radar['color'],
+                                                   radar['smooth'],
+                                                   radar['snow'])
+            if 'oldcolor' in radar:
+                tail = "/256/%d/%d/%d.png?color=%d" % (zoom, x, y,
+                                                       radar['color']
+                                                       )
+            tails.append(tail)
+        return {"plan": plan, "tiles": tiles, "tails": tails}
+
+    @timed('radar.rtick')
+    def rtick(self):
+        if time.time() > (self.lastget + self.interval):
+            self.get(time.time())
+            self.lastget = time.time()
+        if len(self.frameImages) < 1:
+            return
+        if self.displayedFrame == 0:
+            self.ticker += 1
+            if self.ticker < self.pause:
+                return
+        self.ticker = 0
+        # print("len frameImages :", len(self.frameImages), "self.displayedFrame : ", self.displayedFrame)
+        if self.displayedFrame >= len(self.frameImages):
+            self.displayedFrame = 0
+        f = self.frameImages[self.displayedFrame]
+        if Instrumentation.enabled:
+            stats = self.frameStats
+            stats.available = len(self.frameImages)
+            stats.expected = self.expectedFrames
+            t = time.perf_counter()
+            self.wwx.setPixmap(f["image"])
+            stats.frame(self.displayedFrame, t, time.perf_counter())
+        else:
+            self.wwx.setPixmap(f["image"])
+        self.displayedFrame += 1
+        if self.displayedFrame >= len(self.frameImages):
+            self.displayedFrame = 0
+
+    def get(self, t=0):
+        t = int(t / 600)*600
+        if t > 0 and self.baseTime == t:
+            return
+        if t == 0:
+            t = self.baseTime
+        else:
+            self.baseTime = t
+        # on a poor link, fewer frames, then only the newest one,
+        # then the newest one at a lower zoom
+        anim = self.anim
+        level = LINK_GOOD
+        if Config.radar_adaptive:
+            level = netqueue.estimator.level
+        if level != self.linklevel:
+            print(self.myname + " network link level " + str(level))
+            self.linklevel = level
+        if level == LINK_POOR:
+            anim = min(self.anim, 2)
+        elif level >= LINK_BAD:
+            anim = 0
+        self.lowzoom = level >= LINK_VERY_BAD and len(self.layers) > 1
+        self.expectedFrames = anim + 1
+        newf = []
+        for f in self.frameImages:
+            if f["time"] >= (t - anim * 600):
+                if self.lowzoom or not f["lowzoom"]:
+                    newf.append(f)
+        self.frameImages = newf
+        firstt = t - anim * 600
+        # newest frame first, it is the one worth showing on a slow link
+        for tt in range(t, firstt-1, -600):
+            print ("get... " + str(tt) + " " + self.myname)
+            gotit = False
+            for f in self.frameImages:
+                if f["time"] == tt:
+                    gotit = True
+            if not gotit:
+                self.getTiles(tt)
+                break
+
+    def getTiles(self, t, i=0):
+        t = int(t / 600)*600
+        self.getTime = t
+        self.getIndex = i
+        if i == 0:
+            self.layer = self.layers[1 if self.lowzoom else 0]
+            self.tiles = self.layer["tiles"]
+            self.tiletails = self.layer["tails"]
+            self.tileurls = []
+            self.tileQimages = []
+            for tt in self.tiletails:
+                tileurl = provider('rainviewer') + "/v2/radar/%d/%s" \
+                    % (t, tt)
+                self.tileurls.append(tileurl)
+        print (self.myname + " " + str(self.getIndex) + " " + self.tileurls[i])
+        self.tilereq = QNetworkRequest(QUrl(self.tileurls[i]))
+        self.tilereply = netqueue.get(self.tilereq,
+                                      self.priority(t == self.baseTime),
+                                      self, 'rainviewer', t)
+        self.tilereply.finished.connect(self.getTilesReply)
+
+    @timed('radar.getTilesReply')
+    def getTilesReply(self):
+        print ("getTilesReply " + str(self.getIndex))
+        if self.tilereply.error() != QNetworkReply.NoError:
+                return
+        self.tileQimages.append(QImage())
+        with measure('radar.decodeTile'):
+            self.tileQimages[self.getIndex].loadFromData(
+                self.tilereply.readAll())
+        self.getIndex = self.getIndex + 1
+        if self.getIndex < len(self.tileurls):
+            self.getTiles(self.getTime, self.getIndex)
+        else:
+            self.combineTiles()
+            self.get()
+
+    @timed('radar.combineTiles')
+    def combineTiles(self):
+        global radar1
+        # tiles are drawn straight into a viewport sized image,
+        # shifted by the offset of the viewport in the first tile
+        plan = self.layer["plan"]
+        lowzoom = self.layer is not self.layers[0]
+        ii2 = QImage(plan['width'], plan['height'], QImage.Format_ARGB32)
+        ii2.fill(Qt.transparent)
+        painter = QPainter()
+        painter.begin(ii2)
+        xo = plan['xo']
+        yo = plan['yo']
+        for i, tile in enumerate(self.tiles):
+            if self.tileQimages[i].format() == 5:
+                painter.drawImage(tile["col"] * 256 - xo,
+                                  tile["row"] * 256 - yo,
+                                  self.tileQimages[i])
+        painter.end()
+        painter = None
+        self.tileQimages = []
+        if lowzoom:
+            ii2 = ii2.scaled(self.rect.width(), self.rect.height(),
+                             Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        painter2 = QPainter()
+        painter2.begin(ii2)
+        timestamp = "{0:%H:%M} rainvewer.com".format(
+                    datetime.datetime.fromtimestamp(self.getTime))
+        painter2.setPen(QColor(63, 63, 63, 255))
+        painter2.setFont(QFont("Arial", 8))
+        painter2.setRenderHint(QPainter.TextAntialiasing)
+        painter2.drawText(3-1, 12-1, timestamp)
+        painter2.drawText(3+2, 12+1, timestamp)
+        painter2.setPen(QColor(255, 255, 255, 255))
+        painter2.drawText(3, 12, timestamp)
+        painter2.drawText(3+1, 12, timestamp)
+        painter2.end()
+        painter2 = None
+        ii3 = QPixmap(ii2)
+        ii2 = None
+        # keep frames in time order, they are not fetched in that order
+        i = len(self.frameImages)
+        while i > 0 and self.frameImages[i-1]["time"] > self.getTime:
+            i -= 1
+        self.frameImages.insert(i, {"time": self.getTime, "image": ii3,
+                                    "lowzoom": lowzoom})
+        ii3 = None
+        startupmark('radar first frame')
+        if len(self.frameImages) > self.anim:
+            startupmark(self.myname + ' animation')
+            startupmark('radar animation')
+
+    def mapprovider(self):
+        try:
+            if Config.usemapbox:
+                return 'mapbox'
+        except AttributeError:
+            pass
+        return 'google'
+
+    def mapurl(self, radar, rect):
+        mb = 0
+        try:
+            mb = Config.usemapbox
+        except:
+            pass
+        if mb:
+            return self.mapboxurl(radar, rect)
+        else:
+            return self.googlemapurl(radar, rect)
+
+    def mapboxurl(self, radar, rect):
+        #  note we're using google maps zoom factor.
+        #  Mapbox equivilant zoom is one less
+        #  They seem to be using 512x512 tiles instead of 256x256
+        style = 'mapbox/satellite-streets-v10'
+        if 'style' in radar:
+            style = radar['style']
+        return provider('mapbox') + '/styles/v1/' + \
+               style + \
+               '/static/' + \
+               str(radar['center'].lng) + ',' + \
+               str(radar['center'].lat) + ',' + \
+               str(radar['zoom']-1) + ',0,0/' + \
+               str(rect.width()) + 'x' + str(rect.height()) + \
+               '?access_token=' + ApiKeys.mbapi
+
+    def googlemapurl(self, radar, rect):
+        urlp = []
+        if len(ApiKeys.googleapi) > 0:
+            urlp.append('key=' + ApiKeys.googleapi)
+        urlp.append(
+            'center=' + str(radar['center'].lat) +
+            ',' + str(radar['center'].lng))
+        zoom = radar['zoom']
+        rsize = rect.size()
+        if rsize.width() > 640 or rsize.height() > 640:
+            rsize = QtCore.QSize(rsize.width() / 2, rsize.height() / 2)
+            zoom -= 1
+        urlp.append('zoom=' + str(zoom))
+        urlp.append('size=' + str(rsize.width()) + 'x' + str(rsize.height()))
+        urlp.append('maptype=hybrid')
+
+        return provider('google') + '/maps/api/staticmap?' + \
+            '&'.join(urlp)
+
+    @timed('radar.basefinished')
+    def basefinished(self):
+        if self.basereply.error() != QNetworkReply.NoError:
+            return
+        basepixmap = QPixmap()
+        with measure('radar.decodeBase'):
+            basepixmap.loadFromData(self.basereply.readAll())
+        self.setbase(basepixmap)
+
+    def localbase(self):
+        # basemap from a local MBTiles file or XYZ directory, stitched with
+        # the same tile plan as the radar layer and cached as a png
+        try:
+            source = openTileSource(self.basetiles)
+        except Exception as e:
+            print("Error : could not open basemap tiles: " + str(e))
+            return False
+        cachefile = stitchedName(
+            self.basetiles, self.plan,
+            tilesMtime(source, self.zoom, self.plan['tiles']))
+        basepixmap = QPixmap()
+        if os.path.isfile(cachefile) and basepixmap.load(cachefile):
+            Instrumentation.count('basemap', True)
+            print(self.myname + " basemap from cache " + cachefile)
+            source.close()
+            self.setbase(basepixmap)
+            return True
+        Instrumentation.count('basemap', False)
+        ii = QImage(self.rect.width(), self.rect.height(),
+                    QImage.Format_ARGB32)
+        ii.fill(Qt.gray)
+        painter = QPainter()
+        painter.begin(ii)
+        found = 0
+        missing = 0
+        for tile in self.plan['tiles']:
+            if not tile["valid"]:
+                continue
+            data = source.tile(self.zoom, tile["X"], tile["Y"])
+            if data is None:
+                missing += 1
+                continue
+            timg = QImage()
+            with measure('radar.decodeBase'):
+                decoded = timg.loadFromData(data)
+            if not decoded:
+                missing += 1
+                continue
+            # tiles of any size are drawn in a 256x256 cell
+            painter.drawImage(QtCore.QRect(tile["col"] * 256 - self.plan['xo'],
+                                           tile["row"] * 256 - self.plan['yo'],
+                                           256, 256), timg)
+            found += 1
+        painter.end()
+        source.close()
+        if found == 0:
+            print("Error : no basemap tiles at zoom " + str(self.zoom) +
+                  " in " + self.basetiles)
+            return False
+        basepixmap = QPixmap.fromImage(ii)
+        if missing:
+            # not cached, the missing tiles may come with a later update
+            print(self.myname + " basemap " + str(missing) +
+                  " tiles missing in " + self.basetiles)
+            self.setbase(basepixmap)
+            return True
+        try:
+            if not os.path.isdir(os.path.dirname(cachefile)):
+                os.makedirs(os.path.dirname(cachefile))
+            basepixmap.save(cachefile, "PNG")
+        except OSError:
+            pass
+        self.setbase(basepixmap)
+        return True
+
+    def setbase(self, basepixmap):
+        self.basepixmap = basepixmap
+        if self.basepixmap.size() != self.rect.size():
+            self.basepixmap = self.basepixmap.scaled(self.rect.size(),
+                                                     Qt.KeepAspectRatio,
+                                                     Qt.SmoothTransformation)
+        self.setPixmap(self.basepixmap)
+
+        # make marker pixmap
+        self.mkpixmap = QPixmap(self.basepixmap.size())
+        self.mkpixmap.fill(Qt.transparent)
+        br = QBrush(QColor(Config.dimcolor))
+        painter = QPainter()
+        painter.begin(self.mkpixmap)
+        painter.fillRect(0, 0, self.mkpixmap.width(),
+                         self.mkpixmap.height(), br)
+        markers = [marker for marker in self.radar['markers']
+                   if 'visible' not in marker or marker['visible'] == 1]
+        points = getPoints([marker["location"] for marker in markers],
+                           self.point, self.zoom,
+                           self.rect.width(), self.rect.height())
+        for marker, pt in zip(markers, points):
+            mk2 = QImage()
+            mkfile = 'teardrop'
+            if 'image' in marker:
+                mkfile = marker['image']
+            if os.path.dirname(mkfile) == '':
+                mkfile = os.path.join('markers', mkfile)
+            if os.path.splitext(mkfile)[1] == '':
+                mkfile += '.png'
+            mk2.load(mkfile)
+            if mk2.format != QImage.Format_ARGB32:
+                mk2 = mk2.convertToFormat(QImage.Format_ARGB32)
+            mkh = 80  # self.rect.height() / 5
+            if 'size' in marker:
+                if marker['size'] == 'small':
+                    mkh = 64
+                if marker['size'] == 'mid':
+                    mkh = 70
+                if marker['size'] == 'tiny':
+                    mkh = 40
+            if 'color' in marker:
+                c = QColor(marker['color'])
+                (cr, cg, cb, ca) = c.getRgbF()
+                for x in range(0, mk2.width()):
+                    for y in range(0, mk2.height()):
+                        (r, g, b, a) = QColor.fromRgba(
+                                       mk2.pixel(x, y)).getRgbF()
+                        r = r * cr
+                        g = g * cg
+                        b = b * cb
+                        mk2.setPixel(x, y, QColor.fromRgbF(r, g, b, a)
+                                     .rgba())
+            mk2 = mk2.scaledToHeight(mkh, 1)
+            painter.drawImage(pt.x-mkh/2, pt.y-mkh/2, mk2)
+
+        painter.end()
+
+        self.wmk.setPixmap(self.mkpixmap)
+
+
+    def getbase(self):
+        global netqueue
+        if self.basetiles != '':
+            if self.localbase():
+                return
+            if Config.basemap_offline:
+                return
+            if self.baseurl == '':
+                self.baseurl = self.mapurl(self.radar, self.rect)
+        self.basereq = QNetworkRequest(QUrl(self.baseurl))
+        self.basereply = netqueue.get(self.basereq, self.priority(True),
+                                      self, self.mapprovider(), 'base')
+        self.basereply.finished.connect(self.basefinished)
+        # QtCore.QObject.connect(self.basereply, QtCore.SIGNAL(
+        #     "finished()"), self.basefinished)
+
+    def start(self, interval=0):
+        if interval > 0:
+            self.interval = interval
+        self.getbase()
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.rtick)
+        self.lastget = time.time() - self.interval + random.uniform(3, 10)
+
+    def priority(self, newest):
+        # on screen radars first, the newest frame before the history
+        if not self.isVisibleTo(self.window()):
+            return PRIO_HIDDEN
+        if newest:
+            return PRIO_RADAR_NEWEST
+        return PRIO_RADAR_HISTORY
+
+    def wxstart(self):
+        print ("wxstart for " + self.myname)
+        self.frameStats.restart()
+        self.timer.start(Config.radar_frame_ms)
+        # the basemap and the newest frame stay ahead of the history
+        netqueue.setPriority(self, lambda handle: self.priority(
+            handle.tag == 'base' or handle.tag == self.baseTime))
+
+    def wxstop(self):
+        print ("wxstop for " + self.myname)
+        self.timer.stop()
+        netqueue.setPriority(self, PRIO_HIDDEN)
+
+    def stop(self):
+        try:
+            self.timer.stop()
+            self.timer = None
+        except Exception:
+            pass
+
+
+def realquit():
+    QtWidgets.QApplication.exit(0)
+
+
+def myquit(a=0, b=0):
+    global objradar1, objradar2, objradar3, objradar4
+    global ctimer, wtimer, temptimer, storetimer, usagetimer
+
+    objradar1.stop()
+    objradar2.stop()
+    objradar3.stop()
+    objradar4.stop()
+    ctimer.stop()
+    wxtimer.stop()
+    # temptimer.stop()
+    storetimer.stop()
+    sensorStore.close()
+    usagetimer.stop()
+    netusage.save()
+    if metricsserver is not None:
+        metricstimer.stop()
+        metricsserver.stop()
+    if Tracing.tracer is not None:
+        tracedump()
+    if client.recorder is not None:
+        client.recorder.close()
+    if Config.useslideshow:
+        objimage1.stop()
+
+    QtCore.QTimer.singleShot(30, realquit)
+
+
+def fixupframe(frame, onoff):
+    for child in frame.children():
+        if isinstance(child, Radar):
+            if onoff:
+                # print "calling wxstart on radar on ",frame.objectName()
+                child.wxstart()
+            else:
+                # print "calling wxstop on radar on ",frame.objectName()
+                child.wxstop()
+
+
+def nextframe(plusminus):
+    global frames, framep
+    frames[framep].setVisible(False)
+    fixupframe(frames[framep], False)
+    framep += plusminus
+    if framep >= len(frames):
+        framep = 0
+    if framep < 0:
+        framep = len(frames) - 1
+    frames[framep].setVisible(True)
+    fixupframe(frames[framep], True)
+
+
+class myMain(QtWidgets.QWidget):
+
+    def keyPressEvent(self, event):
+        global weatherplayer, lastkeytime
+        if isinstance(event, QtWidgets.QKeyEvent):
+            # print event.key(), format(event.key(), '08x')
+            if event.key() == Qt.Key_F4:
+                myquit()
+            if event.key() == Qt.Key_F2:
+                if time.time() > lastkeytime:
+                    if weatherplayer is None:
+                        weatherplayer = Popen(
+                            ["mpg123", "-q", Config.noaastream])
+                    else:
+                        weatherplayer.kill()
+                        weatherplayer = None
+                lastkeytime = time.time() + 2
+            if event.key() == Qt.Key_Space:
+                nextframe(1)
+            if event.key() == Qt.Key_Left:
+                nextframe(-1)
+            if event.key() == Qt.Key_Right:
+                nextframe(1)
+            if event.key() == Qt.Key_F6:  # Previous Image
+                objimage1.prev_next(-1)
+            if event.key() == Qt.Key_F7:  # Next Image
+                objimage1.prev_next(1)
+            if event.key() == Qt.Key_F8:  # Play/Pause
+                objimage1.play_pause()
+            if event.key() == Qt.Key_F9:  # Foreground Toggle
+                if foreGround.isVisible():
+                    foreGround.hide()
+                else:
+                    foreGround.show()
+
+    def mousePressEvent(self, event):
+        if type(event) == QtGui.QMouseEvent:
+            nextframe(1)
+
+class MqttClient(QtCore.QObject):
+    Disconnected = 0
+    Connecting = 1
+    Connected = 2
+
+    MQTT_3_1 = mqtt.MQTTv31
+    MQTT_3_1_1 = mqtt.MQTTv311
+    connected = QtCore.pyqtSignal()
+    disconnected = QtCore.pyqtSignal()
+
+    stateChanged = QtCore.pyqtSignal(int)
+    hostnameChanged = QtCore.pyqtSignal(str)
+    portChanged = QtCore.pyqtSignal(int)
+    keepAliveChanged = QtCore.pyqtSignal(int)
+    cleanSessionChanged = QtCore.pyqtSignal(bool)
+    protocolVersionChanged = QtCore.pyqtSignal(int)
+
+    # raw (topic, payload bytes), and the reading parsed from it
+    messageSignal = QtCore.pyqtSignal(str, object)
+    readingSignal = QtCore.pyqtSignal(object)
+    # from the network thread, readings are waiting in the coalescer
+    pendingSignal = QtCore.pyqtSignal()
+    # messages under rawPrefix, they are not sensor readings
+    rawSignal = QtCore.pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super(MqttClient, self).__init__(parent)
+
+        self.m_hostname = Config.mqtt_host
+        self.m_port = 1883
+        self.m_keepAlive = 60
+        # persistent session, the broker keeps our subscriptions and
+        # queues the QoS 1 messages while we are away
+        self.m_cleanSession = False
+        self.m_clientId = Config.mqtt_client_id
+        self.m_protocolVersion = MqttClient.MQTT_3_1
+
+        self.m_state = MqttClient.Disconnected
+        self.m_topics = []
+        self.rawPrefix = None
+        self.recorder = None
+
+        self.m_client =  mqtt.Client(client_id=self.m_clientId,
+            clean_session=self.m_cleanSession,
+            protocol=self.protocolVersion)
+        # reconnect delay doubles from min to max after each failure
+        self.m_client.reconnect_delay_set(min_delay=Config.mqtt_backoff[0],
+                                          max_delay=Config.mqtt_backoff[1])
+
+        self.m_client.on_connect = self.on_connect
+        self.m_client.on_message = self.on_message
+        self.m_client.on_disconnect = self.on_disconnect
+
+        # 'qt' runs paho on the Qt event loop, 'thread' in its own thread
+        self.m_loop = None
+        if Config.mqtt_mode == 'qt':
+            self.m_loop = QtMqttLoop(self.m_client, Config.mqtt_backoff, self)
+
+        # readings are flushed to readingSignal at most once per
+        # frameInterval (ms), only the latest one of each topic
+        self.coalescer = MessageCoalescer()
+        self.frameInterval = 50
+        self.pendingSignal.connect(self.schedule)
+
+    @QtCore.pyqtProperty(int, notify=stateChanged)
+    def state(self):
+        return self.m_state
+
+    @state.setter
+    def state(self, state):
+        if self.m_state == state: return
+        self.m_state = state
+        self.stateChanged.emit(state) 
+
+    @QtCore.pyqtProperty(str, notify=hostnameChanged)
+    def hostname(self):
+        return self.m_hostname
+
+    @hostname.setter
+    def hostname(self, hostname):
+        if self.m_hostname == hostname: return
+        self.m_hostname = hostname
+        self.hostnameChanged.emit(hostname)
+
+    @QtCore.pyqtProperty(int, notify=portChanged)
+    def port(self):
+        return self.m_port
+
+    @port.setter
+    def port(self, port):
+        if self.m_port == port: return
+        self.m_port = port
+        self.portChanged.emit(port)
+
+    @QtCore.pyqtProperty(int, notify=keepAliveChanged)
+    def keepAlive(self):
+        return self.m_keepAlive
+
+    @keepAlive.setter
+    def keepAlive(self, keepAlive):
+        if self.m_keepAlive == keepAlive: return
+        self.m_keepAlive = keepAlive
+        self.keepAliveChanged.emit(keepAlive)
+
+    @QtCore.pyqtProperty(bool, notify=cleanSessionChanged)
+    def cleanSession(self):
+        return self.m_cleanSession
+
+    @cleanSession.setter
+    def cleanSession(self, cleanSession):
+        if self.m_cleanSession == cleanSession: return
+        self.m_cleanSession = cleanSession
+        self.cleanSessionChanged.emit(cleanSession)
+
+    @QtCore.pyqtProperty(int, notify=protocolVersionChanged)
+    def protocolVersion(self):
+        return self.m_protocolVersion
+
+    @protocolVersion.setter
+    def protocolVersion(self, protocolVersion):
+        if self.m_protocolVersion == protocolVersion: return
+        if protocolVersion in (MqttClient.MQTT_3_1, MQTT_3_1_1):
+            self.m_protocolVersion = protocolVersion
+            self.protocolVersionChanged.emit(protocolVersion)
+
+    #################################################################
+    @QtCore.pyqtSlot()
+    def connectToHost(self):
+        # the connection is made by the network thread, the GUI never
+        # waits for the broker, and a broker not up yet is retried
+        if self.m_hostname:
+            self.m_client.connect_async(self.m_hostname,
+                port=self.port,
+                keepalive=self.keepAlive)
+
+            self.state = MqttClient.Connecting
+            if self.m_loop is not None:
+                self.m_loop.start()
+            else:
+                self.m_client.loop_start()
+
+    @QtCore.pyqtSlot()
+    def disconnectFromHost(self):
+        if self.m_loop is not None:
+            self.m_loop.stop()
+        else:
+            self.m_client.disconnect()
+
+    def subscribe(self, path, qos=1):
+        # remembered, and subscribed again on every (re)connection
+        if (path, qos) not in self.m_topics:
+            self.m_topics.append((path, qos))
+        if self.state == MqttClient.Connected:
+            self.m_client.subscribe(path, qos)
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        # QoS 1 messages are kept by paho until the broker is back
+        return self.m_client.publish(topic, payload, qos=qos, retain=retain)
+
+    #################################################################
+    # callbacks
+    @timed('mqtt.on_message')
+    def on_message(self, mqttc, obj, msg):
+        # called in the paho network thread (or the GUI thread in 'qt'
+        # mode), the payload is parsed here once and only the resulting
+        # reading is handed to the GUI thread
+        topic = msg.topic
+        payload = msg.payload
+        if self.recorder is not None:
+            self.recorder.write(topic, payload)
+        if self.receivers(self.messageSignal) > 0:
+            self.messageSignal.emit(topic, payload)
+        if self.rawPrefix is not None and topic.startswith(self.rawPrefix):
+            self.rawSignal.emit(topic, payload)
+            return
+        reading = parseReading(topic, payload)
+        if reading is None:
+            print("Info : ignoring non JSON MQTT message on " + topic)
+            return
+        if self.coalescer.put(reading):
+            self.pendingSignal.emit()
+
+    @QtCore.pyqtSlot()
+    def schedule(self):
+        QtCore.QTimer.singleShot(self.frameInterval, self.flush)
+
+    @QtCore.pyqtSlot()
+    @timed('mqtt.flush')
+    def flush(self):
+        for reading in self.coalescer.take():
+            self.readingSignal.emit(reading)
+
+    def on_connect(self, mqttc, obj, flags, rc):
+        if rc != 0:
+            print("MQTT connection refused : " + mqtt.connack_string(rc))
+            return
+        if not flags.get('session present'):
+            print("MQTT new session, subscribing")
+        # renewing the subscriptions of a kept session is harmless
+        if self.m_topics:
+            self.m_client.subscribe(self.m_topics)
+        self.state = MqttClient.Connected
+        self.connected.emit()
+
+    def on_disconnect(self, mqttc, obj, rc):
+        if rc != 0:
+            print("MQTT connection lost (" + mqtt.error_string(rc) +
+                  "), reconnecting")
+        self.state = MqttClient.Disconnected
+        self.disconnected.emit()
+
+configname = 'Config'
+
+if len(sys.argv) > 1:
+    configname = sys.argv[1]
+
+if not os.path.isfile(configname + ".py"):
+    print ("Config file not found %s" % configname + ".py")
+    exit(1)
+
+Config = __import__(configname)
+timeline.mark('config')
+
+# define default values for new/optional config variables.
+
+try:
+    Config.location
+except AttributeError:
+    Config.location = Config.wulocation
+
+try:
+    Config.metric
+except AttributeError:
+    Config.metric = 0
+
+try:
+    Config.weather_refresh
+except AttributeError:
+    Config.weather_refresh = 30   # minutes
+
+try:
+    Config.radar_refresh
+except AttributeError:
+    Config.radar_refresh = 10    # minutes
+
+try:
+    Config.fontattr
+except AttributeError:
+    Config.fontattr = ''
+
+try:
+    Config.dimcolor
+except AttributeError:
+    Config.dimcolor = QColor('#000000')
+    Config.dimcolor.setAlpha(0)
+
+try:
+    Config.DateLocale
+except AttributeError:
+    Config.DateLocale = ''
+
+try:
+    Config.wind_degrees
+except AttributeError:
+    Config.wind_degrees = 0
+
+try:
+    Config.digital
+except AttributeError:
+    Config.digital = 0
+
+try:
+    Config.Language
+except AttributeError:
+    try:
+        Config.Language = Config.wuLanguage
+    except AttributeError:
+        Config.Language = "en"
+
+try:
+    Config.fontmult
+except AttributeError:
+    Config.fontmult = 1.0
+
+try:
+    Config.LPressure
+except AttributeError:
+    Config.LPressure = "Pressure "
+    Config.LHumidity = "Humidity "
+    Config.LWind = "Wind "
+    Config.Lgusting = " gusting "
+    Config.LFeelslike = "Feels like "
+    Config.LPrecip1hr = " Precip 1hr:"
+    Config.LToday = "Today: "
+    Config.LSunRise = "Sun Rise:"
+    Config.LSet = " Set: "
+    Config.LMoonPhase = " Moon Phase:"
+    Config.LInsideTemp = "Inside Temp "
+    Config.LRain = " Rain: "
+    Config.LSnow = " Snow: "
+
+try:
+    Config.Lmoon1
+    Config.Lmoon2
+    Config.Lmoon3
+    Config.Lmoon4
+    Config.Lmoon5
+    Config.Lmoon6
+    Config.Lmoon7
+    Config.Lmoon8
+except AttributeError:
+    Config.Lmoon1 = 'New Moon'
+    Config.Lmoon2 = 'Waxing Crescent'
+    Config.Lmoon3 = 'First Quarter'
+    Config.Lmoon4 = 'Waxing Gibbous'
+    Config.Lmoon5 = 'Full Moon'
+    Config.Lmoon6 = 'Waning Gibbous'
+    Config.Lmoon7 = 'Third Quarter'
+    Config.Lmoon8 = 'Waning Crecent'
+
+try:
+    Config.digitalformat2
+except AttributeError:
+    Config.digitalformat2 = "{0:%H:%M:%S}"
+
+try:
+    Config.useslideshow
+except AttributeError:
+    Config.useslideshow = 0
+
+try:
+    Config.basemap_tiles
+except AttributeError:
+    Config.basemap_tiles = ''
+
+try:
+    Config.basemap_offline
+except AttributeError:
+    Config.basemap_offline = 0
+
+try:
+    Config.net_max_active
+except AttributeError:
+    Config.net_max_active = 4
+
+try:
+    Config.sensors
+except AttributeError:
+    Config.sensors = (
+        {'topic': 'zigbee/sensor1', 'name': 'Salon', 'slot': 0},
+        {'topic': 'zigbee/sensor2', 'name': 'Chambre', 'slot': 1},
+    )
+
+try:
+    Config.radar_adaptive
+except AttributeError:
+    Config.radar_adaptive = 1
+
+try:
+    Config.radar_link_thresholds
+except AttributeError:
+    Config.radar_link_thresholds = (100000, 30000, 10000)
+
+try:
+    Config.radar_frame_ms
+except AttributeError:
+    Config.radar_frame_ms = 200
+
+try:
+    Config.net_usage_file
+except AttributeError:
+    Config.net_usage_file = 'netusage.json'
+
+try:
+    Config.net_quota
+except AttributeError:
+    Config.net_quota = {}
+
+try:
+    Config.sensor_db
+except AttributeError:
+    Config.sensor_db = 'sensors.db'
+
+try:
+    Config.sensor_db_commit
+except AttributeError:
+    Config.sensor_db_commit = 60
+
+try:
+    Config.sensor_db_retention
+except AttributeError:
+    Config.sensor_db_retention = (2, 30, 730)
+
+try:
+    Config.sensor_history
+except AttributeError:
+    Config.sensor_history = 1440
+
+try:
+    Config.sensor_sparklines
+except AttributeError:
+    Config.sensor_sparklines = 1
+
+try:
+    Config.sensor_grid
+except AttributeError:
+    Config.sensor_grid = (2, 1)
+
+try:
+    Config.sensor_page_time
+except AttributeError:
+    Config.sensor_page_time = 10
+
+try:
+    Config.mqtt_frame_ms
+except AttributeError:
+    Config.mqtt_frame_ms = 50
+
+try:
+    Config.mqtt_host
+except AttributeError:
+    Config.mqtt_host = 'localhost'
+
+try:
+    Config.mqtt_client_id
+except AttributeError:
+    Config.mqtt_client_id = 'PiWeatherStation-' + platform.node()
+
+try:
+    Config.mqtt_backoff
+except AttributeError:
+    Config.mqtt_backoff = (1, 120)
+
+try:
+    Config.mqtt_mode
+except AttributeError:
+    Config.mqtt_mode = 'thread'
+
+try:
+    Config.wx_mqtt
+except AttributeError:
+    Config.wx_mqtt = ''
+
+try:
+    Config.wx_topic
+except AttributeError:
+    Config.wx_topic = 'piweatherstation/weather'
+
+try:
+    Config.mqtt_record
+except AttributeError:
+    Config.mqtt_record = ''
+
+try:
+    Config.mqtt_replay
+except AttributeError:
+    Config.mqtt_replay = ''
+
+try:
+    Config.mqtt_replay_speed
+except AttributeError:
+    Config.mqtt_replay_speed = 1
+
+try:
+    Config.use_metar
+except AttributeError:
+    Config.use_metar = 0
+
+try:
+    Config.provider_urls
+except AttributeError:
+    Config.provider_urls = {}
+
+try:
+    Config.instrument
+except AttributeError:
+    Config.instrument = 0
+
+try:
+    Config.instrument_interval
+except AttributeError:
+    Config.instrument_interval = 300
+
+try:
+    Config.metrics_port
+except AttributeError:
+    Config.metrics_port = 0
+
+try:
+    Config.metrics_bind
+except AttributeError:
+    Config.metrics_bind = '127.0.0.1'
+
+try:
+    Config.metrics_interval
+except AttributeError:
+    Config.metrics_interval = 15
+
+try:
+    Config.trace_file
+except AttributeError:
+    Config.trace_file = ''
+
+try:
+    Config.trace_events
+except AttributeError:
+    Config.trace_events = 200000
+
+if Config.trace_file != '':
+    Tracing.start(Config.trace_events)
+
+# the metrics and the trace need the callback timings too
+Instrumentation.enabled = bool(Config.instrument or Config.metrics_port or
+                               Config.trace_file)
+
+try:
+    Config.stall_threshold
+except AttributeError:
+    Config.stall_threshold = 3
+
+lagmonitor = None
+if Config.stall_threshold > 0:
+    lagmonitor = LagMonitor(1.0, Config.stall_threshold)
+
+try:
+    Config.memory_report
+except AttributeError:
+    Config.memory_report = 0
+
+try:
+    Config.startup_trace
+except AttributeError:
+    Config.startup_trace = ''
+
+metricsserver = None
+if Config.metrics_port > 0:
+    metricsserver = MetricsServer(Config.metrics_bind, Config.metrics_port)
+
+memmonitor = None
+if Config.memory_report > 0:
+    # tracemalloc slows allocations down a bit, only when asked for
+    memmonitor = MemoryMonitor()
+
+
+#
+# Check if Mapbox API key is set, and use mapbox if so
+try:
+    if ApiKeys.mbapi[:3].lower() == "pk.":
+        Config.usemapbox = 1
+except AttributeError:
+    pass
+
+
+try:
+    if Config.METAR != '':
+        from metar import Metar
+except AttributeError:
+    pass
+
+lastmin = -1
+lastday = -1
+pdy = ""
+lasttimestr = ""
+weatherplayer = None
+lastkeytime = 0
+lastapiget = time.time()
+
+app = QtWidgets.QApplication(sys.argv)
+desktop = app.desktop()
+rec = desktop.screenGeometry()
+height = rec.height()
+width = rec.width()
+
+signal.signal(signal.SIGINT, myquit)
+if Tracing.tracer is not None:
+    # kill -USR1 <pid> writes the trace without stopping the clock
+    signal.signal(signal.SIGUSR1, tracedump)
+
+timeline.mark('config defaults')
+w = myMain()
+w.setWindowTitle(os.path.basename(__file__))
+
+w.setStyleSheet("QWidget { background-color: black;}")
+
+# connectMqtt()
+global client
+client = MqttClient()
+client.frameInterval = Config.mqtt_frame_ms
+client.stateChanged.connect(on_stateChanged)
+client.readingSignal.connect(on_readingSignal)
+client.rawSignal.connect(on_rawSignal)
+client.rawPrefix = Config.wx_topic + '/'
+
+# fullbgpixmap = QtGui.QPixmap(Config.background)
+# fullbgrect = fullbgpixmap.rect()
+# xscale = float(width)/fullbgpixmap.width()
+# yscale = float(height)/fullbgpixmap.height()
+
+xscale = float(width) / 1440.0
+yscale = float(height) / 900.0
+
+frames = []
+framep = 0
+
+frame1 = QtWidgets.QFrame(w)
+frame1.setObjectName("frame1")
+frame1.setGeometry(0, 0, width, height)
+frame1.setStyleSheet("#frame1 { background-color: black; border-image: url(" +
+                     Config.background + ") 0 0 0 0 stretch stretch;}")
+frames.append(frame1)
+
+if Config.useslideshow:
+    imgRect = QtCore.QRect(0, 0, width, height)
+    objimage1 = SS(frame1, imgRect, "image1")
+
+frame2 = QtWidgets.QFrame(w)
+frame2.setObjectName("frame2")
+frame2.setGeometry(0, 0, width, height)
+frame2.setStyleSheet("#frame2 { background-color: blue; border-image: url(" +
+                     Config.background + ") 0 0 0 0 stretch stretch;}")
+frame2.setVisible(False)
+frames.append(frame2)
+
+# frame3 = QtGui.QFrame(w)
+# frame3.setObjectName("frame3")
+# frame3.setGeometry(0,0,width,height)
+# frame3.setStyleSheet("#frame3 { background-color: blue; border-image:
+#       url("+Config.background+") 0 0 0 0 stretch stretch;}")
+# frame3.setVisible(False)
+# frames.append(frame3)
+
+foreGround = QtWidgets.QFrame(frame1)
+foreGround.setObjectName("foreGround")
+foreGround.setStyleSheet("#foreGround { background-color: transparent; }")
+foreGround.setGeometry(0, 0, width, height)
+
+squares1 = QtWidgets.QFrame(foreGround)
+squares1.setObjectName("squares1")
+squares1.setGeometry(0, height - yscale * 600, xscale * 340, yscale * 600)
+squares1.setStyleSheet(
+    "#squares1 { background-color: transparent; border-image: url(" +
+    Config.squares1 +
+    ") 0 0 0 0 stretch stretch;}")
+
+squares2 = QtWidgets.QFrame(foreGround)
+squares2.setObjectName("squares2")
+squares2.setGeometry(width - xscale * 340, 0, xscale * 340, yscale * 900)
+squares2.setStyleSheet(
+    "#squares2 { background-color: transparent; border-image: url(" +
+    Config.squares2 +
+    ") 0 0 0 0 stretch stretch;}")
+
+if not Config.digital:
+    clockface = QtWidgets.QFrame(foreGround)
+    clockface.setObjectName("clockface")
+    clockrect = QtCore.QRect(
+        width / 2 - height * .325,
+        height * .45 - height * .4,
+        height * .65,
+        height * .65)
+    clockface.setGeometry(clockrect)
+    clockface.setStyleSheet(
+        "#clockface { background-color: transparent; border-image: url(" +
+        Config.clockface +
+        ") 0 0 0 0 stretch stretch;}")
+
+    hourhand = QtWidgets.QLabel(foreGround)
+    hourhand.setObjectName("hourhand")
+    hourhand.setStyleSheet("#hourhand { background-color: transparent; }")
+
+    minhand = QtWidgets.QLabel(foreGround)
+    minhand.setObjectName("minhand")
+    minhand.setStyleSheet("#minhand { background-color: transparent; }")
+
+    sechand = QtWidgets.QLabel(foreGround)
+    sechand.setObjectName("sechand")
+    sechand.setStyleSheet("#sechand { background-color: transparent; }")
+
+    hourpixmap = QtGui.QPixmap(Config.hourhand)
+    hourpixmap2 = QtGui.QPixmap(Config.hourhand)
+    minpixmap = QtGui.QPixmap(Config.minhand)
+    minpixmap2 = QtGui.QPixmap(Config.minhand)
+    secpixmap = QtGui.QPixmap(Config.sechand)
+    secpixmap2 = QtGui.QPixmap(Config.sechand)
+else:
+    clockface = QtWidgets.QLabel(foreGround)
+    clockface.setObjectName("clockface")
+    clockrect = QtCore.QRect(
+        width / 2 - height * .325,
+        height * .45 - height * .4,
+        height * .65,
+        height * .65)
+    clockface.setGeometry(clockrect)
+    dcolor = QColor(Config.digitalcolor).darker(0).name()
+    lcolor = QColor(Config.digitalcolor).lighter(120).name()
+    clockface.setStyleSheet(
+        "#clockface { background-color: transparent; font-family:sans-serif;" +
+        " font-weight: light; color: " +
+        lcolor +
+        "; background-color: transparent; font-size: " +
+        str(int(Config.digitalsize * xscale)) +
+        "px; " +
+        Config.fontattr +
+        "}")
+    clockface.setAlignment(Qt.AlignCenter)
+    clockface.setGeometry(clockrect)
+    glow = QtWidgets.QGraphicsDropShadowEffect()
+    glow.setOffset(0)
+    glow.setBlurRadius(50)
+    glow.setColor(QColor(dcolor))
+    clockface.setGraphicsEffect(glow)
+
+
+radar1rect = QtCore.QRect(3 * xscale, 344 * yscale, 300 * xscale, 275 * yscale)
+objradar1 = Radar(foreGround, Config.radar1, radar1rect, "radar1")
+
+radar2rect = QtCore.QRect(3 * xscale, 622 * yscale, 300 * xscale, 275 * yscale)
+objradar2 = Radar(foreGround, Config.radar2, radar2rect, "radar2")
+
+radar3rect = QtCore.QRect(13 * xscale, 50 * yscale, 700 * xscale, 700 * yscale)
+objradar3 = Radar(frame2, Config.radar3, radar3rect, "radar3")
+
+radar4rect = QtCore.QRect(726 * xscale, 50 * yscale,
+                          700 * xscale, 700 * yscale)
+objradar4 = Radar(frame2, Config.radar4, radar4rect, "radar4")
+
+actualweather = QtWidgets.QLabel(foreGround)
+actualweather.setObjectName("actualweather")
+actualweather.setStyleSheet("#actualweather { background-color: rgba(0, 0, 0, 40%);}")
+                    # " border-width: 10px; border-style: solid; border-image: linear-gradient(to top, black, rgba(0, 0, 0, 0)) 1 100%; }")
+
+actualweather.setGeometry(0, 0, 300 * xscale, 337 * yscale)
+
+datex = QtWidgets.QLabel(foreGround)
+datex.setObjectName("datex")
+datex.setStyleSheet("#datex { font-family:sans-serif; color: " +
+                    Config.textcolor +
+                    "; background-color: transparent; font-size: " +
+                    str(int(50 * xscale * Config.fontmult)) +
+                    "px; " +
+                    Config.fontattr +
+                    "}")
+datex.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+datex.setGeometry(0, 0, width, 100 * yscale)
+
+datex2 = QtWidgets.QLabel(frame2)
+datex2.setObjectName("datex2")
+datex2.setStyleSheet("#datex2 { font-family:sans-serif; color: " +
+                     Config.textcolor +
+                     "; background-color: transparent; font-size: " +
+                     str(int(50 * xscale * Config.fontmult)) + "px; " +
+                     Config.fontattr +
+                     "}")
+datex2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+datex2.setGeometry(800 * xscale, 780 * yscale, 640 * xscale, 100)
+datey2 = QtWidgets.QLabel(frame2)
+datey2.setObjectName("datey2")
+datey2.setStyleSheet("#datey2 { font-family:sans-serif; color: " +
+                     Config.textcolor +
+                     "; background-color: transparent; font-size: " +
+                     str(int(50 * xscale * Config.fontmult)) +
+                     "px; " +
+                     Config.fontattr +
+                     "}")
+datey2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+datey2.setGeometry(800 * xscale, 840 * yscale, 640 * xscale, 100)
+
+attribution = QtWidgets.QLabel(foreGround)
+attribution.setObjectName("attribution")
+attribution.setStyleSheet("#attribution { " +
+                          " background-color: transparent; color: " +
+                          Config.textcolor +
+                          "; font-size: " +
+                          str(int(12 * xscale)) +
+                          "px; " +
+                          Config.fontattr +
+                          "}")
+attribution.setAlignment(Qt.AlignTop)
+attribution.setGeometry(6 * xscale, 3 * yscale, 100 * xscale, 100)
+
+ypos = -25
+wxicon = QtWidgets.QLabel(foreGround)
+wxicon.setObjectName("wxicon")
+wxicon.setStyleSheet("#wxicon { background-color: transparent; }")
+wxicon.setGeometry(75 * xscale, ypos * yscale, 150 * xscale, 150 * yscale)
+
+attribution2 = QtWidgets.QLabel(frame2)
+attribution2.setObjectName("attribution2")
+attribution2.setStyleSheet("#attribution2 { " +
+                           "background-color: transparent; color: " +
+                           Config.textcolor +
+                           "; font-size: " +
+                           str(int(12 * xscale * Config.fontmult)) +
+                           "px; " +
+                           Config.fontattr +
+                           "}")
+attribution2.setAlignment(Qt.AlignTop)
+attribution2.setGeometry(6 * xscale, 880 * yscale, 100 * xscale, 100)
+
+wxicon2 = QtWidgets.QLabel(frame2)
+wxicon2.setObjectName("wxicon2")
+wxicon2.setStyleSheet("#wxicon2 { background-color: transparent; }")
+wxicon2.setGeometry(0 * xscale, 750 * yscale, 150 * xscale, 150 * yscale)
+
+ypos += 130
+wxdesc = QtWidgets.QLabel(foreGround)
+wxdesc.setObjectName("wxdesc")
+wxdesc.setStyleSheet("#wxdesc { background-color: transparent; color: " +
+                     Config.textcolor +
+                     "; font-size: " +
+                     str(int(30 * xscale)) +
+                     "px; " +
+                     Config.fontattr +
+                     "}")
+wxdesc.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+wxdesc.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
+
+wxdesc2 = QtWidgets.QLabel(frame2)
+wxdesc2.setObjectName("wxdesc2")
+wxdesc2.setStyleSheet("#wxdesc2 { background-color: transparent; color: " +
+                      Config.textcolor +
+                      "; font-size: " +
+                      str(int(50 * xscale * Config.fontmult)) +
+                      "px; " +
+                      Config.fontattr +
+                      "}")
+wxdesc2.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+wxdesc2.setGeometry(400 * xscale, 800 * yscale, 400 * xscale, 100)
+
+ypos += 25
+temper = QtWidgets.QLabel(foreGround)
+temper.setObjectName("temper")
+temper.setStyleSheet("#temper { background-color: transparent; color: " +
+                     Config.textcolor +
+                     "; font-size: " +
+                     str(int(70 * xscale * Config.fontmult)) +
+                     "px; " +
+                     Config.fontattr +
+                     "}")
+temper.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+temper.setGeometry(3 * xscale, ypos * yscale,
+                   300 * xscale, 100 * yscale)
+
+temper2 = QtWidgets.QLabel(frame2)
+temper2.setObjectName("temper2")
+temper2.setStyleSheet("#temper2 { background-color: transparent; color: " +
+                      Config.textcolor +
+                      "; font-size: " +
+                      str(int(70 * xscale * Config.fontmult)) +
+                      "px; " +
+                      Config.fontattr +
+                      "}")
+temper2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+temper2.setGeometry(125 * xscale, 780 * yscale, 300 * xscale, 100)
+
+ypos += 80
+press = QtWidgets.QLabel(foreGround)
+press.setObjectName("press")
+press.setStyleSheet("#press { background-color: transparent; color: " +
+                    Config.textcolor +
+                    "; font-size: " +
+                    str(int(25 * xscale * Config.fontmult)) +
+                    "px; " +
+                    Config.fontattr +
+                    "}")
+press.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+press.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
+
+ypos += 30
+humidity = QtWidgets.QLabel(foreGround)
+humidity.setObjectName("humidity")
+humidity.setStyleSheet("#humidity { background-color: transparent; color: " +
+                       Config.textcolor +
+                       "; font-size: " +
+                       str(int(25 * xscale * Config.fontmult)) +
+                       "px; " +
+                       Config.fontattr +
+                       "}")
+humidity.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+humidity.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
+
+ypos += 30
+wind = QtWidgets.QLabel(foreGround)
+wind.setObjectName("wind")
+wind.setStyleSheet("#wind { background-color: transparent; color: " +
+                   Config.textcolor +
+                   "; font-size: " +
+                   str(int(20 * xscale * Config.fontmult)) +
+                   "px; " +
+                   Config.fontattr +
+                   "}")
+wind.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+wind.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
+
+ypos += 20
+wind2 = QtWidgets.QLabel(foreGround)
+wind2.setObjectName("wind2")
+wind2.setStyleSheet("#wind2 { background-color: transparent; color: " +
+                    Config.textcolor +
+                    "; font-size: " +
+                    str(int(20 * xscale * Config.fontmult)) +
+                    "px; " +
+                    Config.fontattr +
+                    "}")
+wind2.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+wind2.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
+
+ypos += 20
+wdate = QtWidgets.QLabel(foreGround)
+wdate.setObjectName("wdate")
+wdate.setStyleSheet("#wdate { background-color: transparent; color: " +
+                    Config.textcolor +
+                    "; font-size: " +
+                    str(int(15 * xscale * Config.fontmult)) +
+                    "px; " +
+                    Config.fontattr +
+                    "}")
+wdate.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+wdate.setGeometry(3 * xscale, ypos * yscale, 300 * xscale, 100)
+
+bottom = QtWidgets.QLabel(foreGround)
+bottom.setObjectName("bottom")
+bottom.setStyleSheet("#bottom { font-family:sans-serif; color: " +
+                     Config.textcolor +
+                     "; background-color: rgba(0, 0, 0, 40%); font-size: " +
+                     str(int(30 * xscale * Config.fontmult)) +
+                     "px; " +
+                     Config.fontattr +
+                     "}")
+bottom.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+bottom.setGeometry(310 * xscale, height - 78 * yscale, width - 620 * xscale, 80 * yscale)
+
+temp = QtWidgets.QLabel(foreGround)
+temp.setObjectName("temp")
+temp.setStyleSheet("#temp { font-family:sans-serif; color: " +
+                   Config.textcolor +
+                   "; background-color: transparent; font-size: " +
+                   str(int(30 * xscale * Config.fontmult)) +
+                   "px; " +
+                   Config.fontattr +
+                   "}")
+temp.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+temp.setGeometry(0, height - 100 * yscale, width, 50 * yscale)
+
+
+forecast = []
+for i in range(0, 9):
+    lab = QtWidgets.QLabel(foreGround)
+    lab.setObjectName("forecast" + str(i))
+    lab.setStyleSheet("QWidget { background-color: rgba(0, 0, 0, 40%); color: " +
+                      Config.textcolor +
+                      "; font-size: " +
+                      str(int(20 * xscale * Config.fontmult)) +
+                      "px; " +
+                      Config.fontattr +
+                      "}")
+    lab.setGeometry(1137 * xscale, i * 100 * yscale,
+                    300 * xscale, 100 * yscale)
+
+    icon = QtWidgets.QLabel(lab)
+    icon.setStyleSheet("#icon { background-color: rgba(0, 0, 0, 40%); }")
+    icon.setGeometry(0, 0, 100 * xscale, 100 * yscale)
+    icon.setObjectName("icon")
+
+    wx = QtWidgets.QLabel(lab)
+    wx.setStyleSheet("#wx { background-color: transparent; }")
+    wx.setGeometry(100 * xscale, 5 * yscale, 200 * xscale, 120 * yscale)
+    wx.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+    wx.setWordWrap(True)
+    wx.setObjectName("wx")
+
+    day = QtWidgets.QLabel(lab)
+    day.setStyleSheet("#day { background-color: transparent; }")
+    day.setGeometry(100 * xscale, 75 * yscale, 200 * xscale, 25 * yscale)
+    day.setAlignment(Qt.AlignRight | Qt.AlignBottom)
+    day.setObjectName("day")
+
+    forecast.append(lab)
+
+sensorGrid = SensorGrid(foreGround,
+                        QtCore.QRect(width / 2 - 400 * xscale, height - 280 * yscale,
+                                     800 * xscale, 170 * yscale),
+                        Config.sensor_grid[0], Config.sensor_grid[1],
+                        Config.sensor_page_time)
+sensorRegistry = SensorRegistry(Config.sensors)
+sensorStore = SensorStore(ringsize=Config.sensor_history,
+                          retention=Config.sensor_db_retention)
+if Config.sensor_db != '':
+    try:
+        sensorStore.open(Config.sensor_db)
+        sensorStore.load(time.time() - 86400)
+    except Exception as e:
+        print("sensor history archive '" + Config.sensor_db +
+              "' unusable : " + str(e))
+        sensorStore.db = None
+for sensor in sensorRegistry.sensors():
+    sensorGrid.add(sensor)
+
+for topic in sensorRegistry.subscriptions():
+    client.subscribe(topic)
+if Config.wx_mqtt == 'subscribe':
+    client.subscribe(Config.wx_topic + '/#')
+if Config.mqtt_record != '':
+    client.recorder = MqttRecorder(Config.mqtt_record)
+client.connectToHost()
+if Config.mqtt_replay != '':
+    # recorded traffic through the same path as the broker messages
+    replayStats = ReplayStats()
+    replayer = Replayer(Config.mqtt_replay,
+                        lambda topic, payload: client.on_message(
+                            None, None, ReplayMessage(topic, payload)),
+                        Config.mqtt_replay_speed, replayStats)
+    replayer.start()
+
+manager = QtNetwork.QNetworkAccessManager()
+netqueue = DownloadQueue(manager, Config.net_max_active)
+netqueue.estimator.thresholds = Config.radar_link_thresholds
+netusage = NetworkUsage(Config.net_usage_file, Config.net_quota)
+netusage.load()
+netqueue.usage = netusage
+
+# proxy = QNetworkProxy()
+# proxy.setType(QNetworkProxy.HttpProxy)
+# proxy.setHostName("localhost")
+# proxy.setPort(8888)
+# QNetworkProxy.setApplicationProxy(proxy)
+
+stimer = QtCore.QTimer()
+stimer.singleShot(10, qtstart)
+
+# print radarurl(Config.radar1,radar1rect)
+
+timeline.mark('widgets')
+firstpaint = FirstPaint()
+w.installEventFilter(firstpaint)
+w.show()
+w.showFullScreen()
+# whatever was not reached after 5 minutes will not be
+QtCore.QTimer.singleShot(300000, startupreport)
+
+# imported (Benchmark.py), everything is set up but the loop is not run
+if __name__ == '__main__':
+    sys.exit(app.exec_())
@@ -0,0 +1,141 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Sensor history: a fixed size ring buffer per sensor for what is shown on
+# screen, and an optional SQLite archive.
+# The archive runs in WAL mode and readings are written in batches (one
+# transaction per flush()), to keep SD card writes few and small.
+# Old readings are downsampled in tiers, raw -> 5 minutes -> 1 hour
+# averages, and dropped after the retention of the last tier.
+import collections
+import sqlite3
+import time
+
+METRICS = ('temperature', 'humidity', 'pressure', 'battery', 'linkquality')
+
+# table name, bucket in seconds (0 = raw)
+TIERS = (('readings', 0), ('readings_5m', 300), ('readings_1h', 3600))
+
+
+class SensorStore:
+
+    def __init__(self, path='', ringsize=1440, retention=(2, 30, 730)):
+        self.ringsize = ringsize
+        self.retention = retention     # days kept in each tier
+        self.rings = {}
+        self.pending = []
+        self.ids = {}
+        self.written = 0
+        self.db = None
+        if path != '':
+            self.open(path)
+
+    def open(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS sensors '
+                        '(id INTEGER PRIMARY KEY, topic TEXT UNIQUE)')
+        cols = ', '.join(m + ' REAL' for m in METRICS)
+        for table, bucket in TIERS:
+            self.db.execute('CREATE TABLE IF NOT EXISTS %s '
+                            '(sensor INTEGER, t INTEGER, %s, '
+                            'PRIMARY KEY (sensor, t))' % (table, cols))
+        self.db.commit()
+        for sid, topic in self.db.execute('SELECT id, topic FROM sensors'):
+            self.ids[topic] = sid
+
+    def ring(self, topic):
+        try:
+            return self.rings[topic]
+        except KeyError:
+            r = collections.deque(maxlen=self.ringsize)
+            self.rings[topic] = r
+            return r
+
+    def append(self, reading):
+        row = (reading.time,) + tuple(getattr(reading, m) for m in METRICS)
+        self.ring(reading.topic).append(row)
+        if self.db is not None:
+            self.pending.append((reading.topic, row))
+
+    def sensorId(self, topic):
+        try:
+            return self.ids[topic]
+        except KeyError:
+            cur = self.db.execute('INSERT INTO sensors (topic) VALUES (?)',
+                                  (topic,))
+            self.ids[topic] = cur.lastrowid
+            return cur.lastrowid
+
+    def flush(self):
+        # everything since the last flush in one transaction
+        if self.db is None or not self.pending:
+            return 0
+        rows = [(self.sensorId(topic), int(row[0])) + row[1:]
+                for topic, row in self.pending]
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO readings VALUES (?, ?%s)' %
+                (', ?' * len(METRICS)), rows)
+        self.pending = []
+        self.written += len(rows)
+        return len(rows)
+
+    def maintain(self, now=None):
+        # move readings past the retention of a tier into the next one,
+        # as averages over the bucket of that tier
+        if self.db is None:
+            return
+        now = now if now is not None else time.time()
+        avgs = ', '.join('avg(%s)' % m for m in METRICS)
+        with self.db:
+            for i, (table, bucket) in enumerate(TIERS):
+                cutoff = int(now - self.retention[i] * 86400)
+                if i + 1 < len(TIERS):
+                    ntable, nbucket = TIERS[i + 1]
+                    cutoff = (cutoff // nbucket) * nbucket
+                    self.db.execute(
+                        'INSERT OR REPLACE INTO %s '
+                        'SELECT sensor, (t / %d) * %d, %s FROM %s '
+                        'WHERE t < ? GROUP BY sensor, t / %d' %
+                        (ntable, nbucket, nbucket, avgs, table, nbucket),
+                        (cutoff,))
+                self.db.execute('DELETE FROM %s WHERE t < ?' % table,
+                                (cutoff,))
+
+    def load(self, since):
+        # refill the ring buffers after a restart
+        if self.db is None:
+            return
+        topics = dict((sid, topic) for topic, sid in self.ids.items())
+        for r in self.db.execute('SELECT * FROM readings WHERE t >= ? '
+                                 'ORDER BY t', (int(since),)):
+            topic = topics.get(r[0])
+            if topic is not None:
+                self.ring(topic).append((float(r[1]),) + tuple(r[2:]))
+
+    def history(self, topic, metric):
+        i = METRICS.index(metric) + 1
+        return [(row[0], row[i]) for row in self.ring(topic)
+                if row[i] is not None]
+
+    def close(self):
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
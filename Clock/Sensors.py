@@ -0,0 +1,250 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Zigbee sensors declared in the config (Config.sensors), the mapping
+# from MQTT topics to the display slot of each sensor, and the parsing of
+# the MQTT payloads into compact readings.
+import threading
+import time
+
+# orjson or ujson are used when installed, they take the raw bytes
+try:
+    import orjson as fastjson
+except ImportError:
+    try:
+        import ujson as fastjson
+    except ImportError:
+        import json as fastjson
+
+
+def topicMatches(pattern, topic):
+    # MQTT topic filter matching, + is one level, # is all remaining levels
+    p = pattern.split('/')
+    t = topic.split('/')
+    for i, level in enumerate(p):
+        if level == '#':
+            return True
+        if i >= len(t):
+            return False
+        if level != '+' and level != t[i]:
+            return False
+    return len(p) == len(t)
+
+
+def filterCovers(outer, inner):
+    # True when every topic matched by the filter inner is also matched
+    # by the filter outer. # covers all deeper levels, + only covers one
+    # level (a + or a name), and only # covers #
+    o = outer.split('/')
+    i = inner.split('/')
+    for n, level in enumerate(o):
+        if level == '#':
+            return True
+        if n >= len(i) or i[n] == '#':
+            return False
+        if level != '+' and level != i[n]:
+            return False
+    return len(o) == len(i)
+
+
+class Sensor:
+    __slots__ = ('topic', 'name', 'slot')
+
+    def __init__(self, topic, name, slot):
+        self.topic = topic
+        self.name = name
+        self.slot = slot
+
+    def __repr__(self):
+        return "Sensor(%s,%s,%s)" % (self.topic, self.name, self.slot)
+
+
+class SensorRegistry:
+    # Exact topics are found with a single dict lookup. Wildcard entries
+    # are matched once per new topic, the resulting sensor (or the miss)
+    # is then cached in the same dict, so the cost per message does not
+    # grow with the number of sensors.
+
+    def __init__(self, entries, slots=None, collapse=3):
+        self.slots = slots
+        self.collapse = collapse
+        self.topics = {}
+        self.patterns = []
+        self.claimed = set()    # patterns whose slot went to a topic
+        self.used = set()
+        for e in entries:
+            topic = e['topic']
+            slot = e.get('slot')
+            if slot is not None:
+                self.used.add(slot)
+            if '+' in topic or '#' in topic:
+                self.patterns.append(e)
+            else:
+                name = e.get('name', topic.split('/')[-1])
+                self.topics[topic] = Sensor(topic, name, slot)
+        for sensor in list(self.topics.values()):
+            if sensor.slot is None:
+                sensor.slot = self.freeSlot()
+        self.exact = list(self.topics.keys())
+
+    def freeSlot(self):
+        slot = 0
+        while slot in self.used:
+            slot += 1
+        if self.slots is not None and slot >= self.slots:
+            return None
+        self.used.add(slot)
+        return slot
+
+    def lookup(self, topic):
+        try:
+            return self.topics[topic]
+        except KeyError:
+            pass
+        sensor = None
+        for n, e in enumerate(self.patterns):
+            if topicMatches(e['topic'], topic):
+                # the slot of a wildcard entry goes to its first topic,
+                # the next ones take free slots
+                slot = e.get('slot')
+                if slot is None or n in self.claimed:
+                    slot = self.freeSlot()
+                self.claimed.add(n)
+                name = e.get('name', topic.split('/')[-1])
+                sensor = Sensor(topic, name, slot)
+                break
+        self.topics[topic] = sensor
+        return sensor
+
+    def sensors(self):
+        return [s for s in self.topics.values() if s is not None]
+
+    def subscriptions(self):
+        # sibling topics are collapsed into one "parent/+" subscription,
+        # messages for other devices are then dropped by lookup()
+        subs = [e['topic'] for e in self.patterns]
+        parents = {}
+        for topic in self.exact:
+            parent = topic.rsplit('/', 1)[0] if '/' in topic else None
+            parents.setdefault(parent, []).append(topic)
+        for parent, topics in parents.items():
+            if parent is not None and len(topics) >= self.collapse:
+                subs.append(parent + '/+')
+            else:
+                subs.extend(topics)
+        unique = []
+        for sub in subs:
+            if sub not in unique:
+                unique.append(sub)
+        # of two filters covering each other, the first one is kept
+        result = []
+        for n, sub in enumerate(unique):
+            covered = False
+            for m, other in enumerate(unique):
+                if m != n and filterCovers(other, sub) and \
+                        (m < n or not filterCovers(sub, other)):
+                    covered = True
+                    break
+            if not covered:
+                result.append(sub)
+        return result
+
+
+class SensorReading:
+    # one parsed zigbee2mqtt message, None for the values not reported
+    __slots__ = ('topic', 'time', 'temperature', 'humidity', 'pressure',
+                 'linkquality', 'voltage', 'battery')
+
+    def __init__(self, topic, t=None):
+        self.topic = topic
+        self.time = t if t is not None else time.time()
+        self.temperature = None
+        self.humidity = None
+        self.pressure = None
+        self.linkquality = None
+        self.voltage = None
+        self.battery = None
+
+    def __repr__(self):
+        return "SensorReading(%s,%s,%s,%s)" % (
+            self.topic, self.temperature, self.humidity, self.pressure)
+
+
+def _number(data, key):
+    v = data.get(key)
+    if v is None or v == '' or isinstance(v, bool):
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def parseReading(topic, payload, t=None):
+    # payload is the raw MQTT bytes, returns None if it is not a JSON
+    # object (zigbee2mqtt also publishes plain strings like "online")
+    try:
+        data = fastjson.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    r = SensorReading(topic, t)
+    r.temperature = _number(data, 'temperature')
+    r.humidity = _number(data, 'humidity')
+    r.pressure = _number(data, 'pressure')
+    r.linkquality = _number(data, 'linkquality')
+    r.voltage = _number(data, 'voltage')
+    r.battery = _number(data, 'battery')
+    return r
+
+
+class MessageCoalescer:
+    # Keeps only the latest reading of each topic until the GUI thread
+    # takes them, so a burst of messages for one device (re-pairing,
+    # retained messages after a broker restart, a chatty plug) ends up
+    # as a single update. put() is called from the MQTT network thread.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.received = 0
+        self.coalesced = 0
+        self.flushes = 0
+
+    def put(self, reading):
+        # returns True when the queue was empty, a flush has to be
+        # scheduled then
+        with self.lock:
+            first = not self.pending
+            self.received += 1
+            if reading.topic in self.pending:
+                self.coalesced += 1
+            self.pending[reading.topic] = reading
+            return first
+
+    def take(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            self.flushes += 1
+        return list(pending.values())
+
+    def stats(self):
+        with self.lock:
+            return {'received': self.received, 'coalesced': self.coalesced,
+                    'flushes': self.flushes, 'pending': len(self.pending)}
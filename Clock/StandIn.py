@@ -0,0 +1,204 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Local stand-in for the weather, radar and map providers, to run and
+# benchmark the clock without internet. Point the providers at it with
+#   provider_urls = {'owm': 'http://localhost:8080', 'metar': ..., }
+# in the config (see Config-Example.py), then
+#   python StandIn.py [--port 8080] [--fixtures bench] [--latency 200]
+#                     [--jitter 50] [--rate 50000] [--errors 0.05]
+#                     [--drops 0.01]
+# --latency/--jitter delay each answer (ms), --rate limits the throughput
+# of each answer (bytes/s), --errors answers that share of the requests
+# with a 503 and --drops closes the connection without an answer.
+# A file under <fixtures>/standin/<request path> is served as is, so any
+# recorded answer can be added. Otherwise:
+#   OWM one call          <fixtures>/owm-onecall.json
+#   NOAA METAR            <fixtures>/metar.txt
+#   RainViewer tiles      a generated 256x256 rain blob
+#   Mapbox / Google maps  a generated plain image of the requested size
+import os
+import re
+import sys
+import time
+import zlib
+import random
+import struct
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def png(width, height, pixel):
+    # minimal RGBA png encoder, pixel(x, y) -> (r, g, b, a)
+    rows = []
+    for y in range(height):
+        row = bytearray(b'\0')
+        for x in range(width):
+            row.extend(pixel(x, y))
+        rows.append(bytes(row))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + \
+            struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    return b'\x89PNG\r\n\x1a\n' + \
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)) + \
+        chunk(b'IDAT', zlib.compress(b''.join(rows), 6)) + \
+        chunk(b'IEND', b'')
+
+
+_tiles = {}
+_tilelock = threading.Lock()
+
+
+def radarTile(seed):
+    # a soft rain blob, at a place depending on the tile
+    with _tilelock:
+        if seed in _tiles:
+            return _tiles[seed]
+    rnd = random.Random(seed)
+    cx, cy, r = rnd.uniform(40, 216), rnd.uniform(40, 216), rnd.uniform(30, 90)
+
+    def pixel(x, y):
+        d = ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5
+        if d > r:
+            return (0, 0, 0, 0)
+        return (0, 150, 255, int(200 * (1 - d / r)))
+
+    data = png(256, 256, pixel)
+    with _tilelock:
+        _tiles[seed] = data
+    return data
+
+
+def mapImage(width, height):
+    key = ('map', width, height)
+    with _tilelock:
+        if key in _tiles:
+            return _tiles[key]
+    data = png(width, height, lambda x, y: (70, 80, 70, 255))
+    with _tilelock:
+        _tiles[key] = data
+    return data
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    options = None
+
+    def log_message(self, format, *args):
+        if self.options.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def answer(self):
+        # (content type, body) or None
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        fixtures = self.options.fixtures
+        local = os.path.normpath(os.path.join(fixtures, 'standin',
+                                              url.path.lstrip('/')))
+        if local.startswith(os.path.join(fixtures, 'standin')) and \
+                os.path.isfile(local):
+            with open(local, 'rb') as f:
+                return 'application/octet-stream', f.read()
+        if url.path.startswith('/data/2.5/onecall'):
+            with open(os.path.join(fixtures, 'owm-onecall.json'), 'rb') as f:
+                return 'application/json', f.read()
+        if url.path.startswith('/data/observations/metar/'):
+            with open(os.path.join(fixtures, 'metar.txt'), 'rb') as f:
+                return 'text/plain', f.read()
+        if url.path.startswith('/v2/radar/'):
+            return 'image/png', radarTile(url.path.split('/', 4)[-1])
+        if url.path.startswith('/maps/api/staticmap'):
+            size = query.get('size', ['640x480'])[0].split('x')
+            return 'image/png', mapImage(int(size[0]), int(size[1]))
+        if url.path.startswith('/styles/v1/'):
+            m = re.search(r'/(\d+)x(\d+)', url.path)
+            if m:
+                return 'image/png', mapImage(int(m.group(1)),
+                                             int(m.group(2)))
+        return None
+
+    def do_GET(self):
+        o = self.options
+        delay = o.latency + random.uniform(-o.jitter, o.jitter)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if random.random() < o.drops:
+            self.close_connection = True
+            return
+        if random.random() < o.errors:
+            self.send(503, 'text/plain', b'injected error\n')
+            return
+        try:
+            answer = self.answer()
+        except (IOError, ValueError) as e:
+            self.send(500, 'text/plain', (str(e) + '\n').encode('utf-8'))
+            return
+        if answer is None:
+            self.send(404, 'text/plain', b'no fixture for this request\n')
+            return
+        self.send(200, answer[0], answer[1])
+
+    def send(self, code, ctype, body):
+        self.send_response(code)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        rate = self.options.rate
+        if rate <= 0:
+            self.wfile.write(body)
+            return
+        # throttled, in 20 chunks a second
+        step = max(1, int(rate / 20))
+        start = time.monotonic()
+        for i in range(0, len(body), step):
+            self.wfile.write(body[i:i + step])
+            wait = start + (i + step) / float(rate) - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--bind', default='127.0.0.1')
+    parser.add_argument('--fixtures', default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'bench'))
+    parser.add_argument('--latency', type=float, default=0, help='ms')
+    parser.add_argument('--jitter', type=float, default=0, help='ms')
+    parser.add_argument('--rate', type=float, default=0, help='bytes/s')
+    parser.add_argument('--errors', type=float, default=0)
+    parser.add_argument('--drops', type=float, default=0)
+    parser.add_argument('--verbose', action='store_true')
+    options = parser.parse_args(argv[1:])
+    options.fixtures = os.path.abspath(options.fixtures)
+    StandInHandler.options = options
+    server = ThreadingHTTPServer((options.bind, options.port), StandInHandler)
+    server.daemon_threads = True
+    print("stand-in providers on http://%s:%d/" % (options.bind, options.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
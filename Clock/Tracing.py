@@ -0,0 +1,105 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# Event tracer writing the Chrome trace JSON format, open the file in
+# https://ui.perfetto.dev or chrome://tracing (Config.trace_file).
+# Everything measured by Instrumentation (@timed, measure) becomes a
+# complete event on the thread it ran in, downloads are async spans from
+# the request to the end of the reply. Only the last size events are
+# kept, in a ring, so tracing can stay on for days and be dumped when
+# something odd was seen (kill -USR1, and at exit).
+# tracer stays None until start(), callers check it before anything else.
+import collections
+import json
+import os
+import threading
+import time
+
+tracer = None
+
+
+def start(size=200000):
+    global tracer
+    tracer = Tracer(size)
+    return tracer
+
+
+class Tracer:
+
+    def __init__(self, size=200000):
+        # deque append is atomic, the threads do not need a lock
+        self.events = collections.deque(maxlen=size)
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.threads = {}
+        self.ids = 0
+
+    def us(self, t):
+        return int((t - self.origin) * 1000000)
+
+    def thread(self):
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        return tid
+
+    def complete(self, name, start, end, cat='call', args=None):
+        # start and end from time.perf_counter()
+        self.events.append(('X', name, cat, self.us(start),
+                            self.us(end) - self.us(start), self.thread(),
+                            None, args))
+
+    def instant(self, name, cat='call', args=None):
+        self.events.append(('i', name, cat, self.us(time.perf_counter()),
+                            None, self.thread(), None, args))
+
+    def begin(self, name, cat='net', args=None):
+        # async span, returns the id to give to end()
+        self.ids += 1
+        self.events.append(('b', name, cat, self.us(time.perf_counter()),
+                            None, self.thread(), self.ids, args))
+        return self.ids
+
+    def end(self, span, name, cat='net', args=None):
+        self.events.append(('e', name, cat, self.us(time.perf_counter()),
+                            None, self.thread(), span, args))
+
+    def json(self):
+        events = []
+        for tid, name in list(self.threads.items()):
+            events.append({'ph': 'M', 'name': 'thread_name', 'pid': self.pid,
+                           'tid': tid, 'args': {'name': name}})
+        for ph, name, cat, ts, dur, tid, span, args in list(self.events):
+            e = {'ph': ph, 'name': name, 'cat': cat, 'ts': ts,
+                 'pid': self.pid, 'tid': tid}
+            if dur is not None:
+                e['dur'] = dur
+            if span is not None:
+                e['id'] = span
+            if ph == 'i':
+                e['s'] = 't'
+            if args:
+                e['args'] = args
+            events.append(e)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.json(), f)
+        os.replace(tmp, path)
+        return len(self.events)
@@ -0,0 +1,70 @@
+# =====================================================
+#  Copyright (C) 2021 Schuwer Olivier <o.schuwer@gmail.com>
+# =====================================================
+#
+# This file is part of PiWeatherStation.
+# PiWeatherStation is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+# PiWeatherStation is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with PiWeatherStation. If not, see <https://www.gnu.org/licenses/>.
+
+# The weather shared over MQTT between stations (Config.wx_mqtt).
+# The OpenWeatherMap one call answer is cut down to the fields shown on
+# screen, keeping the OWM names, so the same display code works on the
+# direct answer and on a snapshot received from another station.
+# The METAR is shared as the raw report line.
+#   <base>/current   {"dt":..,"temp":..,"weather":[{"icon":..}],..}
+#   <base>/hourly    [{"dt":..,"temp":..,"pop":..}, ..]
+#   <base>/daily     [{"dt":..,"temp":{"min":..,"max":..}}, ..]
+#   <base>/metar     "LFST 191030Z 22008KT ..."
+# All are published retained, a station starting up gets them at once.
+import json
+
+PARTS = ('current', 'hourly', 'daily')
+
+CURRENT_KEYS = ('dt', 'temp', 'feels_like', 'pressure', 'humidity',
+                'wind_deg', 'wind_speed', 'wind_gust')
+HOURLY_KEYS = ('dt', 'temp', 'pop', 'rain', 'snow')
+DAILY_KEYS = ('dt', 'temp', 'pop', 'rain', 'snow')
+
+
+def _compact(f, keys):
+    c = dict((k, f[k]) for k in keys if k in f)
+    c['weather'] = [{'icon': w['icon'], 'description': w['description']}
+                    for w in f['weather'][:1]]
+    return c
+
+
+def compactOwm(data, hours=12, days=6):
+    return {
+        'current': _compact(data['current'], CURRENT_KEYS),
+        'hourly': [_compact(f, HOURLY_KEYS) for f in data['hourly'][:hours]],
+        'daily': [_compact(f, DAILY_KEYS) for f in data['daily'][:days]],
+    }
+
+
+def encode(value):
+    return json.dumps(value, separators=(',', ':'),
+                      ensure_ascii=False).encode('utf-8')
+
+
+def decode(payload):
+    return json.loads(bytes(payload).decode('utf-8'))
+
+
+def messages(base, snapshot=None, metar=None):
+    # (topic, payload) of everything to publish
+    out = []
+    if snapshot is not None:
+        for part in PARTS:
+            out.append((base + '/' + part, encode(snapshot[part])))
+    if metar is not None:
+        out.append((base + '/metar', encode(metar)))
+    return out